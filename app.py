@@ -3,7 +3,26 @@ import pandas as pd
 import altair as alt
 import pydeck as pdk
 import numpy as np
-import difflib # Library untuk string matching (Simulasi AI)
+import io
+import time
+
+import batch_validation
+import chart_data
+import data_grid
+import data_engine
+import instrumentation
+import map_layers
+import partitioned_executor
+import scoring
+from dataset_refresher import DatasetRefresher
+from kewajaran_engine import KewajaranEngine
+from rank_index import LEADERBOARDS, RankIndex
+from region_aggregates import RegionCache
+from region_index import RegionIndex
+from risk_simulator import DEFAULT_POLICY, RiskScenarioModel
+from rollup_cube import RollupCube
+from sector_search import SubSectorSearch # Trigram index untuk string matching (Simulasi AI)
+from spatial_index import SpatialIndex
 
 # -----------------------------------------------------------------------------
 # 1. KONFIGURASI HALAMAN & UX
@@ -15,8 +34,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# [CRITICAL] Mematikan limit default Altair
-alt.data_transformers.disable_max_rows()
+# Timing per tahap rerun (lihat instrumentation); panel admin via ?admin=1
+admin_mode = instrumentation.admin_enabled(st.query_params)
+run_trace = instrumentation.start_run('app', measure_payloads=admin_mode)
+instrumentation.serve_metrics()
+
+# Limit default Altair (5000 baris) tetap aktif: data chart sudah di-agregasi
+# / di-sampling di chart_data sehingga ukurannya terbatas
 
 # Custom CSS
 st.markdown("""
@@ -55,204 +79,187 @@ st.markdown("""
 # -----------------------------------------------------------------------------
 # 2. DATA ENGINE (EXCEL & CSV LOADER)
 # -----------------------------------------------------------------------------
-@st.cache_data
+# Copy-on-Write (default sejak pandas 3): slice/view dari dataset bersama tidak
+# pernah bisa mengubah data sumber
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def build_app_dataset():
+    # Preprocessing & skor turunan ada di data_engine; hasilnya di-cache sebagai
+    # file Arrow di disk sehingga cold start cukup memory-map (lihat CACHE_DIR).
+    data = data_engine.load_dataset()
+    data['kewajaran'] = KewajaranEngine.from_levels(data['level1'], data['level2'], data['level3'])
+    data['sub_sector_search'] = SubSectorSearch.from_frame(data['level3'])
+    data['region_index'] = RegionIndex(data['main'])
+    data['spatial_index'] = SpatialIndex(data['main'])
+    totals = data['main'].attrs.get(data_engine.TOTALS_ATTR)
+    max_pot = scoring.stats_from_totals(totals)['max_pot'] if totals else None
+    # Baris model = baris region_index.df, sehingga posisi df_filtered bisa dipakai langsung
+    data['risk_model'] = RiskScenarioModel(data['region_index'].df, max_pot)
+    # KPI per (Kabupaten, Kecamatan, Sektor) dijumlahkan dari cube, bukan scan desa
+    data['rollup_cube'] = RollupCube(data['region_index'].df)
+    data['kabupaten_summary'] = data['rollup_cube'].by_kabupaten()
+    # Permutasi peringkat per (Kabupaten, Kuadran) untuk Top Hidden Gems & leaderboard
+    data['rank_index'] = RankIndex(data['region_index'].df)
+    # Memo filter + KPI per (Kabupaten, Kecamatan); ikut diganti saat swap versi
+    data['region_cache'] = RegionCache(data['region_index'], cube=data['rollup_cube'])
+    return data
+
+@st.cache_resource
+def get_refresher():
+    # cache_resource: satu refresher (dan satu dataset read-only) dipakai bersama
+    # oleh semua sesi. Perubahan CSV / Excel / deltas dibangun ulang di latar
+    # lalu di-swap atomik sebagai versi baru (dataset_refresher)
+    instrumentation.cache_miss('load_data_engine')
+    refresher = DatasetRefresher(build_app_dataset, data_engine.dataset_key, warm=data_engine.load_dataset)
+    return refresher.start()
+
 def load_data_engine():
-    data = {}
     try:
-        # 1. Load Main Data (CSV)
-        data['main'] = pd.read_csv('Prototype Jawa Tengah.csv')
-        
-        # 2. Load Validation Data (EXCEL Multiple Sheets)
-        excel_file = 'Kewajaran_Omzet_All.xlsx'
-        data['level1'] = pd.read_excel(excel_file, sheet_name='Level 1')
-        data['level2'] = pd.read_excel(excel_file, sheet_name='Level 2')
-        data['level3'] = pd.read_excel(excel_file, sheet_name='Level 3')
-        
-        # --- [UPDATED] COMPREHENSIVE SECTOR MAPPING ---
-        # Menambahkan kode 02, 05, 12, 16, 17, 99 yang mungkin muncul
-        sector_map = {
-            "01-PERTANIAN, PERBURUAN DAN KEHUTANAN": "Pertanian, Kebun & Kehutanan",
-            "02-PERIKANAN": "Perikanan & Kelautan",
-            "03-PERTAMBANGAN DAN PENGGALIAN": "Tambang & Galian",
-            "04-INDUSTRI PENGOLAHAN": "Industri & Produksi Barang",
-            "05-LISTRIK, GAS DAN AIR": "Listrik, Gas & Air Bersih",
-            "06-KONSTRUKSI": "Konstruksi & Bangunan",
-            "07-PERDAGANGAN BESAR DAN ECERAN": "Perdagangan (Toko/Grosir)",
-            "08-PENYEDIAAN AKOMODASI DAN PENYEDIAAN MAKAN MINUM": "Hotel, Restoran & Katering",
-            "09-TRANSPORTASI, PERGUDANGAN DAN KOMUNIKASI": "Transportasi, Gudang & Logistik",
-            "10-PERANTARA KEUANGAN": "Jasa Keuangan & Bank",
-            "11-REAL ESTATE, USAHA PERSEWAAN, DAN JASA PERUSAHAAN": "Properti, Sewa & Jasa Bisnis",
-            "12-ADMINISTRASI PEMERINTAHAN, PERTAHANAN DAN JAMINAN SOSIAL WAJIB": "Pemerintahan & PNS",
-            "13-JASA PENDIDIKAN": "Pendidikan & Kursus",
-            "14-JASA KESEHATAN DAN KEGIATAN SOSIAL": "Kesehatan & Klinik",
-            "15-JASA KEMASYARAKATAN, SOSIAL BUDAYA, HIBURAN DAN PERORANGAN LAINNYA": "Jasa Sosial, Hiburan & Loundry",
-            "16-JASA PERORANGAN YANG MELAYANI RUMAH TANGGA": "Jasa Rumah Tangga (ART)",
-            "17-BADAN INTERNASIONAL DAN BADAN EKSTRA INTERNASIONAL LAINNYA": "Badan Internasional",
-            "18-KEGIATAN YANG BELUM JELAS BATASANNYA": "Kegiatan Lainnya",
-            "19-PENERIMA KREDIT BUKAN LAPANGAN USAHA": "Keperluan Konsumtif / Rumah Tangga",
-            "99-KEGIATAN LAINNYA": "Sektor Lainnya"
-        }
-        
-        sub_sector_map = {
-            "Pertanian Padi": "Petani Padi (Sawah)",
-            "Kombinasi Pertanian/Perkebunan dg Peternakan (Mixed Farming)": "Tani & Ternak Campuran",
-            "Perdagangan Kelapa dan Kelapa Sawit": "Jual Beli Kelapa/Sawit",
-            "Perdagangan Eceran Furniture dan Handycraft": "Toko Mebel & Kerajinan",
-            "Perdagangan Eceran Hasil Perikanan Darat dan Laut": "Jualan Ikan (Pasar/Eceran)",
-            "Perdagangan Eceran Mobil": "Jual Beli Mobil",
-            "Perdagangan Eceran Hasil Bumi (Campuran)": "Jualan Hasil Bumi",
-            "Distribusi Alat Elektronik": "Distributor Elektronik",
-            "Jasa Pelayanan Bongkar Muat Barang": "Jasa Bongkar Muat",
-            "Jasa Kebersihan": "Jasa Cleaning Service",
-            "Rumah Tangga utk Pemilikan Furnitur & Peralatan Rumah Tangga": "Pembelian Perabot Rumah",
-            "Rumah Tangga untuk Pemilikan Rumah Tinggal s.d. Tipe 21": "Pembelian/Renovasi Rumah"
-        }
-
-        # Apply Rephrasing
-        for lvl in ['level1', 'level2', 'level3']:
-            if 'Sektor Ekonomi' in data[lvl].columns:
-                data[lvl]['Sektor Ekonomi'] = data[lvl]['Sektor Ekonomi'].replace(sector_map)
-            if 'Sub Sektor Ekonomi' in data[lvl].columns:
-                data[lvl]['Sub Sektor Ekonomi'] = data[lvl]['Sub Sektor Ekonomi'].replace(sub_sector_map)
-
-        # --- MAIN DATA PRE-PROCESSING ---
-        data['main'].columns = [col.replace('potensi_wilayah_kel_podes_pdrb_sekda_current.', '') for col in data['main'].columns]
-        
-        rename_map = {
-            'nama_kabupaten': 'Kabupaten', 'nama_kecamatan': 'Kecamatan', 'nama_desa': 'Desa',
-            'latitude_desa': 'lat', 'longitude_desa': 'lon',
-            'total_pinjaman_kel': 'Total_Pinjaman', 'total_simpanan_kel': 'Total_Simpanan',
-            'jumlah_keluarga_pengguna_listrik': 'Jumlah_KK',
-            'attractiveness_index': 'Skor_Potensi',
-            'max_tipe_usaha': 'Sektor_Dominan',
-            'jumlah_lokasi_permukiman_kumuh': 'Risk_Kumuh',
-            'bencana_alam': 'Risk_Bencana',
-            'jumlah_perkelahian_masyarakat': 'Risk_Konflik'
-        }
-        data['main'].rename(columns={k: v for k, v in rename_map.items() if k in data['main'].columns}, inplace=True)
-        
-        # Apply sector map to main data as well
-        if 'Sektor_Dominan' in data['main'].columns:
-             data['main']['Sektor_Dominan'] = data['main']['Sektor_Dominan'].replace(sector_map)
-
-        num_cols = data['main'].select_dtypes(include=[np.number]).columns
-        data['main'][num_cols] = data['main'][num_cols].fillna(0)
-        
-        data['main']['Jumlah_KK'] = data['main']['Jumlah_KK'].replace(0, 1) 
-        data['main']['Loan_per_HH'] = (data['main']['Total_Pinjaman'] / data['main']['Jumlah_KK']) / 1_000_000 
-        
-        sat_risk = (data['main']['Loan_per_HH'] / 50.0).clip(0, 1) * 100 
-        max_pot = data['main']['Skor_Potensi'].max() if data['main']['Skor_Potensi'].max() > 0 else 1
-        eco_risk = 100 - ((data['main']['Skor_Potensi'] / max_pot) * 100)
-        
-        r_kumuh = (data['main']['Risk_Kumuh'] > 0).astype(int) if 'Risk_Kumuh' in data['main'].columns else 0
-        r_bencana = (data['main']['Risk_Bencana'] > 0).astype(int) if 'Risk_Bencana' in data['main'].columns else 0
-        r_konflik = (data['main']['Risk_Konflik'] > 0).astype(int) if 'Risk_Konflik' in data['main'].columns else 0
-        
-        env_risk = (r_kumuh * 30) + (r_bencana * 20) + (r_konflik * 50)
-        data['main']['Final_Risk_Score'] = (0.3 * sat_risk) + (0.3 * eco_risk) + (0.4 * env_risk)
-        
-        def get_risk_cat(x):
-            if x >= 60: return 'Critical'
-            elif x >= 40: return 'High'
-            elif x >= 20: return 'Medium'
-            else: return 'Low'
-        data['main']['Risk_Category'] = data['main']['Final_Risk_Score'].apply(get_risk_cat)
-
-        avg_pot = data['main']['Skor_Potensi'].mean()
-        avg_sat = data['main']['Loan_per_HH'].mean()
-        def get_quad(row):
-            if row['Skor_Potensi'] >= avg_pot and row['Loan_per_HH'] < avg_sat: return "Hidden Gem (Grow)"
-            elif row['Skor_Potensi'] >= avg_pot and row['Loan_per_HH'] >= avg_sat: return "Red Ocean (Compete)"
-            elif row['Skor_Potensi'] < avg_pot and row['Loan_per_HH'] >= avg_sat: return "High Risk (Stop)"
-            else: return "Dormant (Monitor)"
-        data['main']['Strategy_Quadrant'] = data['main'].apply(get_quad, axis=1)
-
-        np.random.seed(42) 
-        data['main']['Sentiment_Score'] = np.random.uniform(3.5, 4.9, size=len(data['main']))
-        data['main']['Review_Count'] = np.random.randint(10, 1000, size=len(data['main']))
-        
-        saturation_ratio = (data['main']['Loan_per_HH'] / 50.0).clip(0, 1)
-        data['main']['Est_Unserved_KK'] = (data['main']['Jumlah_KK'] * (1 - saturation_ratio)).astype(int)
-        
+        return get_refresher().current()
     except Exception as e:
         return None
-        
-    return data
 
 # LOAD DATA
-dataset = load_data_engine()
-if dataset is None:
+with instrumentation.span('data_load'):
+    snapshot = instrumentation.track_cache('load_data_engine', load_data_engine)
+if snapshot is None:
     st.error("❌ Data tidak ditemukan. Pastikan 'Prototype Jawa Tengah.csv' dan 'Kewajaran_Omzet_All.xlsx' ada.")
     st.stop()
+# Snapshot diambil sekali per rerun: satu rerun selalu melihat satu versi data
+dataset = snapshot.data
+seen_version = st.session_state.get('data_version')
+st.session_state['data_version'] = snapshot.version
+
+@st.cache_data(max_entries=4)
+def run_batch_validation(file_bytes, filename, data_version):
+    # Hasil di-cache per isi file (dan versi data) agar rerun widget lain tidak memvalidasi ulang
+    instrumentation.cache_miss('run_batch_validation')
+    apps = batch_validation.read_applications(io.BytesIO(file_bytes), filename)
+    result = partitioned_executor.validate_batch(apps, dataset['level1'], dataset['level2'], dataset['level3'])
+    return batch_validation.summarize(result), batch_validation.to_csv_bytes(result)
 
 # -----------------------------------------------------------------------------
 # 3. SIDEBAR CONTROLS
 # -----------------------------------------------------------------------------
 st.sidebar.title("🎛️ Geo-Control Panel")
 
-df_main = dataset['main']
-all_kab = sorted(df_main['Kabupaten'].unique())
+region_index = dataset['region_index']
+all_kab = region_index.kabupaten_options
 selected_kab = st.sidebar.selectbox("Pilih Wilayah (Kabupaten)", all_kab, index=0)
 
-df_kab = df_main[df_main['Kabupaten'] == selected_kab]
-all_kec = sorted(df_kab['Kecamatan'].unique())
+all_kec = region_index.kecamatan_options[selected_kab]
 selected_kec = st.sidebar.multiselect("Filter Kecamatan", all_kec, default=all_kec)
 
 if not selected_kec:
     st.warning("⚠️ Mohon pilih minimal satu kecamatan.")
     st.stop()
 
-df_filtered = df_kab[df_kab['Kecamatan'].isin(selected_kec)].copy()
+region_cache = dataset['region_cache']
+rank_index = dataset['rank_index']
+# Filter kecamatan untuk leaderboard hanya jika tidak semua kecamatan dipilih
+kec_filter = selected_kec if len(selected_kec) < len(all_kec) else None
+with instrumentation.span('filter'):
+    # Filter wilayah + KPI / groupby sektor Tab 1 (region_aggregates)
+    region = region_cache.get(selected_kab, selected_kec)
+df_filtered = region['frame']
+with instrumentation.span('chart_data'):
+    charts = region_cache.derive(selected_kab, selected_kec, 'charts', lambda view: chart_data.build_chart_data(view['frame']))
 
 st.sidebar.markdown("---")
 st.sidebar.info(f"📍 **Coverage:** {len(df_filtered)} Desa")
-
-# Color Helpers
-def get_hex_risk(score):
-    if score < 20: return '#00cc96' # Green
-    elif score < 40: return '#ffa15a' # Orange
-    elif score < 60: return '#ef553b' # Red Orange
-    else: return '#b30000' # Dark Red
-
-def get_hex_potential(score):
-    if score > 80: return '#00cc96' # Bright Green
-    elif score > 60: return '#636efa' # Blue
-    elif score > 40: return '#ab63fa' # Purple
-    else: return '#d3d3d3' # Grey
-
-df_filtered['color_hex_risk'] = df_filtered['Final_Risk_Score'].apply(get_hex_risk)
-df_filtered['color_pot_hex'] = df_filtered['Skor_Potensi'].apply(get_hex_potential)
+if seen_version is not None and seen_version != snapshot.version:
+    st.sidebar.success(f"🔄 Data diperbarui ke versi {snapshot.version}")
+st.sidebar.caption(f"Versi data {snapshot.version} · dimuat {time.strftime('%d %b %H:%M', time.localtime(snapshot.loaded_at))}")
+
+# Mode peta: agregat grid (ringan untuk wilayah besar) atau titik per desa
+map_mode = st.sidebar.radio("Mode Peta", ["🔷 Agregat Grid", "📍 Titik per Desa"], horizontal=True)
+if map_mode == "🔷 Agregat Grid":
+    map_zoom = st.sidebar.slider("Detail Peta (Zoom)", map_layers.MIN_ZOOM, map_layers.MAX_ZOOM, 10)
+
+def render_desa_map(color_col, metric):
+    with instrumentation.span('map'):
+        if map_mode == "🔷 Agregat Grid":
+            cells = region_cache.derive(selected_kab, selected_kec, ('grid', map_zoom),
+                                        lambda view: map_layers.aggregate_grid(view['frame'], map_zoom))
+            deck = map_layers.build_deck(cells, metric, map_zoom)
+            instrumentation.record_payload(f"map_grid_{metric}", deck)
+            st.pydeck_chart(deck)
+        else:
+            # st.map men-serialisasi koordinat via json: float32 harus dikembalikan ke float64
+            points = df_filtered[['lat', 'lon', color_col]].astype({'lat': float, 'lon': float})
+            instrumentation.record_payload(f"map_points_{metric}", points)
+            st.map(points, latitude='lat', longitude='lon', color=color_col, size=30, zoom=10)
+
+def show_chart(name, chart):
+    instrumentation.record_payload(name, chart)
+    with instrumentation.span('chart_render'):
+        st.altair_chart(chart, use_container_width=True)
+
+def show_table(name, df, **kwargs):
+    instrumentation.record_payload(name, df)
+    with instrumentation.span('table_render'):
+        st.dataframe(df, use_container_width=True, **kwargs)
+
+def show_paged_table(name, columns, sort_by, ascending=False, search_col='Desa', choose_columns=False):
+    # Tabel desa wilayah terpilih: sort / filter di server, hanya satu halaman dikirim (data_grid)
+    if choose_columns:
+        columns = st.multiselect("Kolom", list(df_filtered.columns), default=columns, key=f"{name}_cols") or columns
+    c_sort, c_dir, c_search, c_size, c_page = st.columns([2, 1, 2, 1, 1])
+    sort_col = c_sort.selectbox("Urutkan", columns, index=columns.index(sort_by) if sort_by in columns else 0,
+                                key=f"{name}_sort")
+    sort_asc = c_dir.toggle("Naik", value=ascending, key=f"{name}_asc")
+    query = c_search.text_input(f"Cari {search_col}", key=f"{name}_search").strip()
+    page_size = c_size.selectbox("Baris", data_grid.PAGE_SIZES, index=data_grid.PAGE_SIZES.index(data_grid.DEFAULT_PAGE_SIZE),
+                                 key=f"{name}_size")
+
+    with instrumentation.span('grid'):
+        # Permutasi sort dimemo per wilayah, ikut ter-evict bersama entry RegionCache
+        order = region_cache.derive(selected_kab, selected_kec, ('order', sort_col, sort_asc),
+                                    lambda view: data_grid.sort_order(view['frame'], sort_col, sort_asc))
+        rows = data_grid.visible_rows(order, data_grid.filter_mask(df_filtered, search_col, query) if query else None)
+        n_pages = data_grid.page_count(len(rows), page_size)
+        # Halaman lama bisa melebihi jumlah halaman setelah filter berubah
+        if st.session_state.get(f"{name}_page", 1) > n_pages:
+            st.session_state[f"{name}_page"] = n_pages
+        page = c_page.number_input("Halaman", 1, n_pages, 1, key=f"{name}_page")
+        page_df = data_grid.page_frame(df_filtered, rows, page, page_size, columns)
+
+    show_table(name, page_df, hide_index=True)
+    st.caption(f"{len(rows):,} desa · halaman {page} dari {n_pages}")
+
+# Kolom warna (color_hex_risk, color_pot_hex) sudah dihitung di scoring.score_frame
 
 # -----------------------------------------------------------------------------
 # 5. DASHBOARD TABS
 # -----------------------------------------------------------------------------
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "📊 Executive Summary", 
     "🚀 Growth Intelligence", 
     "⚖️ Saturation & Insight", 
     "🛡️ Risk Guardian",
-    "✅ Pengecekan Kewajaran"
+    "✅ Pengecekan Kewajaran",
+    "📡 Radius Cabang"
 ])
 
 # ================= TAB 1: EXECUTIVE SUMMARY =================
-with tab1:
+with tab1, instrumentation.span('tab1_summary'):
     st.markdown(f"### 📋 Ringkasan Strategis: {selected_kab}")
     
     # KPI Metrics
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Total Exposure", f"Rp {df_filtered['Total_Pinjaman'].sum()/1e9:,.1f} M")
-    c2.metric("Avg Risk Score", f"{df_filtered['Final_Risk_Score'].mean():.1f}/100")
-    c3.metric("Growth Spots", f"{len(df_filtered[df_filtered['Strategy_Quadrant']=='Hidden Gem (Grow)'])} Desa", delta_color="normal")
-    c4.metric("High Risk Areas", f"{len(df_filtered[df_filtered['Risk_Category'].isin(['High', 'Critical'])])} Desa", delta_color="inverse")
+    c1.metric("Total Exposure", f"Rp {region['total_exposure']/1e9:,.1f} M")
+    c2.metric("Avg Risk Score", f"{region['avg_risk']:.1f}/100")
+    c3.metric("Growth Spots", f"{region['growth_spots']} Desa", delta_color="normal")
+    c4.metric("High Risk Areas", f"{region['high_risk_areas']} Desa", delta_color="inverse")
 
     st.markdown("---")
     
     # Market Sentiment
     st.subheader("⭐ Market Sentiment Engine & Insight")
     
-    pct_growth = (len(df_filtered[df_filtered['Strategy_Quadrant']=='Hidden Gem (Grow)']) / len(df_filtered)) * 100
-    dom_sector = df_filtered['Sektor_Dominan'].mode()[0] if not df_filtered['Sektor_Dominan'].empty else "Umum"
+    pct_growth = region['pct_growth']
+    dom_sector = region['dom_sector']
     
     st.markdown(f"""
     <div class="insight-box">
@@ -264,7 +271,7 @@ with tab1:
     
     # Sector Chart
     sent_col1, sent_col2 = st.columns([1, 2])
-    sec_stats = df_filtered.groupby('Sektor_Dominan').agg({'Sentiment_Score': 'mean', 'Review_Count': 'mean'}).reset_index().sort_values('Sentiment_Score', ascending=False)
+    sec_stats = region['sec_stats']
     
     if not sec_stats.empty:
         top_sector = sec_stats.iloc[0]
@@ -279,10 +286,10 @@ with tab1:
         with sent_col2:
             chart_sent_bar = alt.Chart(sec_stats.head(5)).mark_bar().encode(
                 x=alt.X('Sentiment_Score', scale=alt.Scale(domain=[3.5, 5.0])),
-                y=alt.Y('Sektor_Dominan', sort='-x'),
+                y=alt.Y('Sektor_Dominan:N', sort='-x'),
                 color=alt.Color('Sentiment_Score', scale=alt.Scale(scheme='greens'))
             ).properties(height=200)
-            st.altair_chart(chart_sent_bar, use_container_width=True)
+            show_chart('sector_sentiment', chart_sent_bar)
 
     st.markdown("---")
 
@@ -294,100 +301,154 @@ with tab1:
     
     with col_strat:
         st.markdown("**Matriks Posisi: Potensi vs Saturasi**")
-        chart_quad = alt.Chart(df_filtered).mark_circle(size=100).encode(
+        chart_quad = alt.Chart(charts['scatter']).mark_circle(size=100).encode(
             x=alt.X('Skor_Potensi', title='Potensi Ekonomi'),
             y=alt.Y('Loan_per_HH', title='Saturasi'),
-            color='Strategy_Quadrant',
+            color='Strategy_Quadrant:N',
             tooltip=['Desa', 'Strategy_Quadrant']
         ).properties(height=400).interactive()
-        rule_x = alt.Chart(df_filtered).mark_rule(color='gray', strokeDash=[3,3]).encode(x='mean(Skor_Potensi)')
-        rule_y = alt.Chart(df_filtered).mark_rule(color='gray', strokeDash=[3,3]).encode(y='mean(Loan_per_HH)')
-        st.altair_chart(chart_quad + rule_x + rule_y, use_container_width=True)
+        rule_x = alt.Chart(charts['means']).mark_rule(color='gray', strokeDash=[3,3]).encode(x='Skor_Potensi')
+        rule_y = alt.Chart(charts['means']).mark_rule(color='gray', strokeDash=[3,3]).encode(y='Loan_per_HH')
+        show_chart('quadrant_scatter', chart_quad + rule_x + rule_y)
         
     with col_map:
         st.markdown("**Peta Sebaran Potensi**")
-        st.map(df_filtered, latitude='lat', longitude='lon', color='color_pot_hex', size=30, zoom=10)
+        render_desa_map('color_pot_hex', 'potensi')
     
+    # Perbandingan seluruh kabupaten (dari rollup cube, dihitung saat load)
+    st.markdown("---")
+    st.subheader("🏛️ Perbandingan Antar Kabupaten")
+    kab_summary = dataset['kabupaten_summary']
+    st.caption(f"{len(kab_summary)} kabupaten · dijumlahkan dari rollup cube Kabupaten × Kecamatan × Sektor")
+    show_table('kabupaten_summary', kab_summary, hide_index=True, column_config={
+        'Total Exposure (M)': st.column_config.NumberColumn(format="%.1f"),
+        'Avg Risk': st.column_config.NumberColumn(format="%.1f"),
+        'Std Risk': st.column_config.NumberColumn(format="%.1f"),
+        '% Growth': st.column_config.NumberColumn(format="%.1f%%"),
+    })
+
     # Table Hidden Gems
     st.markdown("---")
     st.subheader("💎 Top Hidden Gems (Unserved Market)")
     top_n = st.slider("Jumlah Desa:", 3, 20, 5)
-    gems = df_filtered[df_filtered['Strategy_Quadrant'] == 'Hidden Gem (Grow)'].nlargest(top_n, 'Est_Unserved_KK')
-    st.dataframe(gems[['Desa', 'Kecamatan', 'Est_Unserved_KK', 'Skor_Potensi']], hide_index=True, use_container_width=True)
+    gems = rank_index.top('Est_Unserved_KK', top_n, selected_kab, 'Hidden Gem (Grow)', kec_filter,
+                          columns=['Desa', 'Kecamatan', 'Est_Unserved_KK', 'Skor_Potensi'])
+    show_table('hidden_gems', gems.drop(columns='Rank'), hide_index=True)
 
-    with st.expander("📋 Lihat Data Lengkap Per Desa"):
-        st.dataframe(df_filtered, use_container_width=True)
+    with st.expander("📋 Lihat Data Analisis Per Desa"):
+        st.caption("Kolom analisis dashboard (hasil mapping podes + skor); kolom lain di CSV sumber tidak dimuat.")
+        show_paged_table('desa_full', list(df_filtered.columns), 'Desa', ascending=True, choose_columns=True)
 
 # ================= TAB 2: GROWTH INTELLIGENCE =================
-with tab2:
+with tab2, instrumentation.span('tab2_growth'):
     st.markdown("### 🚀 Analisis Potensi Pertumbuhan")
     c_g1, c_g2 = st.columns([2, 1])
     with c_g1:
         st.subheader("🗺️ Peta Sebaran Potensi")
-        st.map(df_filtered, latitude='lat', longitude='lon', color='color_pot_hex', size=30, zoom=10)
+        render_desa_map('color_pot_hex', 'potensi')
     with c_g2:
         st.subheader("📊 Kategori Potensi")
-        hist_pot = alt.Chart(df_filtered).mark_bar().encode(
-            x=alt.X('Skor_Potensi', bin=True), y='count()', color=alt.value('#00cc96')
+        hist_pot = alt.Chart(charts['hist_potensi']).mark_bar().encode(
+            x=alt.X('bin_start', bin='binned', title='Skor_Potensi'), x2='bin_end',
+            y=alt.Y('count', title='Count of Records'), color=alt.value('#00cc96')
         ).properties(height=300)
-        st.altair_chart(hist_pot, use_container_width=True)
+        show_chart('hist_potensi', hist_pot)
 
     st.subheader("📋 Detail Desa: Growth Opportunities")
-    st.dataframe(df_filtered[['Desa', 'Skor_Potensi', 'Est_Unserved_KK', 'Sektor_Dominan']].sort_values('Skor_Potensi', ascending=False), hide_index=True, use_container_width=True)
+    show_paged_table('growth_detail', ['Desa', 'Skor_Potensi', 'Est_Unserved_KK', 'Sektor_Dominan'], 'Skor_Potensi')
+
+    # Leaderboard dari permutasi peringkat yang disiapkan saat load (rank_index)
+    st.subheader("🏆 Leaderboard Desa")
+    col_lb1, col_lb2, col_lb3, col_lb4 = st.columns(4)
+    lb_metric = col_lb1.selectbox("Metrik", list(LEADERBOARDS), format_func=lambda m: LEADERBOARDS[m][0])
+    lb_scope = col_lb2.radio("Cakupan", ["Wilayah Terpilih", "Seluruh Provinsi"], horizontal=True)
+    lb_quadrant = col_lb3.selectbox("Kuadran", ["Semua Kuadran"] + scoring.QUADRANTS)
+    lb_n = col_lb4.number_input("Top N", min_value=5, max_value=5000, value=50, step=5)
+    with instrumentation.span('leaderboard'):
+        regional = lb_scope == "Wilayah Terpilih"
+        leaderboard = rank_index.top(lb_metric, int(lb_n),
+                                     kabupaten=selected_kab if regional else None,
+                                     quadrant=None if lb_quadrant == "Semua Kuadran" else lb_quadrant,
+                                     kecamatan=kec_filter if regional else None,
+                                     columns=['Desa', 'Kecamatan', 'Kabupaten', 'Strategy_Quadrant', lb_metric])
+    show_table('leaderboard', leaderboard, hide_index=True)
 
 # ================= TAB 3: SATURATION =================
-with tab3:
+with tab3, instrumentation.span('tab3_saturation'):
     st.markdown("### ⚖️ Analisis Saturasi")
     col_sat1, col_sat2 = st.columns(2)
     with col_sat1:
         st.subheader("📊 Distribusi Beban Utang")
-        hist = alt.Chart(df_filtered).mark_bar().encode(
-            x=alt.X('Loan_per_HH', bin=True), y='count()', color=alt.value('#ffa15a')
+        hist = alt.Chart(charts['hist_loan']).mark_bar().encode(
+            x=alt.X('bin_start', bin='binned', title='Loan_per_HH'), x2='bin_end',
+            y=alt.Y('count', title='Count of Records'), color=alt.value('#ffa15a')
         )
-        st.altair_chart(hist, use_container_width=True)
+        show_chart('hist_loan', hist)
     with col_sat2:
         st.subheader("⚔️ Komposisi Kuadran")
-        pie = alt.Chart(df_filtered).mark_arc().encode(
-            theta='count()', color='Strategy_Quadrant'
+        pie = alt.Chart(charts['quadrant_counts']).mark_arc().encode(
+            theta='count', color='Strategy_Quadrant:N'
         )
-        st.altair_chart(pie, use_container_width=True)
+        show_chart('quadrant_pie', pie)
     
     st.subheader("📋 Kategorisasi Beban Utang")
-    def categorize_debt(val):
-        if val < 10: return "🟢 Ringan"
-        elif val < 30: return "🟡 Menengah"
-        elif val < 50: return "🟠 Berat"
-        else: return "🔴 Sangat Berat"
-    df_filtered['Kategori_Beban'] = df_filtered['Loan_per_HH'].apply(categorize_debt)
-    st.dataframe(df_filtered[['Desa', 'Loan_per_HH', 'Kategori_Beban']].sort_values('Loan_per_HH', ascending=False), hide_index=True, use_container_width=True)
+    show_paged_table('debt_detail', ['Desa', 'Loan_per_HH', 'Kategori_Beban'], 'Loan_per_HH')
 
 # ================= TAB 4: RISK GUARDIAN =================
-with tab4:
+with tab4, instrumentation.span('tab4_risk'):
     st.markdown("### 🛡️ Profil Risiko Wilayah")
     col_r1, col_r2 = st.columns([2, 1])
     with col_r1:
         st.subheader("🗺️ Peta Risiko")
-        st.map(df_filtered, latitude='lat', longitude='lon', color='color_hex_risk', size=30, zoom=10)
+        render_desa_map('color_hex_risk', 'risk')
     with col_r2:
         st.subheader("🔍 Pemicu Risiko")
-        rf_data = pd.DataFrame({
-            'Faktor': ['Konflik', 'Bencana', 'Kumuh', 'Saturasi'],
-            'Jumlah': [df_filtered['Risk_Konflik'].astype(bool).sum(), df_filtered['Risk_Bencana'].astype(bool).sum(), 
-                       df_filtered['Risk_Kumuh'].astype(bool).sum(), (df_filtered['Loan_per_HH']>50).sum()]
-        })
+        rf_data = region['risk_factors']
         st.bar_chart(rf_data.set_index('Faktor'))
 
     st.subheader("📋 Interpretasi Skor Risiko")
-    def interpret_risk(score):
-        if score > 80: return "⛔ KRITIS"
-        elif score > 60: return "⚠️ TINGGI"
-        elif score > 40: return "✋ SEDANG"
-        else: return "✅ RENDAH"
-    df_filtered['Interpretasi_Risiko'] = df_filtered['Final_Risk_Score'].apply(interpret_risk)
-    st.dataframe(df_filtered[['Desa', 'Final_Risk_Score', 'Interpretasi_Risiko']].sort_values('Final_Risk_Score', ascending=False), hide_index=True, use_container_width=True)
+    show_paged_table('risk_detail', ['Desa', 'Final_Risk_Score', 'Interpretasi_Risiko'], 'Final_Risk_Score')
+
+    # --- Simulasi kebijakan (what-if) atas komponen risiko yang sudah di-cache ---
+    with st.expander("🧪 Simulasi Kebijakan Risiko (What-If)"):
+        st.caption("Ubah bobot, batas saturasi dan penalti lingkungan; seluruh desa dihitung ulang tanpa reload data.")
+        col_w, col_p = st.columns(2)
+        with col_w:
+            w_sat = st.slider("Bobot Saturasi", 0.0, 1.0, DEFAULT_POLICY['weights']['sat'], 0.05)
+            w_eco = st.slider("Bobot Ekonomi", 0.0, 1.0, DEFAULT_POLICY['weights']['eco'], 0.05)
+            w_env = st.slider("Bobot Lingkungan", 0.0, 1.0, DEFAULT_POLICY['weights']['env'], 0.05)
+            sat_cap = st.slider("Batas Saturasi Loan_per_HH (Juta)", 5.0, 200.0, DEFAULT_POLICY['sat_cap'], 5.0)
+        with col_p:
+            penalties = {col: st.slider(f"Penalti {col.replace('Risk_', '')}", 0, 100, penalty, 5)
+                         for col, penalty in DEFAULT_POLICY['penalties'].items()}
+            if abs(w_sat + w_eco + w_env - 1) > 1e-9:
+                st.warning(f"⚠️ Total bobot {w_sat + w_eco + w_env:.2f} (baseline = 1.00)")
+
+        risk_model = dataset['risk_model']
+        policy = {'weights': {'sat': w_sat, 'eco': w_eco, 'env': w_env}, 'sat_cap': sat_cap, 'penalties': penalties}
+        with instrumentation.span('risk_simulation'):
+            scenario = risk_model.simulate(policy)
+
+        col_s1, col_s2, col_s3 = st.columns(3)
+        col_s1.metric("Rata-rata Skor Risiko (Semua Desa)", f"{scenario['avg_score']:.1f}",
+                      f"{scenario['avg_score'] - risk_model.baseline['avg_score']:+.1f}", delta_color="inverse")
+        col_s2.metric("Desa Berubah Kategori", f"{len(risk_model.changed(scenario)):,}")
+        col_s3.metric("High + Critical", f"{int(scenario['category_counts'][:2].sum()):,}",
+                      f"{int(scenario['category_counts'][:2].sum() - risk_model.baseline['category_counts'][:2].sum()):+,}",
+                      delta_color="inverse")
+
+        col_c1, col_c2 = st.columns(2)
+        with col_c1:
+            st.markdown("**Semua Desa**")
+            show_table('scenario_all', risk_model.compare(scenario), hide_index=True)
+        with col_c2:
+            st.markdown(f"**{selected_kab}**")
+            show_table('scenario_region', risk_model.compare(scenario, df_filtered.index.to_numpy()), hide_index=True)
+        st.markdown("**Kuadran × Kategori Risiko (Skenario)**")
+        show_table('scenario_quadrants', risk_model.quadrant_table(scenario))
 
 # ================= TAB 5: PENGECEKAN KEWAJARAN (VALIDATION ENGINE) =================
-with tab5:
+with tab5, instrumentation.span('tab5_kewajaran'):
     st.markdown("### ✅ Pengecekan Tingkat Kewajaran (Validation Engine)")
     st.info("Pilih metode input sektor: Manual (Dropdown) atau AI (Free Text).")
 
@@ -395,6 +456,7 @@ with tab5:
     ref_l3 = dataset['level3']
     ref_l2 = dataset['level2']
     ref_l1 = dataset['level1']
+    kewajaran = dataset['kewajaran']
 
     # --- 1. LOKASI SELECTION (COMMON) ---
     with st.container():
@@ -434,26 +496,20 @@ with tab5:
             suggested_options = []
             if user_query:
                 # Prioritize filtered location data
-                relevant_data = ref_l3[ref_l3['Provinsi Usaha'] == sel_prov]
-                unique_subs = relevant_data['Sub Sektor Ekonomi'].dropna().unique().tolist()
-                
-                matches = difflib.get_close_matches(user_query, unique_subs, n=3, cutoff=0.3)
-                if matches:
-                    suggested_options = matches
-                else:
-                    all_subs = ref_l3['Sub Sektor Ekonomi'].dropna().unique().tolist()
-                    suggested_options = difflib.get_close_matches(user_query, all_subs, n=3, cutoff=0.3)
+                search_idx = dataset['sub_sector_search']
+                suggested_options = search_idx.search(user_query, n=3, cutoff=0.3, scope=sel_prov)
+                if not suggested_options:
+                    suggested_options = search_idx.search(user_query, n=3, cutoff=0.3)
 
             if suggested_options:
                 st.success(f"🤖 **Rekomendasi AI:** Ditemukan {len(suggested_options)} sub-sektor.")
                 selected_sub_sector = st.radio("Pilih yang Sesuai:", suggested_options)
                 
                 if selected_sub_sector:
-                    try:
-                        found_row = ref_l3[ref_l3['Sub Sektor Ekonomi'] == selected_sub_sector].iloc[0]
-                        selected_sector = found_row['Sektor Ekonomi']
+                    selected_sector = dataset['sub_sector_search'].parent(selected_sub_sector)
+                    if selected_sector is not None:
                         st.caption(f"ℹ️ Sektor Induk: **{selected_sector}**")
-                    except:
+                    else:
                         selected_sector = ref_l3['Sektor Ekonomi'].iloc[0]
             elif user_query:
                 st.warning("⚠️ AI tidak menemukan kecocokan. Coba kata kunci lain atau gunakan mode 'Pilih dari List'.")
@@ -479,21 +535,20 @@ with tab5:
         if btn_check:
             st.markdown("### 📊 Hasil Analisa Multi-Level")
             
-            def render_level_check(level_name, dataset, query_mask, inputs):
-                match = dataset[query_mask]
-                if match.empty: return None
+            def render_level_check(level_name, result):
+                if result is None: return None
                 
-                row = match.iloc[0]
+                row = result['thresholds']
                 max_omzet = row['OMZET_MAX_WAJAR']
                 max_hpp = row['HPP_MAX_WAJAR']
                 max_laba = row['LABA_MAX_WAJAR']
                 max_plafond = row['PLAFOND_MAX_WAJAR']
                 
-                status_omzet = "✅ WAJAR" if inputs['omzet'] <= max_omzet else "❌ TIDAK WAJAR"
-                status_hpp = "✅ WAJAR" if inputs['hpp'] <= max_hpp else "❌ TIDAK WAJAR"
-                status_laba = "✅ WAJAR" if inputs['laba'] <= max_laba else "❌ TIDAK WAJAR"
+                status_omzet = "✅ WAJAR" if result['checks']['omzet'] else "❌ TIDAK WAJAR"
+                status_hpp = "✅ WAJAR" if result['checks']['hpp'] else "❌ TIDAK WAJAR"
+                status_laba = "✅ WAJAR" if result['checks']['laba'] else "❌ TIDAK WAJAR"
                 
-                is_all_valid = (inputs['omzet'] <= max_omzet) and (inputs['hpp'] <= max_hpp) and (inputs['laba'] <= max_laba)
+                is_all_valid = result['is_valid']
                 
                 badge_color = "#e8f5e9" if is_all_valid else "#ffebee"
                 badge_text_color = "#2e7d32" if is_all_valid else "#c62828"
@@ -519,16 +574,14 @@ with tab5:
                 """
                 return html
 
-            inputs = {'omzet': in_omzet, 'hpp': in_hpp, 'laba': in_laba}
-            
-            mask1 = (ref_l1['Provinsi Usaha'] == sel_prov) & (ref_l1['Sektor Ekonomi'] == selected_sector)
-            res1 = render_level_check("Level 1: Provinsi & Sektor", ref_l1, mask1, inputs)
-            
-            mask2 = (ref_l2['Provinsi Usaha'] == sel_prov) & (ref_l2['Sektor Ekonomi'] == selected_sector) & (ref_l2['Sub Sektor Ekonomi'] == selected_sub_sector)
-            res2 = render_level_check("Level 2: Provinsi & Sub Sektor", ref_l2, mask2, inputs)
+            # Plafond tidak diinput: hanya ditampilkan sebagai batas wajar
+            with instrumentation.span('validation'):
+                results = kewajaran.validate(sel_prov, sel_kab, selected_sector, selected_sub_sector,
+                                             omzet=in_omzet, hpp=in_hpp, laba=in_laba)
             
-            mask3 = (ref_l3['Provinsi Usaha'] == sel_prov) & (ref_l3['Kabupaten/kota'] == sel_kab) & (ref_l3['Sektor Ekonomi'] == selected_sector) & (ref_l3['Sub Sektor Ekonomi'] == selected_sub_sector)
-            res3 = render_level_check(f"Level 3: {sel_kab} & Sub Sektor", ref_l3, mask3, inputs)
+            res1 = render_level_check("Level 1: Provinsi & Sektor", results['level1'])
+            res2 = render_level_check("Level 2: Provinsi & Sub Sektor", results['level2'])
+            res3 = render_level_check(f"Level 3: {sel_kab} & Sub Sektor", results['level3'])
             
             if res1: st.markdown(res1, unsafe_allow_html=True)
             if res2: st.markdown(res2, unsafe_allow_html=True)
@@ -537,6 +590,76 @@ with tab5:
             if not (res1 or res2 or res3):
                 st.warning("⚠️ Data benchmark tidak ditemukan untuk kombinasi ini.")
 
+    # --- 5. BATCH VALIDATION (UPLOAD FILE) ---
+    st.markdown("---")
+    st.markdown("#### 📂 Validasi Batch (Upload File Pengajuan)")
+    st.caption(f"Kolom wajib: {', '.join(batch_validation.KEY_COLUMNS + list(batch_validation.VALUE_COLUMNS))}")
+    batch_file = st.file_uploader("Upload file pengajuan (.csv / .xlsx)", type=['csv', 'xlsx'])
+    if batch_file is not None:
+        try:
+            with instrumentation.span('batch_validation'):
+                batch_summary, batch_csv = instrumentation.track_cache(
+                    'run_batch_validation', run_batch_validation, batch_file.getvalue(), batch_file.name, snapshot.version)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            instrumentation.record_payload('batch_csv', batch_csv)
+            show_table('batch_summary', batch_summary, hide_index=True)
+            st.download_button("⬇️ Download Hasil Validasi (CSV)", batch_csv,
+                               file_name=f"hasil_validasi_{batch_file.name.rsplit('.', 1)[0]}.csv", mime='text/csv')
+
+# ================= TAB 6: RADIUS CABANG (SPATIAL INDEX) =================
+with tab6, instrumentation.span('tab6_radius'):
+    st.markdown("### 📡 Desa di Sekitar Lokasi Cabang")
+    st.caption("Query atas seluruh desa (tidak terbatas filter wilayah di sidebar).")
+    spatial_index = dataset['spatial_index']
+
+    col_loc1, col_loc2, col_loc3 = st.columns(3)
+    # Default: titik tengah wilayah yang sedang dipilih
+    with col_loc1:
+        branch_lat = st.number_input("Latitude Cabang", value=round(float(df_filtered['lat'].mean()), 5), format="%.5f")
+    with col_loc2:
+        branch_lon = st.number_input("Longitude Cabang", value=round(float(df_filtered['lon'].mean()), 5), format="%.5f")
+    with col_loc3:
+        query_mode = st.radio("Jenis Query", ["Radius (km)", "N Desa Terdekat"], horizontal=True)
+
+    col_q1, col_q2 = st.columns(2)
+    with col_q1:
+        if query_mode == "Radius (km)":
+            radius_km = st.slider("Radius (km)", 1, 50, 10)
+        else:
+            n_nearest = st.number_input("Jumlah Desa", min_value=1, max_value=500, value=20)
+    with col_q2:
+        quadrants = st.multiselect("Kuadran Strategi", scoring.QUADRANTS, default=[scoring.QUADRANTS[0]])
+
+    with instrumentation.span('spatial_query'):
+        quadrant_mask = dataset['main']['Strategy_Quadrant'].isin(quadrants).to_numpy()
+        if query_mode == "Radius (km)":
+            nearby = spatial_index.within(branch_lat, branch_lon, radius_km, mask=quadrant_mask)
+        else:
+            nearby = spatial_index.nearest(branch_lat, branch_lon, int(n_nearest), mask=quadrant_mask)
+
+    col_n1, col_n2, col_n3 = st.columns(3)
+    col_n1.metric("Jumlah Desa", f"{len(nearby):,}")
+    col_n2.metric("Est. KK Belum Terlayani", f"{int(nearby['Est_Unserved_KK'].sum()):,}")
+    col_n3.metric("Jarak Terjauh", f"{nearby['Jarak_km'].max():.1f} km" if len(nearby) else "-")
+
+    if len(nearby):
+        nearby_points = nearby[['lat', 'lon', 'color_pot_hex']].astype({'lat': float, 'lon': float})
+        instrumentation.record_payload('map_radius', nearby_points)
+        st.map(nearby_points, latitude='lat', longitude='lon', color='color_pot_hex', size=30)
+        show_table('radius_detail', nearby[['Desa', 'Kecamatan', 'Kabupaten', 'Strategy_Quadrant', 'Est_Unserved_KK', 'Jarak_km']]
+                   .round({'Jarak_km': 2}), hide_index=True)
+    else:
+        st.info("Tidak ada desa yang cocok di sekitar lokasi ini.")
+
 # Footer
 st.markdown("---")
 st.caption("MRM Intelligence Framework | AI Sector Matching Enabled")
+
+instrumentation.REGISTRY.set('geo_dataset_version', snapshot.version)
+instrumentation.REGISTRY.set('geo_region_cache_lookups', region_cache.hits, result='hit')
+instrumentation.REGISTRY.set('geo_region_cache_lookups', region_cache.misses, result='miss')
+instrumentation.finish_run()
+if admin_mode:
+    instrumentation.render_admin_panel(run_trace, st.sidebar)
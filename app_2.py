@@ -1,28 +1,44 @@
 import streamlit as st
-import pandas as pd
+import io
+
+import batch_validation
+import data_engine
+import instrumentation
+import partitioned_executor
+from kewajaran_engine import METRICS, KewajaranEngine
 
 # Konfigurasi Halaman
 st.set_page_config(page_title="Aplikasi Penilaian Kewajaran - BRI", layout="wide")
 
+# Timing per tahap rerun (lihat instrumentation); panel admin via ?admin=1
+admin_mode = instrumentation.admin_enabled(st.query_params)
+run_trace = instrumentation.start_run('app_2', measure_payloads=admin_mode)
+instrumentation.serve_metrics()
+
 # --- 1. Fungsi Load Data ---
-@st.cache_data
+@st.cache_resource
 def load_data():
-    # Pastikan nama file sesuai dengan yang ada di folder data Anda
+    # Satu salinan read-only dipakai bersama semua sesi (tanpa copy per rerun).
+    # Sheet dinormalisasi & di-cache oleh data_engine (sama dengan app.py);
+    # workbook Excel dipakai jika ada, selain itu ekspor CSV di folder data/
+    instrumentation.cache_miss('load_data')
     try:
-        df_l1 = pd.read_csv("data/Kewajaran_Omzet_All.xlsx - Level 1.csv")
-        df_l2 = pd.read_csv("data/Kewajaran_Omzet_All.xlsx - Level 2.csv")
-        df_l3 = pd.read_csv("data/Kewajaran_Omzet_All.xlsx - Level 3.csv")
-        
-        # Bersihkan nama kolom agar seragam (menghapus spasi tambahan jika ada)
-        for df in [df_l1, df_l2, df_l3]:
-            df.columns = df.columns.str.strip()
-            
-        return df_l1, df_l2, df_l3
+        levels = data_engine.load_levels()
+        df_l1, df_l2, df_l3 = levels['level1'], levels['level2'], levels['level3']
+        return df_l1, df_l2, df_l3, KewajaranEngine.from_levels(df_l1, df_l2, df_l3)
     except FileNotFoundError as e:
         st.error(f"File data tidak ditemukan: {e}")
-        return None, None, None
+        return None, None, None, None
+
+with instrumentation.span('data_load'):
+    df_level_1, df_level_2, df_level_3, kewajaran = instrumentation.track_cache('load_data', load_data)
 
-df_level_1, df_level_2, df_level_3 = load_data()
+@st.cache_data(max_entries=4)
+def run_batch_validation(file_bytes, filename):
+    instrumentation.cache_miss('run_batch_validation')
+    apps = batch_validation.read_applications(io.BytesIO(file_bytes), filename)
+    result = partitioned_executor.validate_batch(apps, df_level_1, df_level_2, df_level_3)
+    return batch_validation.summarize(result), batch_validation.to_csv_bytes(result)
 
 if df_level_1 is not None:
     # --- 2. Sidebar: Input Data Wilayah & Sektor ---
@@ -66,36 +82,22 @@ if df_level_1 is not None:
 
         # --- LOGIKA PENCARIAN DATA REFERENSI ---
         
-        # 1. Cari Data Level 3 (Paling Spesifik: Sektor, SubSektor, Prov, Kota)
-        ref_l3 = df_level_3[
-            (df_level_3['Sektor Ekonomi'] == selected_sektor) &
-            (df_level_3['Sub Sektor Ekonomi'] == selected_sub_sektor) &
-            (df_level_3['Provinsi Usaha'] == selected_provinsi) &
-            (df_level_3['Kabupaten/kota'] == selected_kota)
-        ]
-
-        # 2. Cari Data Level 2 (Menengah: Sektor, SubSektor, Prov)
-        ref_l2 = df_level_2[
-            (df_level_2['Sektor Ekonomi'] == selected_sektor) &
-            (df_level_2['Sub Sektor Ekonomi'] == selected_sub_sektor) &
-            (df_level_2['Provinsi Usaha'] == selected_provinsi)
-        ]
-
-        # 3. Cari Data Level 1 (Umum: Sektor, Prov)
-        ref_l1 = df_level_1[
-            (df_level_1['Sektor Ekonomi'] == selected_sektor) &
-            (df_level_1['Provinsi Usaha'] == selected_provinsi)
-        ]
+        # Level 3 (Sektor, SubSektor, Prov, Kota), Level 2 (Sektor, SubSektor, Prov),
+        # Level 1 (Sektor, Prov) dicek sekaligus oleh engine
+        with instrumentation.span('validation'):
+            results = kewajaran.validate(selected_provinsi, selected_kota, selected_sektor, selected_sub_sektor,
+                                         omzet=input_omset, hpp=input_hpp, laba=input_laba, plafond=input_plafond)
+        ref_l3, ref_l2, ref_l1 = results['level3'], results['level2'], results['level1']
 
         # --- FUNGSI PEMBANTU UNTUK MENAMPILKAN STATUS ---
-        def display_status(label, input_val, ref_df, col_max):
-            if ref_df.empty:
+        def display_status(result, metric_key):
+            if result is None:
                 return "Data Tidak Tersedia", "grey", 0
             
-            max_val = ref_df.iloc[0][col_max]
+            max_val = result['thresholds'][METRICS[metric_key]]
             
             # Logika Warna dan Status
-            if input_val <= max_val:
+            if result['checks'][metric_key]:
                 return "WAJAR (Pass)", "green", max_val
             else:
                 return "TIDAK WAJAR (Over)", "red", max_val
@@ -108,59 +110,82 @@ if df_level_1 is not None:
         # --- LEVEL 3 ---
         with cols[0]:
             st.markdown("### 🏙️ Level 3\n(Spesifik Kota/Kab)")
-            if ref_l3.empty:
+            if ref_l3 is None:
                 st.warning("Data referensi Level 3 tidak ditemukan untuk kombinasi ini.")
             else:
-                for metric, val, col_name in [
-                    ("Omset", input_omset, 'OMZET_MAX_WAJAR'),
-                    ("HPP", input_hpp, 'HPP_MAX_WAJAR'),
-                    ("Laba", input_laba, 'LABA_MAX_WAJAR'),
-                    ("Plafond", input_plafond, 'PLAFOND_MAX_WAJAR')
+                for metric, val, metric_key in [
+                    ("Omset", input_omset, 'omzet'),
+                    ("HPP", input_hpp, 'hpp'),
+                    ("Laba", input_laba, 'laba'),
+                    ("Plafond", input_plafond, 'plafond')
                 ]:
-                    status, color, max_limit = display_status(metric, val, ref_l3, col_name)
+                    status, color, max_limit = display_status(ref_l3, metric_key)
                     st.markdown(f"**{metric}**")
-                    st.markdown(f"Input: {:,.0f}".format(val))
-                    st.markdown(f"Max: {:,.0f}".format(max_limit))
+                    st.markdown("Input: {:,.0f}".format(val))
+                    st.markdown("Max: {:,.0f}".format(max_limit))
                     st.markdown(f":{color}[{status}]")
                     st.divider()
 
         # --- LEVEL 2 ---
         with cols[1]:
             st.markdown("### 🗺️ Level 2\n(Provinsi & Sub Sektor)")
-            if ref_l2.empty:
+            if ref_l2 is None:
                 st.warning("Data referensi Level 2 tidak ditemukan.")
             else:
-                for metric, val, col_name in [
-                    ("Omset", input_omset, 'OMZET_MAX_WAJAR'),
-                    ("HPP", input_hpp, 'HPP_MAX_WAJAR'),
-                    ("Laba", input_laba, 'LABA_MAX_WAJAR'),
-                    ("Plafond", input_plafond, 'PLAFOND_MAX_WAJAR')
+                for metric, val, metric_key in [
+                    ("Omset", input_omset, 'omzet'),
+                    ("HPP", input_hpp, 'hpp'),
+                    ("Laba", input_laba, 'laba'),
+                    ("Plafond", input_plafond, 'plafond')
                 ]:
-                    status, color, max_limit = display_status(metric, val, ref_l2, col_name)
+                    status, color, max_limit = display_status(ref_l2, metric_key)
                     st.markdown(f"**{metric}**")
-                    st.markdown(f"Input: {:,.0f}".format(val))
-                    st.markdown(f"Max: {:,.0f}".format(max_limit))
+                    st.markdown("Input: {:,.0f}".format(val))
+                    st.markdown("Max: {:,.0f}".format(max_limit))
                     st.markdown(f":{color}[{status}]")
                     st.divider()
 
         # --- LEVEL 1 ---
         with cols[2]:
             st.markdown("### 🏢 Level 1\n(Provinsi & Sektor Umum)")
-            if ref_l1.empty:
+            if ref_l1 is None:
                 st.warning("Data referensi Level 1 tidak ditemukan.")
             else:
-                for metric, val, col_name in [
-                    ("Omset", input_omset, 'OMZET_MAX_WAJAR'),
-                    ("HPP", input_hpp, 'HPP_MAX_WAJAR'),
-                    ("Laba", input_laba, 'LABA_MAX_WAJAR'),
-                    ("Plafond", input_plafond, 'PLAFOND_MAX_WAJAR')
+                for metric, val, metric_key in [
+                    ("Omset", input_omset, 'omzet'),
+                    ("HPP", input_hpp, 'hpp'),
+                    ("Laba", input_laba, 'laba'),
+                    ("Plafond", input_plafond, 'plafond')
                 ]:
-                    status, color, max_limit = display_status(metric, val, ref_l1, col_name)
+                    status, color, max_limit = display_status(ref_l1, metric_key)
                     st.markdown(f"**{metric}**")
-                    st.markdown(f"Input: {:,.0f}".format(val))
-                    st.markdown(f"Max: {:,.0f}".format(max_limit))
+                    st.markdown("Input: {:,.0f}".format(val))
+                    st.markdown("Max: {:,.0f}".format(max_limit))
                     st.markdown(f":{color}[{status}]")
                     st.divider()
 
     else:
         st.info("Silakan pilih parameter di sidebar dan tekan 'Cek Kewajaran' untuk melihat hasil.")
+
+    # --- 5. Validasi Batch (Upload File) ---
+    st.markdown("---")
+    st.subheader("📂 Validasi Batch")
+    st.caption(f"Kolom wajib: {', '.join(batch_validation.KEY_COLUMNS + list(batch_validation.VALUE_COLUMNS))}")
+    batch_file = st.file_uploader("Upload file pengajuan (.csv / .xlsx)", type=['csv', 'xlsx'])
+    if batch_file is not None:
+        try:
+            with instrumentation.span('batch_validation'):
+                batch_summary, batch_csv = instrumentation.track_cache(
+                    'run_batch_validation', run_batch_validation, batch_file.getvalue(), batch_file.name)
+        except ValueError as e:
+            st.error(f"File tidak valid: {e}")
+        else:
+            instrumentation.record_payload('batch_summary', batch_summary)
+            instrumentation.record_payload('batch_csv', batch_csv)
+            st.dataframe(batch_summary, hide_index=True, use_container_width=True)
+            st.download_button("⬇️ Download Hasil Validasi (CSV)", batch_csv,
+                               file_name=f"hasil_validasi_{batch_file.name.rsplit('.', 1)[0]}.csv", mime='text/csv')
+
+instrumentation.finish_run()
+if admin_mode:
+    instrumentation.render_admin_panel(run_trace, st.sidebar)
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from benchmark_index import LEVEL_KEYS, THRESHOLD_COLUMNS
+from data_engine import SECTOR_MAP, SUB_SECTOR_MAP
+
+# -----------------------------------------------------------------------------
+# BATCH VALIDATION (PENGECEKAN KEWAJARAN MASSAL)
+# -----------------------------------------------------------------------------
+# Memvalidasi file pengajuan harian (puluhan ribu baris) sekaligus: setiap level
+# benchmark di-join ke file upload dengan satu merge vectorized, lalu status
+# WAJAR / TIDAK WAJAR dihitung per kolom dengan np.where.
+
+KEY_COLUMNS = ['Provinsi Usaha', 'Kabupaten/kota', 'Sektor Ekonomi', 'Sub Sektor Ekonomi']
+
+# Kolom nilai pada file upload -> kolom batas pada sheet benchmark
+VALUE_COLUMNS = {
+    'Omzet': 'OMZET_MAX_WAJAR',
+    'HPP': 'HPP_MAX_WAJAR',
+    'Laba': 'LABA_MAX_WAJAR',
+    'Plafond': 'PLAFOND_MAX_WAJAR',
+}
+
+LEVEL_PREFIX = {'level1': 'L1', 'level2': 'L2', 'level3': 'L3'}
+
+STATUS_PASS = 'WAJAR'
+STATUS_FAIL = 'TIDAK WAJAR'
+STATUS_MISSING = 'DATA TIDAK TERSEDIA'
+
+
+def read_applications(file, filename=''):
+    """Read an uploaded .csv / .xlsx application file."""
+    if str(filename).lower().endswith(('.xlsx', '.xls')):
+        apps = pd.read_excel(file)
+    else:
+        apps = pd.read_csv(file)
+    apps.columns = apps.columns.str.strip()
+    return apps
+
+
+def normalize_applications(apps, remap_sectors=True):
+    """Check required columns and align sector labels with the benchmark sheets."""
+    missing = [c for c in KEY_COLUMNS + list(VALUE_COLUMNS) if c not in apps.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+
+    apps = apps.copy()
+    for col in KEY_COLUMNS:
+        apps[col] = apps[col].astype(str).str.strip()
+    if remap_sectors:
+        # Benchmark (data_engine.preprocess_levels) memakai label sektor hasil rephrasing
+        apps['Sektor Ekonomi'] = apps['Sektor Ekonomi'].replace(SECTOR_MAP)
+        apps['Sub Sektor Ekonomi'] = apps['Sub Sektor Ekonomi'].replace(SUB_SECTOR_MAP)
+    for col in VALUE_COLUMNS:
+        apps[col] = pd.to_numeric(apps[col], errors='coerce')
+    return apps
+
+
+def _benchmark_table(ref, key_cols, prefix):
+    cols = [c for c in THRESHOLD_COLUMNS if c in ref.columns]
+    table = ref[key_cols + cols].copy()
+    for col in key_cols:
+        table[col] = table[col].astype(str).str.strip()
+    # Dedup setelah normalisasi: ' A' dan 'A' adalah kunci yang sama saat merge
+    table = table.drop_duplicates(subset=key_cols, keep='first')
+    table[f"{prefix}_FOUND"] = True
+    return table.rename(columns={c: f"{prefix}_{c}" for c in cols})
+
+
+def validate_batch(apps, level1, level2, level3, remap_sectors=True):
+    """Return apps with per-metric and per-level WAJAR flags for Level 1/2/3."""
+    apps = normalize_applications(apps, remap_sectors)
+    frames = {'level1': level1, 'level2': level2, 'level3': level3}
+    result = apps
+
+    for lvl, key_cols in LEVEL_KEYS.items():
+        prefix = LEVEL_PREFIX[lvl]
+        table = _benchmark_table(frames[lvl], key_cols, prefix)
+        # Benchmark sudah unik per kunci -> merge tidak menggandakan baris
+        result = result.merge(table, on=key_cols, how='left', sort=False)
+
+        found = result.pop(f"{prefix}_FOUND").notna().to_numpy()
+        level_ok = np.ones(len(result), dtype=bool)
+        for value_col, max_col in VALUE_COLUMNS.items():
+            limit_col = f"{prefix}_{max_col}"
+            if limit_col not in result.columns:
+                continue
+            limit = result[limit_col].to_numpy(dtype=float)
+            ok = result[value_col].to_numpy(dtype=float) <= limit
+            level_ok &= ok
+            result[f"{prefix}_{value_col}_STATUS"] = np.where(found, np.where(ok, STATUS_PASS, STATUS_FAIL), STATUS_MISSING)
+
+        result[f"{prefix}_STATUS"] = np.where(found, np.where(level_ok, STATUS_PASS, STATUS_FAIL), STATUS_MISSING)
+
+    return result
+
+
+def to_csv_bytes(df):
+    """CSV export for st.download_button (which needs the whole payload as bytes)."""
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def summarize(result):
+    """Count WAJAR / TIDAK WAJAR / missing per level for the results panel."""
+    rows = []
+    for lvl, prefix in LEVEL_PREFIX.items():
+        counts = result[f"{prefix}_STATUS"].value_counts()
+        rows.append({
+            'Level': prefix,
+            STATUS_PASS: int(counts.get(STATUS_PASS, 0)),
+            STATUS_FAIL: int(counts.get(STATUS_FAIL, 0)),
+            STATUS_MISSING: int(counts.get(STATUS_MISSING, 0)),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import batch_validation
+import chart_data
+import data_grid
+import data_engine
+import map_layers
+import partitioned_executor
+import scoring
+import synthetic_data
+from kewajaran_engine import KewajaranEngine
+from rank_index import RankIndex
+from region_aggregates import compute_region_view
+from region_index import RegionIndex
+from rollup_cube import RollupCube
+from risk_simulator import DEFAULT_POLICY, RiskScenarioModel
+from sector_search import SubSectorSearch
+from spatial_index import SpatialIndex
+
+# -----------------------------------------------------------------------------
+# BENCHMARK HARNESS
+# -----------------------------------------------------------------------------
+# Mengukur tahap-tahap utama dashboard atas data sintetis (synthetic_data)
+# pada beberapa skala: load CSV + scoring, workbook benchmark, cache Arrow,
+# filter wilayah, agregasi, query spasial, fuzzy search dan validasi kewajaran. Per tahap
+# dilaporkan durasi, throughput (item/detik) dan puncak alokasi Python/NumPy
+# (tracemalloc; alokasi internal Arrow tidak ikut terhitung).
+#
+#   python benchmark.py --scales 10k 100k --json bench_output.json
+#
+# Data dibuat sekali per skala di --data-dir dan dipakai ulang pada run
+# berikutnya (seed tetap), sehingga hasil antar commit bisa dibandingkan.
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+DEFAULT_SCALES = ['10k', '100k']
+DEFAULT_DATA_DIR = 'bench_data'
+
+SINGLE_VALIDATIONS = 2_000
+FUZZY_QUERIES = 500
+CHART_REGIONS = 20
+SPATIAL_QUERIES = 500
+SPATIAL_RADIUS_KM = 10
+MAP_ZOOM = 8
+
+
+class Recorder:
+    """Runs stages and collects one result row per stage."""
+
+    def __init__(self, scale, track_memory=True):
+        self.scale = scale
+        self.track_memory = track_memory
+        self.rows = []
+
+    def run(self, stage, items, fn, *args, **kwargs):
+        if self.track_memory:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1] if self.track_memory else None
+            if self.track_memory:
+                tracemalloc.stop()
+        self.rows.append({
+            'scale': self.scale,
+            'stage': stage,
+            'items': items,
+            'seconds': round(seconds, 4),
+            'items_per_s': round(items / seconds) if seconds > 0 else None,
+            'peak_mb': round(peak / 1e6, 1) if peak is not None else None,
+        })
+        return result
+
+
+def _ensure_data(data_dir, scale, n_desa):
+    out_dir = os.path.join(data_dir, scale)
+    csv_path = os.path.join(out_dir, data_engine.MAIN_CSV)
+    excel_path = os.path.join(out_dir, data_engine.BENCHMARK_XLSX)
+    if not (os.path.exists(csv_path) and os.path.exists(excel_path)):
+        print(f"[{scale}] membuat data sintetis ({n_desa:,} desa)...", file=sys.stderr)
+        synthetic_data.write_dataset(out_dir, n_desa)
+    return csv_path, excel_path
+
+
+def _fuzzy_queries(labels, n, seed=0):
+    """Lower-cased labels with one character dropped (typo-like queries)."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(labels, n)
+    queries = []
+    for label in picks:
+        label = label.lower()
+        cut = int(rng.integers(0, len(label)))
+        queries.append(label[:cut] + label[cut + 1:])
+    return queries
+
+
+def _region_selects(index):
+    """One (kabupaten, half of its kecamatan) selection per kabupaten."""
+    return [(kab, index.kecamatan_options[kab][::2]) for kab in index.kabupaten_options]
+
+
+def bench_scale(scale, n_desa, data_dir, track_memory=True, workers=None):
+    csv_path, excel_path = _ensure_data(data_dir, scale, n_desa)
+    rec = Recorder(scale, track_memory)
+
+    # --- Load & scoring ---
+    main = rec.run('csv_load_preprocess', n_desa, data_engine.build_main, csv_path)
+    rec.run('csv_load_chunked', n_desa, data_engine.build_main, csv_path, chunksize=max(n_desa // 4, 1))
+    levels = rec.run('benchmark_load', 3, data_engine.load_benchmark, excel_path)
+
+    raw = main[['Skor_Potensi', 'Loan_per_HH', 'Risk_Kumuh', 'Risk_Bencana', 'Risk_Konflik']].astype(float)
+    rec.run('scoring', n_desa, scoring.score_frame, raw.copy())
+    rec.run('scoring_parallel', n_desa, partitioned_executor.score_frame, raw.copy(), workers=workers, min_rows=0)
+    model = rec.run('risk_model', n_desa, RiskScenarioModel, main)
+    policy = {**DEFAULT_POLICY, 'weights': {'sat': 0.5, 'eco': 0.2, 'env': 0.3}, 'sat_cap': 30.0}
+    rec.run('risk_simulation', n_desa, model.simulate, policy)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        data = {'main': main, **levels}
+        rec.run('cache_write', n_desa, data_engine.write_cache, data, cache_dir, 'bench')
+        rec.run('cache_read', n_desa, data_engine.read_cache, cache_dir, 'bench')
+
+    # --- Filter & agregasi wilayah ---
+    index = rec.run('region_index', n_desa, RegionIndex, main)
+    selects = _region_selects(index)
+    rec.run('filter', len(selects), lambda: [index.select(kab, kecs) for kab, kecs in selects])
+    views = rec.run('region_aggregation', len(selects),
+                    lambda: [compute_region_view(index, kab, kecs) for kab, kecs in selects])
+    cube = rec.run('rollup_cube', n_desa, RollupCube, main)
+    rec.run('region_aggregation_cube', len(selects),
+            lambda: [compute_region_view(index, kab, kecs, cube) for kab, kecs in selects])
+    rec.run('kabupaten_rollup', len(index.kabupaten_options), cube.by_kabupaten)
+    ranks = rec.run('rank_index', n_desa, RankIndex, main)
+    rec.run('leaderboard_top', len(selects),
+            lambda: [ranks.top_positions('Est_Unserved_KK', 20, kab, 'Hidden Gem (Grow)', kecs) for kab, kecs in selects])
+    frames = [view['frame'] for view in views[:CHART_REGIONS]]
+    rec.run('chart_data', len(frames), lambda: [chart_data.build_chart_data(f) for f in frames])
+    orders = rec.run('grid_sort', len(frames), lambda: [data_grid.sort_order(f, 'Final_Risk_Score', False) for f in frames])
+    rec.run('grid_page', len(frames), lambda: [data_grid.page_frame(f, o, 1, data_grid.DEFAULT_PAGE_SIZE, list(f.columns))
+                                               for f, o in zip(frames, orders)])
+    rec.run('map_grid', n_desa, map_layers.aggregate_grid, main, MAP_ZOOM)
+
+    # --- Query spasial (radius / N terdekat di sekitar desa acak) ---
+    spatial = rec.run('spatial_index', n_desa, SpatialIndex, main)
+    points = main[['lat', 'lon']].sample(SPATIAL_QUERIES, replace=True, random_state=0).to_numpy(dtype=float)
+    rec.run('spatial_radius', len(points), lambda: [spatial.query_radius(lat, lon, SPATIAL_RADIUS_KM) for lat, lon in points])
+    rec.run('spatial_nearest', len(points), lambda: [spatial.query_nearest(lat, lon, 20) for lat, lon in points])
+
+    # --- Fuzzy search ---
+    search = rec.run('fuzzy_index', len(levels['level3']), SubSectorSearch.from_frame, levels['level3'])
+    queries = _fuzzy_queries(levels['level3']['Sub Sektor Ekonomi'].unique(), FUZZY_QUERIES)
+    rec.run('fuzzy_search', len(queries), lambda: [search.search(q, n=3, cutoff=0.3) for q in queries])
+
+    # --- Validasi kewajaran ---
+    engine = rec.run('validation_index', len(levels['level3']), KewajaranEngine.from_levels,
+                     levels['level1'], levels['level2'], levels['level3'])
+    keys = levels['level3'][['Provinsi Usaha', 'Kabupaten/kota', 'Sektor Ekonomi', 'Sub Sektor Ekonomi']]
+    keys = keys.sample(SINGLE_VALIDATIONS, replace=True, random_state=0).itertuples(index=False)
+    keys = list(keys)
+    rec.run('validate_single', len(keys),
+            lambda: [engine.validate(*k, omzet=1e8, hpp=6e7, laba=3e7, plafond=5e7) for k in keys])
+
+    n_apps = max(n_desa // 10, 1_000)
+    apps = synthetic_data.generate_applications(synthetic_data.generate_levels(n_desa), n_apps)
+    result = rec.run('validate_batch', n_apps, batch_validation.validate_batch,
+                     apps, levels['level1'], levels['level2'], levels['level3'])
+    rec.run('validate_batch_parallel', n_apps, partitioned_executor.validate_batch,
+            apps, levels['level1'], levels['level2'], levels['level3'], workers=workers, min_rows=0)
+    rec.run('batch_csv_export', n_apps, batch_validation.to_csv_bytes, result)
+    return rec.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tahap-tahap dashboard atas data sintetis")
+    parser.add_argument('--scales', nargs='+', default=DEFAULT_SCALES, choices=list(SCALES))
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--json', help="tulis hasil ke file JSON")
+    parser.add_argument('--workers', type=int, help="jumlah proses untuk tahap *_parallel (default: jumlah CPU)")
+    parser.add_argument('--no-memory', action='store_true', help="tanpa tracemalloc (timing lebih akurat)")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for scale in args.scales:
+        rows.extend(bench_scale(scale, SCALES[scale], args.data_dir,
+                                track_memory=not args.no_memory, workers=args.workers))
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\nPeak RSS proses: {max_rss_mb:,.0f} MB")
+
+    if args.json:
+        meta = {'python': sys.version.split()[0], 'pandas': pd.__version__, 'numpy': np.__version__,
+                'max_rss_mb': round(max_rss_mb, 1)}
+        with open(args.json, 'w') as f:
+            json.dump({'meta': meta, 'results': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# -----------------------------------------------------------------------------
+# BENCHMARK INDEX (PENGECEKAN KEWAJARAN)
+# -----------------------------------------------------------------------------
+# Lookup O(1) untuk batas kewajaran per level, menggantikan boolean mask
+# berantai atas seluruh sheet Level 1/2/3 pada setiap klik validasi.
+# Kunci mengikuti granularitas masing-masing sheet; jika ada baris duplikat,
+# baris pertama yang dipakai (sama seperti .iloc[0] sebelumnya).
+
+LEVEL_KEYS = {
+    'level1': ['Provinsi Usaha', 'Sektor Ekonomi'],
+    'level2': ['Provinsi Usaha', 'Sektor Ekonomi', 'Sub Sektor Ekonomi'],
+    'level3': ['Provinsi Usaha', 'Kabupaten/kota', 'Sektor Ekonomi', 'Sub Sektor Ekonomi'],
+}
+
+THRESHOLD_COLUMNS = ['OMZET_MAX_WAJAR', 'HPP_MAX_WAJAR', 'LABA_MAX_WAJAR', 'PLAFOND_MAX_WAJAR']
+
+
+def _build_level(df, key_cols):
+    cols = [c for c in THRESHOLD_COLUMNS if c in df.columns]
+    first = df.drop_duplicates(subset=key_cols, keep='first')
+    keys = zip(*(first[c].tolist() for c in key_cols))
+    values = first[cols].to_dict('records')
+    return dict(zip(keys, values))
+
+
+class BenchmarkIndex:
+    """Hash index of the *_MAX_WAJAR thresholds for the three benchmark levels."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    @classmethod
+    def from_levels(cls, level1, level2, level3):
+        frames = {'level1': level1, 'level2': level2, 'level3': level3}
+        return cls({lvl: _build_level(frames[lvl], key_cols) for lvl, key_cols in LEVEL_KEYS.items()})
+
+    def level1(self, provinsi, sektor):
+        return self.tables['level1'].get((provinsi, sektor))
+
+    def level2(self, provinsi, sektor, sub_sektor):
+        return self.tables['level2'].get((provinsi, sektor, sub_sektor))
+
+    def level3(self, provinsi, kabupaten, sektor, sub_sektor):
+        return self.tables['level3'].get((provinsi, kabupaten, sektor, sub_sektor))
+
+    def __len__(self):
+        return sum(len(t) for t in self.tables.values())
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# CHART DATA LAYER (PRE-AGGREGATED ALTAIR INPUTS)
+# -----------------------------------------------------------------------------
+# Sebelumnya df_filtered (semua baris, semua kolom) dikirim ke Vega 3-5 kali
+# per rerun dan alt.data_transformers.disable_max_rows() dipakai untuk
+# menghindari limit. Di sini bin, count, mean dan titik scatter dihitung di
+# pandas/NumPy dengan kolom yang dibutuhkan saja, sehingga ukuran payload
+# chart terbatas berapapun jumlah desanya.
+
+# Sama dengan limit default Altair (max_rows=5000)
+MAX_SCATTER_POINTS = 5000
+HIST_MAXBINS = 10
+SCATTER_COLUMNS = ['Desa', 'Skor_Potensi', 'Loan_per_HH', 'Strategy_Quadrant']
+
+
+def _nice_step(span, maxbins):
+    """Smallest 1/2/5 x 10^k step giving at most maxbins bins (like Vega bin)."""
+    if not np.isfinite(span) or span <= 0:
+        return 1.0
+    raw = span / maxbins
+    mag = 10 ** np.floor(np.log10(raw))
+    for m in (1, 2, 5, 10):
+        if m * mag >= raw:
+            return m * mag
+    return 10 * mag
+
+
+def histogram(values, maxbins=HIST_MAXBINS):
+    """Counts per nice-width bin as a bin_start / bin_end / count frame."""
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return pd.DataFrame({'bin_start': [], 'bin_end': [], 'count': []})
+    lo, hi = values.min(), values.max()
+    step = _nice_step(hi - lo, maxbins)
+    start = np.floor(lo / step) * step
+    stop = max(np.ceil(hi / step) * step, start + step)
+    # Titik tepat di batas atas masuk bin terakhir (sama seperti np.histogram)
+    edges = np.arange(start, stop + step / 2, step)
+    counts, edges = np.histogram(values, bins=edges)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
+
+
+def sample_points(df, max_points=MAX_SCATTER_POINTS, by='Strategy_Quadrant', seed=0):
+    """Deterministic stratified down-sample of the scatter columns."""
+    cols = [c for c in SCATTER_COLUMNS if c in df.columns]
+    points = df[cols]
+    if len(points) <= max_points:
+        return points
+    groups = points.groupby(by, observed=True).indices.values()
+    # Sisakan ruang untuk minimal 1 titik per grup agar total <= max_points
+    frac = (max_points - len(groups)) / len(points)
+    rng = np.random.default_rng(seed)
+    keep = [rng.choice(idx, size=max(1, int(len(idx) * frac)), replace=False) for idx in groups]
+    return points.iloc[np.sort(np.concatenate(keep))]
+
+
+def build_chart_data(df):
+    """Every payload the tab charts need, computed once per filter."""
+    return {
+        'scatter': sample_points(df),
+        'means': pd.DataFrame({'Skor_Potensi': [df['Skor_Potensi'].mean()],
+                               'Loan_per_HH': [df['Loan_per_HH'].mean()]}),
+        'hist_potensi': histogram(df['Skor_Potensi']),
+        'hist_loan': histogram(df['Loan_per_HH']),
+        'quadrant_counts': (df['Strategy_Quadrant'].value_counts(sort=False)
+                            .loc[lambda c: c > 0].rename_axis('Strategy_Quadrant').reset_index(name='count')),
+    }
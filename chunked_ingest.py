@@ -0,0 +1,209 @@
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import scoring
+from data_engine import COLUMN_PREFIX, RENAME_MAP, SECTOR_MAP, add_simulated_reviews, source_columns
+from data_schema import FIXED_CATEGORIES, apply_schema
+from region_index import SORT_KEYS
+
+# -----------------------------------------------------------------------------
+# CHUNKED INGESTION (CSV DESA SKALA NASIONAL)
+# -----------------------------------------------------------------------------
+# pd.read_csv atas seluruh file (semua kolom) tidak muat untuk ekstrak
+# podes/PDRB nasional. Pipeline ini membaca per chunk hanya kolom di
+# RENAME_MAP dan memproses dalam dua pass:
+#   1. strip prefix, rename, sector mapping, fillna, Loan_per_HH per chunk;
+#      tulis ke file staging Arrow sambil mengakumulasi statistik global
+#      (max/mean Skor_Potensi, mean Loan_per_HH).
+#   2. ambil baris staging (memory-map) dalam urutan wilayah (Kabupaten,
+#      Kecamatan) per batch, hitung skor/kuadran dengan statistik global
+#      (scoring.score_frame) lalu tulis output Arrow IPC yang sudah terurut.
+# read_output membangun frame ber-schema ringkas (data_schema) kolom per kolom
+# dari output yang di-memory-map. Selain frame hasil, puncak memori sebanding
+# dengan chunksize (plus kode wilayah & permutasi urutan, 8-16 byte per baris).
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Kolom teks dipaksa string agar chunk yang kebetulan kosong tidak menjadi float
+TEXT_COLUMNS = ['Kabupaten', 'Kecamatan', 'Desa', 'Sektor_Dominan']
+
+
+def iter_prepared_chunks(csv_path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield renamed, sector-mapped chunks with Loan_per_HH (no global scores yet)."""
+    usecols = source_columns(csv_path)
+    text_raw = [c for c in usecols if RENAME_MAP[c.replace(COLUMN_PREFIX, '')] in TEXT_COLUMNS]
+    numeric_raw = [c for c in usecols if c not in text_raw]
+    dtype = {**{c: str for c in text_raw}, **{c: 'float64' for c in numeric_raw}}
+
+    for chunk in pd.read_csv(csv_path, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        chunk.columns = [RENAME_MAP[c.replace(COLUMN_PREFIX, '')] for c in chunk.columns]
+        if 'Sektor_Dominan' in chunk.columns:
+            chunk['Sektor_Dominan'] = chunk['Sektor_Dominan'].replace(SECTOR_MAP)
+
+        num_cols = [c for c in chunk.columns if c not in TEXT_COLUMNS]
+        chunk[num_cols] = chunk[num_cols].fillna(0)
+
+        chunk['Jumlah_KK'] = chunk['Jumlah_KK'].replace(0, 1)
+        chunk['Loan_per_HH'] = (chunk['Total_Pinjaman'] / chunk['Jumlah_KK']) / 1_000_000
+        yield chunk
+
+
+class _RunningStats:
+    def __init__(self):
+        self.n = 0
+        self.max_pot = -np.inf
+        self.sum_pot = 0.0
+        self.sum_sat = 0.0
+
+    def update(self, chunk):
+        if not len(chunk):
+            return
+        self.n += len(chunk)
+        self.max_pot = max(self.max_pot, float(chunk['Skor_Potensi'].max()))
+        self.sum_pot += float(chunk['Skor_Potensi'].sum())
+        self.sum_sat += float(chunk['Loan_per_HH'].sum())
+
+    def totals(self):
+        # Sama dengan scoring.frame_totals atas frame utuh
+        return {'n': self.n, 'max_pot': self.max_pot if self.n else 0.0, 'sum_pot': self.sum_pot, 'sum_sat': self.sum_sat}
+
+    def result(self):
+        return {
+            'max_pot': self.max_pot if self.max_pot > 0 else 1,
+            'avg_pot': self.sum_pot / self.n if self.n else np.nan,
+            'avg_sat': self.sum_sat / self.n if self.n else np.nan,
+        }
+
+
+class _KeyCodes:
+    """Global integer codes of one text key column, collected chunk by chunk."""
+
+    def __init__(self):
+        self.codes = {}
+        self.parts = []
+
+    def update(self, values):
+        inverse, uniques = pd.factorize(values)
+        mapping = np.array([self.codes.setdefault(v, len(self.codes)) for v in uniques], dtype=np.int64)
+        self.parts.append(mapping[inverse] if len(mapping) else np.full(len(inverse), -1, dtype=np.int64))
+        self.parts[-1][inverse < 0] = -1
+
+    def ranks(self):
+        """Per-row rank in sort_values order: lexical, NaN last."""
+        codes = np.concatenate(self.parts) if self.parts else np.empty(0, dtype=np.int64)
+        labels = np.array(list(self.codes), dtype=object)
+        rank_of = np.empty(len(labels), dtype=np.int64)
+        rank_of[np.argsort(labels, kind='stable')] = np.arange(len(labels))
+        return np.where(codes >= 0, rank_of[np.maximum(codes, 0)] if len(labels) else 0, len(labels))
+
+
+def region_order(keys):
+    """Row permutation equal to region_index.sort_by_region (stable lexsort)."""
+    return np.lexsort([keys[col].ranks() for col in reversed(SORT_KEYS)])
+
+
+def _to_batch(df, schema=None):
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    return table.combine_chunks().to_batches()[0] if table.num_rows else None, table.schema
+
+
+def ingest_csv(csv_path, out_path, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream csv_path into a processed, region-sorted Arrow IPC file; returns the global stats and totals."""
+    stats = _RunningStats()
+    keys = {col: _KeyCodes() for col in SORT_KEYS}
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    fd, staging_path = tempfile.mkstemp(suffix='.arrow', dir=out_dir)
+    os.close(fd)
+
+    try:
+        # --- Pass 1: normalisasi per chunk -> staging ---
+        writer, schema = None, None
+        with pa.OSFile(staging_path, 'wb') as sink:
+            for chunk in iter_prepared_chunks(csv_path, chunksize):
+                stats.update(chunk)
+                for col, codes in keys.items():
+                    codes.update(chunk[col])
+                batch, schema = _to_batch(chunk, schema)
+                if batch is None:
+                    continue
+                if writer is None:
+                    writer = pa.ipc.new_file(sink, schema)
+                writer.write_batch(batch)
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            raise ValueError(f"Tidak ada baris data di {csv_path}")
+        global_stats = stats.result()
+        order = region_order(keys)
+        del keys
+
+        # --- Pass 2: urutan wilayah + skor global per batch -> output ---
+        out_writer, out_schema = None, None
+        with pa.memory_map(staging_path) as source, pa.OSFile(out_path, 'wb') as sink:
+            staging = pa.ipc.open_file(source).read_all()
+            for start in range(0, stats.n, chunksize):
+                rows = order[start:start + chunksize]
+                chunk = staging.take(pa.array(rows)).to_pandas()
+                scoring.score_frame(chunk, global_stats)
+                add_simulated_reviews(chunk)
+                saturation_ratio = (chunk['Loan_per_HH'] / scoring.SAT_CAP_MIO).clip(0, 1)
+                chunk['Est_Unserved_KK'] = (chunk['Jumlah_KK'] * (1 - saturation_ratio)).astype(int)
+
+                # Kolom category ditulis sebagai string: dictionary per batch bisa berbeda
+                for col in chunk.select_dtypes(include='category').columns:
+                    chunk[col] = chunk[col].astype(object)
+                batch, out_schema = _to_batch(chunk, out_schema)
+                if out_writer is None:
+                    out_writer = pa.ipc.new_file(sink, out_schema)
+                out_writer.write_batch(batch)
+            out_writer.close()
+            del staging
+    finally:
+        os.remove(staging_path)
+
+    return {'rows': stats.n, **global_stats, 'totals': stats.totals()}
+
+
+def read_output(out_path):
+    """Compact-schema frame of an ingest_csv output, converted one column at a time.
+
+    The output is memory-mapped, so besides the compact result only one
+    full-width column is materialized at any moment.
+    """
+    with pa.memory_map(out_path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        main = pd.DataFrame(index=pd.RangeIndex(table.num_rows))
+        for name in table.column_names:
+            column = table.column(name)
+            if pa.types.is_string(column.type):
+                # Langsung ke Categorical tanpa array object per baris; urutan
+                # kategori disamakan dengan apply_schema (tetap, atau terurut)
+                s = column.dictionary_encode().to_pandas()
+                if name in FIXED_CATEGORIES:
+                    s = s.cat.set_categories(FIXED_CATEGORIES[name])
+                else:
+                    s = s.cat.reorder_categories(s.cat.categories.sort_values())
+            else:
+                s = column.to_pandas()
+            main[name] = apply_schema(s.to_frame(name))[name]
+        del table
+    return main
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest CSV desa per chunk ke file Arrow terproses")
+    parser.add_argument('csv_path')
+    parser.add_argument('out_path')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+    result = ingest_csv(args.csv_path, args.out_path, args.chunksize)
+    print(f"{result['rows']:,} desa -> {args.out_path}")
+
+
+if __name__ == '__main__':
+    main()
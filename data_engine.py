@@ -0,0 +1,357 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+import partitioned_executor
+import scoring
+from benchmark_index import LEVEL_KEYS, THRESHOLD_COLUMNS
+from data_schema import apply_schema
+from region_index import sort_by_region
+
+# -----------------------------------------------------------------------------
+# DATA ENGINE: CSV + EXCEL LOADER DENGAN COLUMNAR CACHE
+# -----------------------------------------------------------------------------
+# Parsing CSV desa + 3 sheet Excel (openpyxl) memakan waktu beberapa detik per
+# worker. Hasil preprocessing (rename, sector mapping, skor turunan) disimpan
+# sebagai file Arrow IPC (Feather) tanpa kompresi di CACHE_DIR sehingga worker
+# berikutnya cukup memory-map file tersebut.
+#
+# Frame desa dan sheet benchmark di-cache terpisah: perubahan Excel hanya
+# memuat ulang sheet, sedangkan file delta harian di DELTA_DIR diterapkan
+# secara inkremental ke cache frame desa terakhir (lihat incremental).
+# Sheet benchmark dinormalisasi sekali (lihat preprocess_levels) lalu dibaca
+# oleh app.py maupun app_2.py lewat load_levels; `python data_engine.py`
+# menjalankan langkah build ini sebelum app dijalankan.
+
+MAIN_CSV = 'Prototype Jawa Tengah.csv'
+BENCHMARK_XLSX = 'Kewajaran_Omzet_All.xlsx'
+CACHE_DIR = '.geo_cache'
+DELTA_DIR = 'deltas'
+
+# CSV desa lebih besar dari ini di-ingest per chunk (lihat chunked_ingest)
+CHUNKED_INGEST_BYTES = 512 * 1024 ** 2
+
+# Naikkan jika logika preprocessing berubah agar cache lama tidak terpakai
+CACHE_VERSION = 9
+
+# df.attrs berisi scoring.frame_totals, disimpan di manifest cache
+TOTALS_ATTR = 'score_totals'
+
+LEVEL_SHEETS = {'level1': 'Level 1', 'level2': 'Level 2', 'level3': 'Level 3'}
+# Ekspor CSV per sheet (dipakai app_2.py) jika workbook tidak tersedia
+BENCHMARK_CSV_EXPORTS = {lvl: f"data/{BENCHMARK_XLSX} - {sheet}.csv" for lvl, sheet in LEVEL_SHEETS.items()}
+
+COLUMN_PREFIX = 'potensi_wilayah_kel_podes_pdrb_sekda_current.'
+
+# --- [UPDATED] COMPREHENSIVE SECTOR MAPPING ---
+# Menambahkan kode 02, 05, 12, 16, 17, 99 yang mungkin muncul
+SECTOR_MAP = {
+    "01-PERTANIAN, PERBURUAN DAN KEHUTANAN": "Pertanian, Kebun & Kehutanan",
+    "02-PERIKANAN": "Perikanan & Kelautan",
+    "03-PERTAMBANGAN DAN PENGGALIAN": "Tambang & Galian",
+    "04-INDUSTRI PENGOLAHAN": "Industri & Produksi Barang",
+    "05-LISTRIK, GAS DAN AIR": "Listrik, Gas & Air Bersih",
+    "06-KONSTRUKSI": "Konstruksi & Bangunan",
+    "07-PERDAGANGAN BESAR DAN ECERAN": "Perdagangan (Toko/Grosir)",
+    "08-PENYEDIAAN AKOMODASI DAN PENYEDIAAN MAKAN MINUM": "Hotel, Restoran & Katering",
+    "09-TRANSPORTASI, PERGUDANGAN DAN KOMUNIKASI": "Transportasi, Gudang & Logistik",
+    "10-PERANTARA KEUANGAN": "Jasa Keuangan & Bank",
+    "11-REAL ESTATE, USAHA PERSEWAAN, DAN JASA PERUSAHAAN": "Properti, Sewa & Jasa Bisnis",
+    "12-ADMINISTRASI PEMERINTAHAN, PERTAHANAN DAN JAMINAN SOSIAL WAJIB": "Pemerintahan & PNS",
+    "13-JASA PENDIDIKAN": "Pendidikan & Kursus",
+    "14-JASA KESEHATAN DAN KEGIATAN SOSIAL": "Kesehatan & Klinik",
+    "15-JASA KEMASYARAKATAN, SOSIAL BUDAYA, HIBURAN DAN PERORANGAN LAINNYA": "Jasa Sosial, Hiburan & Loundry",
+    "16-JASA PERORANGAN YANG MELAYANI RUMAH TANGGA": "Jasa Rumah Tangga (ART)",
+    "17-BADAN INTERNASIONAL DAN BADAN EKSTRA INTERNASIONAL LAINNYA": "Badan Internasional",
+    "18-KEGIATAN YANG BELUM JELAS BATASANNYA": "Kegiatan Lainnya",
+    "19-PENERIMA KREDIT BUKAN LAPANGAN USAHA": "Keperluan Konsumtif / Rumah Tangga",
+    "99-KEGIATAN LAINNYA": "Sektor Lainnya"
+}
+
+SUB_SECTOR_MAP = {
+    "Pertanian Padi": "Petani Padi (Sawah)",
+    "Kombinasi Pertanian/Perkebunan dg Peternakan (Mixed Farming)": "Tani & Ternak Campuran",
+    "Perdagangan Kelapa dan Kelapa Sawit": "Jual Beli Kelapa/Sawit",
+    "Perdagangan Eceran Furniture dan Handycraft": "Toko Mebel & Kerajinan",
+    "Perdagangan Eceran Hasil Perikanan Darat dan Laut": "Jualan Ikan (Pasar/Eceran)",
+    "Perdagangan Eceran Mobil": "Jual Beli Mobil",
+    "Perdagangan Eceran Hasil Bumi (Campuran)": "Jualan Hasil Bumi",
+    "Distribusi Alat Elektronik": "Distributor Elektronik",
+    "Jasa Pelayanan Bongkar Muat Barang": "Jasa Bongkar Muat",
+    "Jasa Kebersihan": "Jasa Cleaning Service",
+    "Rumah Tangga utk Pemilikan Furnitur & Peralatan Rumah Tangga": "Pembelian Perabot Rumah",
+    "Rumah Tangga untuk Pemilikan Rumah Tinggal s.d. Tipe 21": "Pembelian/Renovasi Rumah"
+}
+
+RENAME_MAP = {
+    'nama_kabupaten': 'Kabupaten', 'nama_kecamatan': 'Kecamatan', 'nama_desa': 'Desa',
+    'latitude_desa': 'lat', 'longitude_desa': 'lon',
+    'total_pinjaman_kel': 'Total_Pinjaman', 'total_simpanan_kel': 'Total_Simpanan',
+    'jumlah_keluarga_pengguna_listrik': 'Jumlah_KK',
+    'attractiveness_index': 'Skor_Potensi',
+    'max_tipe_usaha': 'Sektor_Dominan',
+    'jumlah_lokasi_permukiman_kumuh': 'Risk_Kumuh',
+    'bencana_alam': 'Risk_Bencana',
+    'jumlah_perkelahian_masyarakat': 'Risk_Konflik'
+}
+
+
+def preprocess_levels(levels):
+    """Normalize the benchmark sheets: trimmed labels, rephrased sectors,
+    numeric thresholds and one row per lookup key, sorted by that key."""
+    for lvl, df in levels.items():
+        df.columns = df.columns.str.strip()
+        keys = [c for c in LEVEL_KEYS[lvl] if c in df.columns]
+        for col in keys:
+            df[col] = df[col].astype('string').str.strip()
+        if 'Sektor Ekonomi' in df.columns:
+            df['Sektor Ekonomi'] = df['Sektor Ekonomi'].replace(SECTOR_MAP)
+        if 'Sub Sektor Ekonomi' in df.columns:
+            df['Sub Sektor Ekonomi'] = df['Sub Sektor Ekonomi'].replace(SUB_SECTOR_MAP)
+        for col in THRESHOLD_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Duplikat: baris pertama yang dipakai (sama seperti BenchmarkIndex)
+        levels[lvl] = df.drop_duplicates(subset=keys, keep='first').sort_values(keys, kind='stable').reset_index(drop=True)
+    return levels
+
+
+# Nilai simulasi per desa (Sentiment_Score, Review_Count) diturunkan dari hash
+# wilayah + nama desa, bukan dari urutan baris: build penuh, chunked_ingest dan
+# delta (incremental) memberi nilai yang sama untuk desa yang sama
+SIMULATION_KEYS = ['Kabupaten', 'Kecamatan', 'Desa']
+SENTIMENT_HASH_KEY = 'sentiment-score0'
+REVIEW_HASH_KEY = 'review-count0000'
+
+
+def _unit_hash(keys, hash_key):
+    """Stable per-row value in [0, 1) from the hash of the key columns."""
+    h = pd.util.hash_pandas_object(keys, index=False, hash_key=hash_key).to_numpy()
+    return (h >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+def add_simulated_reviews(df):
+    """Set Sentiment_Score (3.5-4.9) and Review_Count (10-999) per desa."""
+    keys = df[SIMULATION_KEYS]
+    df['Sentiment_Score'] = 3.5 + 1.4 * _unit_hash(keys, SENTIMENT_HASH_KEY)
+    df['Review_Count'] = 10 + (_unit_hash(keys, REVIEW_HASH_KEY) * 990).astype(np.int64)
+    return df
+
+
+def source_columns(csv_path):
+    """Raw header names of the desa CSV whose stripped form is in RENAME_MAP."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    return [c for c in header if c.replace(COLUMN_PREFIX, '') in RENAME_MAP]
+
+
+def preprocess_main(main, compact=True):
+    """Rename the podes columns and derive the risk / quadrant scores."""
+    main.columns = [col.replace(COLUMN_PREFIX, '') for col in main.columns]
+    main.rename(columns={k: v for k, v in RENAME_MAP.items() if k in main.columns}, inplace=True)
+    # Hanya kolom RENAME_MAP, sama seperti jalur chunked_ingest
+    main = main.drop(columns=[c for c in main.columns if c not in RENAME_MAP.values()])
+
+    # Apply sector map to main data as well
+    if 'Sektor_Dominan' in main.columns:
+        main['Sektor_Dominan'] = main['Sektor_Dominan'].replace(SECTOR_MAP)
+
+    num_cols = main.select_dtypes(include=[np.number]).columns
+    main[num_cols] = main[num_cols].fillna(0)
+
+    main['Jumlah_KK'] = main['Jumlah_KK'].replace(0, 1)
+    main['Loan_per_HH'] = (main['Total_Pinjaman'] / main['Jumlah_KK']) / 1_000_000
+
+    # Final_Risk_Score, Risk_Category, Strategy_Quadrant, Kategori_Beban,
+    # Interpretasi_Risiko & kolom warna dihitung sekaligus (vectorized);
+    # frame besar dipecah ke beberapa proses (lihat partitioned_executor)
+    partitioned_executor.score_frame(main)
+    totals = scoring.frame_totals(main)
+
+    add_simulated_reviews(main)
+
+    saturation_ratio = (main['Loan_per_HH'] / scoring.SAT_CAP_MIO).clip(0, 1)
+    main['Est_Unserved_KK'] = (main['Jumlah_KK'] * (1 - saturation_ratio)).astype(int)
+
+    # Urutkan per wilayah agar filter Kabupaten/Kecamatan menjadi slice (RegionIndex)
+    main = sort_by_region(main)
+    # Category + float32 + downcast integer (lihat data_schema)
+    if compact:
+        main = apply_schema(main)
+    main.attrs[TOTALS_ATTR] = totals
+    return main
+
+
+def benchmark_sources(excel_path=BENCHMARK_XLSX):
+    """The workbook, or the per-sheet CSV exports under data/ when it is absent."""
+    if os.path.exists(excel_path):
+        return [excel_path]
+    return list(BENCHMARK_CSV_EXPORTS.values())
+
+
+def load_benchmark(excel_path=BENCHMARK_XLSX):
+    """Read the Level 1/2/3 sheets (one workbook pass) and normalize them."""
+    if os.path.exists(excel_path):
+        sheets = pd.read_excel(excel_path, sheet_name=list(LEVEL_SHEETS.values()))
+        levels = {lvl: sheets[sheet] for lvl, sheet in LEVEL_SHEETS.items()}
+    else:
+        levels = {lvl: pd.read_csv(path) for lvl, path in BENCHMARK_CSV_EXPORTS.items()}
+    return preprocess_levels(levels)
+
+
+def build_main(csv_path=MAIN_CSV, chunksize=None):
+    """Preprocess the desa CSV, streaming it in chunks when it is large."""
+    if chunksize is None and os.path.getsize(csv_path) < CHUNKED_INGEST_BYTES:
+        return preprocess_main(pd.read_csv(csv_path, usecols=source_columns(csv_path)))
+
+    import chunked_ingest  # lazy: chunked_ingest memakai konstanta modul ini
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, 'main.arrow')
+        # Output sudah terurut per wilayah; dibaca kolom per kolom dari memory-map
+        result = chunked_ingest.ingest_csv(csv_path, out_path, chunksize or chunked_ingest.DEFAULT_CHUNKSIZE)
+        main = chunked_ingest.read_output(out_path)
+    main.attrs[TOTALS_ATTR] = result['totals']
+    return main
+
+
+def build_dataset(csv_path=MAIN_CSV, excel_path=BENCHMARK_XLSX, chunksize=None):
+    """Parse the raw sources and run the full preprocessing (slow path)."""
+    data = {'main': build_main(csv_path, chunksize)}
+    data.update(load_benchmark(excel_path))
+    return data
+
+
+# -----------------------------------------------------------------------------
+# COLUMNAR CACHE
+# -----------------------------------------------------------------------------
+def source_fingerprint(*paths):
+    """Cache key derived from the size and mtime of every source file."""
+    h = hashlib.sha1(f"v{CACHE_VERSION}".encode())
+    for path in paths:
+        st = os.stat(path)
+        h.update(f"|{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key)
+
+
+def write_cache(data, cache_dir, key):
+    """Write every frame as uncompressed Feather, then publish atomically."""
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{key}-", dir=cache_dir)
+    try:
+        for name, df in data.items():
+            df.reset_index(drop=True).to_feather(os.path.join(tmp_dir, f"{name}.arrow"), compression='uncompressed')
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'key': key, 'frames': sorted(data),
+                       'attrs': {name: df.attrs for name, df in data.items() if df.attrs}}, f)
+        os.replace(tmp_dir, _cache_path(cache_dir, key))
+    except OSError:
+        # Worker lain sudah menulis key yang sama, atau disk read-only
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def read_cache(cache_dir, key):
+    """Memory-map a published cache entry; returns None on a miss."""
+    path = _cache_path(cache_dir, key)
+    manifest_path = os.path.join(path, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != CACHE_VERSION:
+        return None
+    # split_blocks: kolom numerik tanpa null menjadi view read-only langsung di
+    # atas buffer yang di-memory-map (dibagi antar proses lewat page cache OS)
+    data = {name: feather.read_table(os.path.join(path, f"{name}.arrow"), memory_map=True).to_pandas(split_blocks=True)
+            for name in manifest['frames']}
+    for name, attrs in manifest.get('attrs', {}).items():
+        data[name].attrs.update(attrs)
+    return data
+
+
+def prune_cache(cache_dir, keep_key, prefix=''):
+    """Remove entries under prefix built from older versions of the sources."""
+    if not os.path.isdir(cache_dir):
+        return
+    for entry in os.listdir(cache_dir):
+        if entry != keep_key and entry.startswith(prefix) and not entry.startswith('.'):
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+
+
+def delta_files(delta_dir=DELTA_DIR):
+    """Delta CSVs in apply order (file name order, e.g. 2024-05-01.csv)."""
+    if not os.path.isdir(delta_dir):
+        return []
+    return [os.path.join(delta_dir, name) for name in sorted(os.listdir(delta_dir)) if name.endswith('.csv')]
+
+
+def _cached(cache_dir, entry, build):
+    """Read cache entry '<part>-<key>' or build, publish and prune it."""
+    data = read_cache(cache_dir, entry)
+    if data is not None:
+        return data
+    data = build()
+    write_cache(data, cache_dir, entry)
+    prune_cache(cache_dir, entry, prefix=entry.split('-', 1)[0] + '-')
+    # Baca ulang dari cache agar worker pertama pun memakai buffer memory-map
+    return read_cache(cache_dir, entry) or data
+
+
+def _main_entry(csv_path, deltas):
+    return f"main-{source_fingerprint(csv_path, *deltas)}"
+
+
+def _build_main_with_deltas(csv_path, deltas, cache_dir):
+    """Start from the newest cached prefix of deltas and apply only the rest."""
+    import incremental  # lazy: incremental memakai modul ini
+
+    for applied in range(len(deltas) - 1, -1, -1):
+        cached = read_cache(cache_dir, _main_entry(csv_path, deltas[:applied]))
+        if cached is not None:
+            main = cached['main']
+            break
+    else:
+        applied, main = 0, build_main(csv_path)
+    for delta_path in deltas[applied:]:
+        main, _ = incremental.apply_delta(main, incremental.read_delta(delta_path))
+    return {'main': main}
+
+
+def load_dataset(csv_path=MAIN_CSV, excel_path=BENCHMARK_XLSX, cache_dir=CACHE_DIR, delta_dir=DELTA_DIR):
+    """Load the preprocessed dataset, rebuilding only the parts whose sources changed."""
+    deltas = delta_files(delta_dir)
+    data = dict(_cached(cache_dir, _main_entry(csv_path, deltas),
+                        lambda: _build_main_with_deltas(csv_path, deltas, cache_dir)))
+    data.update(load_levels(excel_path, cache_dir))
+    return data
+
+
+def levels_key(excel_path=BENCHMARK_XLSX):
+    """Cache entry of the benchmark sheets; changes whenever their source does."""
+    return f"levels-{source_fingerprint(*benchmark_sources(excel_path))}"
+
+
+def dataset_key(csv_path=MAIN_CSV, excel_path=BENCHMARK_XLSX, delta_dir=DELTA_DIR):
+    """Combined version key of everything load_dataset reads (see dataset_refresher)."""
+    return f"{_main_entry(csv_path, delta_files(delta_dir))}+{levels_key(excel_path)}"
+
+
+def load_levels(excel_path=BENCHMARK_XLSX, cache_dir=CACHE_DIR):
+    """Normalized benchmark sheets; openpyxl only runs when the sources change."""
+    return _cached(cache_dir, levels_key(excel_path), lambda: load_benchmark(excel_path))
+
+
+if __name__ == '__main__':
+    # Langkah build: isi CACHE_DIR sebelum app.py / app_2.py dijalankan
+    levels = load_levels()
+    print("Benchmark: " + ", ".join(f"{lvl} {len(df):,} baris" for lvl, df in levels.items()))
+    if os.path.exists(MAIN_CSV):
+        print(f"Desa: {len(load_dataset()['main']):,} baris")
@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# DATA GRID (SERVER-SIDE SORT, FILTER & PAGINATION)
+# -----------------------------------------------------------------------------
+# Tabel per desa sebelumnya mengirim seluruh df_filtered (semua kolom, sudah
+# di-sort_values) ke browser. Di sini urutan sort disimpan sebagai permutasi
+# posisi baris (dimemo per wilayah lewat RegionCache.derive), filter teks
+# menjadi mask boolean atas kode kategori, dan hanya satu halaman dengan
+# kolom yang ditampilkan yang di-iloc dari frame bersama - frame wilayah
+# tidak pernah di-copy atau di-sort ulang.
+
+PAGE_SIZES = [25, 50, 100, 250]
+DEFAULT_PAGE_SIZE = 50
+
+
+def sort_order(frame, column, ascending=True):
+    """Row positions of frame sorted by column (stable, NaN last)."""
+    values = frame[column].reset_index(drop=True)
+    return values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+
+def filter_mask(frame, column, query):
+    """Boolean mask of rows whose column contains query (case-insensitive)."""
+    s = frame[column]
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Cocokkan tiap kategori yang muncul sekali (kategori Desa mencakup
+        # seluruh dataset), lalu petakan kembali lewat kode baris
+        uniq, inverse = np.unique(s.cat.codes.to_numpy(), return_inverse=True)
+        labels = s.cat.categories.take(np.maximum(uniq, 0)).astype(str)
+        matched = np.asarray(labels.str.contains(query, case=False, regex=False), dtype=bool) & (uniq >= 0)
+        return matched[inverse]
+    return s.astype(str).str.contains(query, case=False, regex=False).to_numpy()
+
+
+def visible_rows(order, mask=None):
+    """Sorted row positions, restricted to mask when given."""
+    return order if mask is None else order[mask[order]]
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def page_frame(frame, rows, page, page_size, columns):
+    """The 1-based page of rows, projected to columns."""
+    start = (page - 1) * page_size
+    return frame.iloc[rows[start:start + page_size], frame.columns.get_indexer(columns)]
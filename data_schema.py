@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+import scoring
+
+# -----------------------------------------------------------------------------
+# COMPACT DTYPE SCHEMA (MAIN DESA FRAME)
+# -----------------------------------------------------------------------------
+# Frame utama di-cache & di-pickle per sesi, jadi ukurannya berlipat dengan
+# jumlah user. Kolom teks berulang disimpan sebagai category, angka pecahan
+# sebagai float32 dan angka bulat di-downcast ke integer terkecil yang muat.
+# Skor turunan dihitung dulu dalam float64 (scoring.score_frame) sebelum
+# schema ini diterapkan.
+
+CATEGORY_COLUMNS = [
+    'Kabupaten', 'Kecamatan', 'Desa', 'Sektor_Dominan',
+    'Risk_Category', 'Strategy_Quadrant', 'Kategori_Beban', 'Interpretasi_Risiko',
+    'color_hex_risk', 'color_pot_hex',
+]
+
+FLOAT32_COLUMNS = [
+    'lat', 'lon', 'Total_Pinjaman', 'Total_Simpanan', 'Skor_Potensi',
+    'Loan_per_HH', 'Final_Risk_Score', 'Sentiment_Score',
+]
+
+# Kolom bulat: di-downcast sesuai rentang nilainya (int8/int16/int32)
+INTEGER_COLUMNS = ['Jumlah_KK', 'Risk_Kumuh', 'Risk_Bencana', 'Risk_Konflik', 'Review_Count', 'Est_Unserved_KK']
+
+# Kategori hasil scoring memakai urutan tetap, apa pun nilai yang muncul
+FIXED_CATEGORIES = {
+    'Risk_Category': scoring.RISK_CATEGORIES,
+    'Strategy_Quadrant': scoring.QUADRANTS,
+    'Kategori_Beban': scoring.DEBT_CATEGORIES,
+    'Interpretasi_Risiko': scoring.RISK_INTERPRETATIONS,
+    'color_hex_risk': scoring.RISK_COLORS,
+    'color_pot_hex': scoring.POTENTIAL_COLORS,
+}
+
+
+def apply_schema(df):
+    """Convert df to the compact schema; unknown numeric columns are downcast too."""
+    for col in df.columns:
+        s = df[col]
+        if col in FIXED_CATEGORIES:
+            dtype = pd.CategoricalDtype(FIXED_CATEGORIES[col])
+            if s.dtype != dtype:
+                df[col] = s.astype(str).astype(dtype)
+        elif col in CATEGORY_COLUMNS:
+            if not isinstance(s.dtype, pd.CategoricalDtype):
+                df[col] = s.astype('category')
+        elif col in INTEGER_COLUMNS:
+            df[col] = pd.to_numeric(s, downcast='integer')
+        elif col in FLOAT32_COLUMNS or pd.api.types.is_float_dtype(s):
+            df[col] = s.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(s):
+            df[col] = pd.to_numeric(s, downcast='integer')
+    return df
+
+
+def memory_report(df):
+    """Deep memory usage per column (bytes), largest first, with a total row."""
+    usage = df.memory_usage(index=True, deep=True)
+    report = pd.DataFrame({
+        'column': usage.index.astype(str),
+        'dtype': [str(df.index.dtype)] + [str(df[c].dtype) for c in usage.index[1:]],
+        'bytes': usage.to_numpy(),
+    }).sort_values('bytes', ascending=False, ignore_index=True)
+    total = pd.DataFrame({'column': ['TOTAL'], 'dtype': [''], 'bytes': [int(usage.sum())]})
+    return pd.concat([report, total], ignore_index=True)
+
+
+def compare_memory(before, after):
+    """Total deep size before / after and the reduction factor."""
+    b = int(before.memory_usage(index=True, deep=True).sum())
+    a = int(after.memory_usage(index=True, deep=True).sum())
+    return {'before_bytes': b, 'after_bytes': a, 'reduction': b / a if a else float('inf')}
+
+
+if __name__ == '__main__':
+    import data_engine
+
+    raw = data_engine.preprocess_main(pd.read_csv(data_engine.MAIN_CSV), compact=False)
+    compact = apply_schema(raw.copy())
+    print(memory_report(compact).to_string(index=False))
+    stats = compare_memory(raw, compact)
+    print(f"\n{stats['before_bytes'] / 1e6:,.1f} MB -> {stats['after_bytes'] / 1e6:,.1f} MB "
+          f"({stats['reduction']:.1f}x lebih kecil)")
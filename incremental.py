@@ -0,0 +1,162 @@
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+import chunked_ingest
+import data_engine
+import scoring
+from data_schema import CATEGORY_COLUMNS, FIXED_CATEGORIES, apply_schema
+from region_index import sort_by_region
+
+# -----------------------------------------------------------------------------
+# INCREMENTAL UPDATE (DELTA HARIAN PER KABUPATEN)
+# -----------------------------------------------------------------------------
+# Delta berformat sama dengan CSV desa utama dan berisi SELURUH desa untuk
+# setiap kabupaten yang ada di dalamnya: baris lama kabupaten tersebut diganti
+# (desa yang hilang ikut terhapus). Statistik global yang dipakai skor
+# (max/rata-rata Skor_Potensi, rata-rata Loan_per_HH) di-update dari total
+# aditif (scoring.frame_totals) tanpa membaca ulang seluruh frame:
+#   - baris delta diskor penuh dengan statistik baru;
+#   - Final_Risk_Score & turunannya dihitung ulang untuk baris lain hanya jika
+#     max_pot berubah (eco_risk = pot / max_pot);
+#   - Strategy_Quadrant dihitung ulang hanya untuk baris yang nilainya berada
+#     di antara rata-rata lama dan baru (hanya baris itu yang bisa pindah).
+# Baris lama tersimpan float32, sehingga total yang dikurangi bisa berbeda
+# ~1e-7 relatif dari rebuild penuh; rebuild berkala tetap menjadi acuan.
+
+TOTALS_ATTR = data_engine.TOTALS_ATTR
+
+
+def read_delta(delta_path):
+    """Renamed, sector-mapped delta rows with Loan_per_HH (not scored yet)."""
+    chunks = list(chunked_ingest.iter_prepared_chunks(delta_path))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def _between(values, a, b):
+    lo, hi = min(a, b), max(a, b)
+    return (values >= lo) & (values <= hi)
+
+
+def _update_totals(totals, removed, added, kept):
+    """Totals after dropping removed rows and adding the delta rows."""
+    gone, new = scoring.frame_totals(removed), scoring.frame_totals(added)
+    out = {key: totals[key] - gone[key] + new[key] for key in ('n', 'sum_pot', 'sum_sat')}
+
+    # Baris lama disimpan float32: bandingkan pada presisi yang sama
+    if gone['n'] and np.float32(gone['max_pot']) >= np.float32(totals['max_pot']):
+        candidates = [scoring.frame_totals(kept)['max_pot']] if len(kept) else []
+    else:
+        candidates = [totals['max_pot']]
+    out['max_pot'] = max(candidates + ([new['max_pot']] if new['n'] else []), default=0.0)
+    return out
+
+
+def _score_delta(delta, stats):
+    scoring.score_frame(delta, stats)
+    # Nilai simulasi per desa, sama dengan build penuh (lihat data_engine)
+    data_engine.add_simulated_reviews(delta)
+    saturation_ratio = (delta['Loan_per_HH'] / scoring.SAT_CAP_MIO).clip(0, 1)
+    delta['Est_Unserved_KK'] = (delta['Jumlah_KK'] * (1 - saturation_ratio)).astype(int)
+    return apply_schema(sort_by_region(delta))
+
+
+def _rescore_kept(kept, old_stats, new_stats):
+    """Recompute only the kept-row columns whose thresholds moved."""
+    counts = {'risk_rescored': 0, 'quadrant_rescored': 0}
+    if new_stats['max_pot'] != old_stats['max_pot']:
+        for col, values in scoring.risk_scores(kept, new_stats['max_pot']).items():
+            kept[col] = values
+        counts['risk_rescored'] = len(kept)
+
+    pot = kept['Skor_Potensi'].to_numpy(dtype=float)
+    loan = kept['Loan_per_HH'].to_numpy(dtype=float)
+    shifted = (_between(pot, old_stats['avg_pot'], new_stats['avg_pot'])
+               | _between(loan, old_stats['avg_sat'], new_stats['avg_sat']))
+    rows = np.flatnonzero(shifted)
+    if len(rows):
+        quadrant = kept['Strategy_Quadrant']
+        codes = quadrant.cat.codes.to_numpy().copy()
+        codes[rows] = scoring.strategy_quadrant(pot[rows], loan[rows], new_stats['avg_pot'], new_stats['avg_sat']).cat.codes
+        kept['Strategy_Quadrant'] = pd.Categorical.from_codes(codes, dtype=quadrant.dtype)
+        counts['quadrant_rescored'] = len(rows)
+    return apply_schema(kept), counts
+
+
+def _align_categories(a, b):
+    """Give shared category columns one (sorted) category set so concat keeps them."""
+    for col in CATEGORY_COLUMNS:
+        if col in a.columns and col in b.columns and a[col].dtype != b[col].dtype:
+            categories = a[col].cat.categories.union(b[col].cat.categories)
+            a[col] = a[col].cat.set_categories(categories)
+            b[col] = b[col].cat.set_categories(categories)
+
+
+def apply_delta(main, delta):
+    """Replace the delta's kabupaten in main; returns (new_main, report)."""
+    started = time.perf_counter()
+    if not len(delta):
+        return main, {'kabupaten': [], 'rows_removed': 0, 'rows_added': 0, 'seconds': 0.0}
+    # Kolom sumber main (RENAME_MAP) wajib ada di delta; kolom yang hilang
+    # tidak boleh diam-diam terbuang saat concat
+    missing = [c for c in main.columns if c in data_engine.RENAME_MAP.values() and c not in delta.columns]
+    if missing:
+        raise ValueError(f"Kolom delta tidak lengkap: {', '.join(missing)}")
+    totals = main.attrs.get(TOTALS_ATTR) or scoring.frame_totals(main)
+    old_stats = scoring.stats_from_totals(totals)
+
+    replaced = main['Kabupaten'].isin(delta['Kabupaten'].unique()).to_numpy()
+    removed = main.iloc[np.flatnonzero(replaced)]
+    kept = main.iloc[np.flatnonzero(~replaced)].reset_index(drop=True)
+
+    new_totals = _update_totals(totals, removed, delta, kept)
+    new_stats = scoring.stats_from_totals(new_totals)
+
+    kept, counts = _rescore_kept(kept, old_stats, new_stats)
+    scored = _score_delta(delta.copy(), new_stats)
+    _align_categories(kept, scored)
+
+    # Kedua sisi diproyeksikan ke kolom main (kolom ekstra delta tidak ikut)
+    columns = list(main.columns)
+    merged = sort_by_region(pd.concat([kept[columns], scored[columns]], ignore_index=True))
+    # Nama desa/kecamatan yang terhapus tidak ikut muncul sebagai kategori kosong
+    for col in CATEGORY_COLUMNS:
+        if col in merged.columns and col not in FIXED_CATEGORIES:
+            merged[col] = merged[col].cat.remove_unused_categories()
+    merged.attrs[TOTALS_ATTR] = new_totals
+
+    report = {
+        'kabupaten': sorted(delta['Kabupaten'].unique().tolist()),
+        'rows_removed': len(removed),
+        'rows_added': len(scored),
+        **counts,
+        'stats_before': old_stats,
+        'stats_after': new_stats,
+        'seconds': time.perf_counter() - started,
+    }
+    return merged, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tambahkan file delta desa lalu perbarui cache secara inkremental")
+    parser.add_argument('delta_path')
+    parser.add_argument('--delta-dir', default=data_engine.DELTA_DIR)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.delta_dir, exist_ok=True)
+    target = os.path.join(args.delta_dir, os.path.basename(args.delta_path))
+    if os.path.exists(target):
+        parser.error(f"{target} sudah ada; beri nama baru (urutan nama = urutan penerapan)")
+    shutil.copy2(args.delta_path, target)
+
+    started = time.perf_counter()
+    data = data_engine.load_dataset(delta_dir=args.delta_dir)
+    print(f"{len(data['main']):,} desa, cache diperbarui dalam {time.perf_counter() - started:.1f} detik")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+import contextlib
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pyarrow as pa
+
+# -----------------------------------------------------------------------------
+# INSTRUMENTATION (TIMING SPAN, CACHE COUNTER, PAYLOAD SIZE)
+# -----------------------------------------------------------------------------
+# Setiap rerun app.py / app_2.py dibuka dengan start_run(); blok
+# `with span('stage'):` mencatat durasi per tahap ke trace rerun (untuk panel
+# admin) dan ke REGISTRY proses (akumulasi count/sum/max per tahap).
+# REGISTRY diekspor sebagai teks Prometheus lewat /metrics jika
+# GEO_METRICS_PORT diset, dan ringkasan tiap rerun ditulis ke logger
+# 'geo_metrics'. Ukuran payload (serialisasi chart / peta / dataframe) hanya
+# diukur bila diminta karena butuh serialisasi tambahan.
+#
+# Panel admin: tambahkan ?admin=1 pada URL atau set GEO_ADMIN=1.
+
+METRICS_PORT_ENV = 'GEO_METRICS_PORT'
+ADMIN_ENV = 'GEO_ADMIN'
+
+logger = logging.getLogger('geo_metrics')
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+class MetricsRegistry:
+    """Process-wide stage timings, counters and gauges (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def observe(self, seconds, **labels):
+        key = _labels(labels)
+        with self._lock:
+            count, total, peak = self.stages.get(key, (0, 0.0, 0.0))
+            self.stages[key] = (count + 1, total + seconds, max(peak, seconds))
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _labels(labels))] = value
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            stages = sorted(self.stages.items())
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+
+        lines = []
+        if stages:
+            lines.append('# HELP geo_stage_seconds Wall time per app stage.')
+            lines.append('# TYPE geo_stage_seconds summary')
+            for labels, (count, total, _) in stages:
+                lines.append(f'geo_stage_seconds_count{_format_labels(labels)} {count}')
+                lines.append(f'geo_stage_seconds_sum{_format_labels(labels)} {total:.6f}')
+            lines.append('# TYPE geo_stage_seconds_max gauge')
+            for labels, (_, _, peak) in stages:
+                lines.append(f'geo_stage_seconds_max{_format_labels(labels)} {peak:.6f}')
+        for kind, items in (('counter', counters), ('gauge', gauges)):
+            typed = set()
+            for (name, labels), value in items:
+                if name not in typed:
+                    lines.append(f'# TYPE {name} {kind}')
+                    typed.add(name)
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+_local = threading.local()
+
+# Trace yang belum selesai per thread script: rerun yang berhenti di st.stop(),
+# disela rerun baru atau gagal tidak pernah sampai ke finish_run di akhir script
+_open_runs = {}
+_open_lock = threading.Lock()
+
+
+class RunTrace:
+    """Spans and payload sizes of one script rerun."""
+
+    def __init__(self, app, measure_payloads=False):
+        self.app = app
+        self.measure_payloads = measure_payloads
+        self.started = time.perf_counter()
+        self.last_activity = self.started
+        self.spans = []
+        self.payloads = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def spans_frame(self):
+        spans = pd.DataFrame(self.spans, columns=['stage', 'seconds'])
+        return spans.groupby('stage', sort=False, as_index=False).agg(calls=('seconds', 'size'), ms=('seconds', 'sum')) \
+            .assign(ms=lambda d: (d['ms'] * 1000).round(1))
+
+    def payloads_frame(self):
+        return pd.DataFrame(self.payloads, columns=['payload', 'bytes'])
+
+
+def _record_run(trace, total, completed=True):
+    REGISTRY.observe(total, app=trace.app, stage='rerun_total')
+    REGISTRY.inc('geo_reruns_total', app=trace.app)
+    if not completed:
+        REGISTRY.inc('geo_reruns_incomplete_total', app=trace.app)
+    if logger.isEnabledFor(logging.INFO):
+        stages = ' '.join(f'{stage}={seconds * 1000:.1f}ms' for stage, seconds in trace.spans)
+        logger.info('%s rerun %.1fms%s %s', trace.app, total * 1000, '' if completed else ' (terhenti)', stages)
+
+
+def finish_dangling_runs():
+    """Record traces whose rerun never reached finish_run.
+
+    A trace is dangling when it is still open on the calling thread (the
+    previous rerun of this thread stopped early) or its thread has exited.
+    Its duration runs up to the last span / payload it recorded.
+    """
+    current = threading.current_thread()
+    with _open_lock:
+        dangling = [(ident, trace) for ident, (thread, trace) in _open_runs.items()
+                    if thread is current or not thread.is_alive()]
+        for ident, _ in dangling:
+            del _open_runs[ident]
+    for _, trace in dangling:
+        _record_run(trace, trace.last_activity - trace.started, completed=False)
+    return [trace for _, trace in dangling]
+
+
+def start_run(app, measure_payloads=False):
+    """Begin tracing the current rerun (one trace per script thread)."""
+    finish_dangling_runs()
+    trace = RunTrace(app, measure_payloads)
+    _local.trace = trace
+    _local.cache_misses = set()
+    with _open_lock:
+        _open_runs[threading.get_ident()] = (threading.current_thread(), trace)
+    return trace
+
+
+def current_run():
+    return getattr(_local, 'trace', None)
+
+
+def finish_run():
+    """Record the total rerun time, log a one-line summary and clear the trace."""
+    trace = current_run()
+    if trace is None:
+        return None
+    _local.trace = None
+    _local.cache_misses = None
+    with _open_lock:
+        _open_runs.pop(threading.get_ident(), None)
+    _record_run(trace, trace.elapsed())
+    return trace
+
+
+@contextlib.contextmanager
+def span(stage):
+    """Time a block as `stage` of the current rerun."""
+    trace = current_run()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        REGISTRY.observe(seconds, app=trace.app if trace else '', stage=stage)
+        if trace is not None:
+            trace.spans.append((stage, seconds))
+            trace.last_activity = t0 + seconds
+
+
+def payload_bytes(obj):
+    """Approximate serialized size of what Streamlit sends for obj."""
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, pd.DataFrame):
+        # st.dataframe mengirim Arrow IPC
+        return pa.Table.from_pandas(obj, preserve_index=False).nbytes
+    if hasattr(obj, 'to_json'):
+        # Altair chart / pydeck Deck: spec JSON yang dikirim ke browser
+        return len(obj.to_json().encode())
+    return len(str(obj).encode())
+
+
+def record_payload(name, obj):
+    """Size the payload of obj when the current rerun measures payloads."""
+    trace = current_run()
+    if trace is None or not trace.measure_payloads:
+        return
+    nbytes = payload_bytes(obj)
+    trace.payloads.append((name, nbytes))
+    REGISTRY.set('geo_payload_bytes', nbytes, app=trace.app, payload=name)
+
+
+def cache_miss(name):
+    """Call inside a cached function body: it only runs on a cache miss."""
+    misses = getattr(_local, 'cache_misses', None)
+    if misses is not None:
+        misses.add(name)
+
+
+def track_cache(name, fn, *args, **kwargs):
+    """Call a st.cache_* function and count a hit or a miss for it."""
+    misses = getattr(_local, 'cache_misses', None)
+    if misses is None:
+        misses = _local.cache_misses = set()
+    misses.discard(name)
+    result = fn(*args, **kwargs)
+    outcome = 'miss' if name in misses else 'hit'
+    REGISTRY.inc('geo_cache_requests_total', cache=name, result=outcome)
+    return result
+
+
+def admin_enabled(query_params=None):
+    if os.environ.get(ADMIN_ENV) == '1':
+        return True
+    return query_params is not None and query_params.get('admin') == '1'
+
+
+# --- Endpoint /metrics ---
+
+_server = None
+_server_lock = threading.Lock()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port=None, host='127.0.0.1'):
+    """Start the /metrics endpoint once per process (port from GEO_METRICS_PORT)."""
+    global _server
+    port = port or os.environ.get(METRICS_PORT_ENV)
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            except OSError as e:
+                # Port dipakai proses lain (mis. worker kedua)
+                logger.warning('metrics endpoint tidak aktif: %s', e)
+                return None
+            threading.Thread(target=_server.serve_forever, name='geo-metrics', daemon=True).start()
+    return _server
+
+
+def render_admin_panel(trace, container):
+    """Timing / payload / counter tables of this rerun in a Streamlit container."""
+    panel = container.expander("🛠️ Admin: Performa Rerun", expanded=True)
+    panel.caption(f"Rerun ini: {trace.elapsed() * 1000:,.0f} ms")
+    if trace.spans:
+        panel.dataframe(trace.spans_frame(), hide_index=True, use_container_width=True)
+    if trace.payloads:
+        panel.dataframe(trace.payloads_frame(), hide_index=True, use_container_width=True)
+    panel.code(REGISTRY.to_prometheus(), language='text')
@@ -0,0 +1,70 @@
+from benchmark_index import BenchmarkIndex
+
+# -----------------------------------------------------------------------------
+# KEWAJARAN ENGINE (VALIDATION CORE)
+# -----------------------------------------------------------------------------
+# Logika cek batas kewajaran yang sebelumnya tertanam di callback Streamlit
+# (render_level_check di app.py, display_status di app_2.py). Modul ini tidak
+# bergantung pada Streamlit sehingga bisa dipakai dari dashboard, CLI / HTTP
+# (kewajaran_service.py) maupun batch.
+
+# Input nasabah -> kolom batas pada sheet benchmark
+METRICS = {
+    'omzet': 'OMZET_MAX_WAJAR',
+    'hpp': 'HPP_MAX_WAJAR',
+    'laba': 'LABA_MAX_WAJAR',
+    'plafond': 'PLAFOND_MAX_WAJAR',
+}
+
+
+def check_thresholds(thresholds, inputs):
+    """Compare the given inputs against one benchmark row.
+
+    Metrics missing from inputs (or passed as None) are not checked, so the
+    dashboard can validate omzet/HPP/laba only and just show the plafond limit.
+    Returns None when there is no benchmark row.
+    """
+    if thresholds is None:
+        return None
+    checks = {}
+    for metric, col in METRICS.items():
+        value = inputs.get(metric)
+        if value is None or col not in thresholds:
+            continue
+        checks[metric] = bool(value <= thresholds[col])
+    return {'thresholds': thresholds, 'checks': checks, 'is_valid': all(checks.values())}
+
+
+class KewajaranEngine:
+    """Multi-level kewajaran validation on top of a BenchmarkIndex."""
+
+    def __init__(self, index):
+        self.index = index
+
+    @classmethod
+    def from_levels(cls, level1, level2, level3):
+        return cls(BenchmarkIndex.from_levels(level1, level2, level3))
+
+    def lookup(self, provinsi, kabupaten, sektor, sub_sektor):
+        return {
+            'level1': self.index.level1(provinsi, sektor),
+            'level2': self.index.level2(provinsi, sektor, sub_sektor),
+            'level3': self.index.level3(provinsi, kabupaten, sektor, sub_sektor),
+        }
+
+    def validate(self, provinsi, kabupaten, sektor, sub_sektor, **inputs):
+        """Validate one applicant; returns {level: result or None}."""
+        refs = self.lookup(provinsi, kabupaten, sektor, sub_sektor)
+        return {lvl: check_thresholds(row, inputs) for lvl, row in refs.items()}
+
+    def validate_record(self, record):
+        """Validate a plain dict (e.g. one JSON line) with lower-case keys."""
+        inputs = {m: _to_float(record.get(m)) for m in METRICS}
+        return self.validate(record.get('provinsi'), record.get('kabupaten'),
+                             record.get('sektor'), record.get('sub_sektor'), **inputs)
+
+
+def _to_float(value):
+    if value is None or value == '':
+        return None
+    return float(value)
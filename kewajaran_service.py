@@ -0,0 +1,145 @@
+import argparse
+import json
+import math
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import data_engine
+from kewajaran_engine import KewajaranEngine
+
+# -----------------------------------------------------------------------------
+# HEADLESS KEWAJARAN SERVICE (CLI + HTTP)
+# -----------------------------------------------------------------------------
+# Contoh:
+#   python kewajaran_service.py validate pengajuan.jsonl > hasil.jsonl
+#   python kewajaran_service.py serve --port 8600
+#   curl -X POST localhost:8600/validate -d '{"provinsi": "...", "kabupaten": "...",
+#        "sektor": "...", "sub_sektor": "...", "omzet": 1e8, "hpp": 6e7, "laba": 4e7}'
+#
+# Setiap record JSON memakai key: provinsi, kabupaten, sektor, sub_sektor,
+# omzet, hpp, laba, plafond (metrik boleh dikosongkan).
+
+
+def load_engine(excel_path=data_engine.BENCHMARK_XLSX):
+    levels = data_engine.load_levels(excel_path)
+    return KewajaranEngine.from_levels(levels['level1'], levels['level2'], levels['level3'])
+
+
+def json_safe(value):
+    """Recursively replace NaN / inf (e.g. empty benchmark cells) with None."""
+    if isinstance(value, dict):
+        return {k: json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def dumps(payload):
+    """Strict JSON (no NaN tokens) that any JSON parser can read back."""
+    return json.dumps(json_safe(payload), allow_nan=False)
+
+
+def validate_lines(engine, lines):
+    """Yield one JSON result line per non-empty input line.
+
+    A line that is not a valid record yields {"input": line, "error": ...}
+    instead of aborting the rest of the stream.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record harus berupa object JSON")
+            result = engine.validate_record(record)
+        except (ValueError, TypeError) as e:
+            yield dumps({'input': line, 'error': str(e)})
+            continue
+        yield dumps({'input': record, 'result': result})
+
+
+def make_handler(engine):
+    class KewajaranHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok', 'benchmark_rows': len(engine.index)})
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/validate':
+                self._send_json(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'null')
+                if isinstance(payload, list):
+                    for i, r in enumerate(payload):
+                        if not isinstance(r, dict):
+                            raise ValueError(f"elemen ke-{i} harus berupa object JSON")
+                    result = [engine.validate_record(r) for r in payload]
+                elif isinstance(payload, dict):
+                    result = engine.validate_record(payload)
+                else:
+                    raise ValueError("body harus berupa object atau list JSON")
+            except (ValueError, TypeError) as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            self._send_json(200, result)
+
+        def log_message(self, format, *args):
+            # Hindari log per request saat load test
+            pass
+
+    return KewajaranHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validasi kewajaran tanpa Streamlit")
+    parser.add_argument('--excel', default=data_engine.BENCHMARK_XLSX, help="workbook benchmark Level 1/2/3")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_validate = sub.add_parser('validate', help="validasi file JSON lines (default: stdin)")
+    p_validate.add_argument('input', nargs='?', default='-')
+
+    p_serve = sub.add_parser('serve', help="jalankan HTTP endpoint POST /validate")
+    p_serve.add_argument('--host', default='127.0.0.1')
+    p_serve.add_argument('--port', type=int, default=8600)
+
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    engine = load_engine(args.excel)
+    print(f"Benchmark dimuat: {len(engine.index)} kunci ({time.perf_counter() - t0:.2f}s)", file=sys.stderr)
+
+    if args.command == 'validate':
+        src = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+        with src:
+            for out in validate_lines(engine, src):
+                print(out)
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), make_handler(engine))
+        print(f"Serving on http://{args.host}:{args.port}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
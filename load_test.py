@@ -0,0 +1,333 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+import data_engine
+import instrumentation
+import synthetic_data
+
+# -----------------------------------------------------------------------------
+# LOAD TEST (CONCURRENT APPTEST SESSIONS)
+# -----------------------------------------------------------------------------
+# Mensimulasikan N analis yang memakai app.py bersamaan. AppTest tidak
+# thread-safe (memasang / menghapus Runtime._instance global dan me-patch
+# config.get_option), jadi setiap sesi adalah AppTest headless di PROSES
+# sendiri (spawn). Konsekuensinya: st.cache_resource / RegionCache TIDAK
+# dipakai bersama antar sesi dan sesi tidak berebut GIL - berbeda dengan
+# server Streamlit yang menjalankan semua sesi sebagai thread dalam satu
+# proses. Cache disk (.geo_cache) dibangun sekali oleh proses induk, sehingga
+# rerun pertama setiap sesi ('initial') = load cache memory-map per proses.
+# Setiap sesi menjalankan aksi acak: ganti Kabupaten, ubah Kecamatan, geser
+# slider top_n dan submit validasi Tab 5; setiap aksi = satu rerun penuh.
+# Dilaporkan throughput rerun, latensi p50/p95/p99 per aksi atas SEMUA rerun
+# (termasuk yang error), RSS per proses sesi dan rata-rata durasi per tahap
+# dari instrumentation.REGISTRY setiap sesi (digabung).
+#
+#   python load_test.py --sessions 8 --actions 25 --data-dir bench_data/100k
+#
+# Tanpa file data di --data-dir, data sintetis dibuat dulu (--desa).
+
+DEFAULT_SESSIONS = 4
+DEFAULT_ACTIONS = 20
+DEFAULT_TIMEOUT = 120
+PERCENTILES = [50, 95, 99]
+
+# Bobot aksi: interaksi filter lebih sering dari validasi
+ACTION_WEIGHTS = {'kabupaten': 3, 'kecamatan': 3, 'top_n': 2, 'validation': 2}
+
+
+def _widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def _button(at, text):
+    return next(b for b in at.button if text in b.label)
+
+
+def act_kabupaten(at, rng):
+    box = _widget(at.sidebar.selectbox, "Pilih Wilayah (Kabupaten)")
+    box.set_value(rng.choice(box.options))
+
+
+def act_kecamatan(at, rng):
+    box = _widget(at.sidebar.multiselect, "Filter Kecamatan")
+    box.set_value(rng.sample(box.options, rng.randint(1, len(box.options))))
+
+
+def act_top_n(at, rng):
+    _widget(at.slider, "Jumlah Desa:").set_value(rng.randint(3, 20))
+
+
+def act_validation(at, rng):
+    # Nilai acak di sekitar batas wajar umum; tombol submit memicu rerun
+    for label in ("Omzet (Rp)", "HPP (Rp)", "Laba (Rp)"):
+        _widget(at.number_input, label).set_value(float(rng.randint(10, 500)) * 1e6)
+    _button(at, 'Cek Validasi').click()
+
+
+ACTIONS = {
+    'kabupaten': act_kabupaten,
+    'kecamatan': act_kecamatan,
+    'top_n': act_top_n,
+    'validation': act_validation,
+}
+
+
+def rss_mb():
+    """Current resident set size in MiB (Linux /proc; elsewhere the peak RSS)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class SessionRunner:
+    """One simulated analyst: an AppTest driven by random actions."""
+
+    def __init__(self, app_path, session_id, n_actions, seed, timeout, start_gate):
+        self.app_path = app_path
+        self.session_id = session_id
+        self.n_actions = n_actions
+        self.rng = random.Random(seed + session_id)
+        self.timeout = timeout
+        self.start_gate = start_gate
+        self.samples = []
+        self.started = self.finished = None
+
+    def _timed(self, action, at):
+        t0 = time.perf_counter()
+        error = None
+        try:
+            if action != 'initial':
+                ACTIONS[action](at, self.rng)
+            at.run(timeout=self.timeout)
+            if at.exception:
+                error = at.exception[0].value
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        self.samples.append({
+            'session': self.session_id,
+            'action': action,
+            'seconds': time.perf_counter() - t0,
+            'error': error,
+        })
+        return error is None
+
+    def run(self):
+        at = AppTest.from_file(self.app_path, default_timeout=self.timeout)
+        self.start_gate.wait(self.timeout)
+        # time.time(): dibandingkan antar proses untuk wall clock total
+        self.started = time.time()
+        try:
+            self._run_actions(at)
+        finally:
+            self.finished = time.time()
+        return self.samples
+
+    def _run_actions(self, at):
+        if not self._timed('initial', at):
+            return
+        names, weights = list(ACTION_WEIGHTS), list(ACTION_WEIGHTS.values())
+        for _ in range(self.n_actions):
+            action = self.rng.choices(names, weights)[0]
+            if not self._timed(action, at):
+                # Sesi gagal (mis. widget hilang karena st.stop): mulai sesi baru
+                at = AppTest.from_file(self.app_path, default_timeout=self.timeout)
+                self._timed('initial', at)
+
+
+def _warm_main(app_path, timeout, results):
+    """Child process: one rerun that builds .geo_cache on disk for every session."""
+    try:
+        at = AppTest.from_file(app_path, default_timeout=timeout).run()
+        results.put(at.exception[0].value if at.exception else None)
+    except Exception as e:
+        results.put(f"{type(e).__name__}: {e}")
+
+
+def _session_main(app_path, session_id, n_actions, seed, timeout, start_gate, results):
+    """Child process: run one SessionRunner and send its samples and stages back."""
+    runner = SessionRunner(app_path, session_id, n_actions, seed, timeout, start_gate)
+    try:
+        runner.run()
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    results.put({
+        'session': session_id,
+        'samples': runner.samples,
+        'stages': dict(instrumentation.REGISTRY.stages),
+        'rss_mb': rss_mb(),
+        'started': runner.started,
+        'finished': runner.finished,
+        'error': error,
+    })
+
+
+def summarize(samples, wall_seconds):
+    """Latency percentiles per action plus an 'all' row, over every rerun (errors included)."""
+    df = pd.DataFrame(samples, columns=['session', 'action', 'seconds', 'error'])
+    rows = []
+    for action, group in [('all', df)] + list(df.groupby('action', sort=True)):
+        ms = group['seconds'].to_numpy(dtype=float) * 1000
+        row = {'action': action, 'reruns': len(group), 'errors': int(group['error'].notna().sum())}
+        for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES) if len(ms) else [np.nan] * len(PERCENTILES)):
+            row[f'p{p}_ms'] = round(float(value), 1)
+        row['max_ms'] = round(float(ms.max()), 1) if len(ms) else np.nan
+        rows.append(row)
+    report = pd.DataFrame(rows)
+    throughput = len(df) / wall_seconds if wall_seconds > 0 else np.nan
+    return report, throughput
+
+
+def merge_stages(stage_dicts):
+    """Combine REGISTRY.stages snapshots of several processes."""
+    merged = {}
+    for stages in stage_dicts:
+        for key, (count, total, peak) in stages.items():
+            c, t, p = merged.get(key, (0, 0.0, 0.0))
+            merged[key] = (c + count, t + total, max(p, peak))
+    return merged
+
+
+def stage_report(stages, app='app'):
+    """Mean / max ms per instrumented stage of app from merged REGISTRY.stages."""
+    rows = []
+    for labels, (count, total, peak) in stages.items():
+        labels = dict(labels)
+        if labels.get('app') == app:
+            rows.append({'stage': labels['stage'], 'count': count,
+                         'mean_ms': round(total / count * 1000, 1), 'max_ms': round(peak * 1000, 1)})
+    if not rows:
+        return pd.DataFrame(columns=['stage', 'count', 'mean_ms', 'max_ms'])
+    return pd.DataFrame(rows).sort_values('mean_ms', ascending=False).reset_index(drop=True)
+
+
+def _ensure_data(data_dir, n_desa):
+    csv_path = os.path.join(data_dir, data_engine.MAIN_CSV)
+    excel_path = os.path.join(data_dir, data_engine.BENCHMARK_XLSX)
+    if not (os.path.exists(csv_path) and os.path.exists(excel_path)):
+        print(f"membuat data sintetis ({n_desa:,} desa) di {data_dir}...", file=sys.stderr)
+        synthetic_data.write_dataset(data_dir, n_desa)
+
+
+def _collect(procs, results):
+    """Read one result per session process; a process that died without one reports an error."""
+    collected = {}
+    while len(collected) < len(procs):
+        try:
+            result = results.get(timeout=1.0)
+        except queue.Empty:
+            for session_id, proc in enumerate(procs):
+                if session_id not in collected and not proc.is_alive() and proc.exitcode != 0:
+                    collected[session_id] = {'session': session_id, 'samples': [], 'stages': {}, 'rss_mb': np.nan,
+                                             'started': None, 'finished': None,
+                                             'error': f"proses sesi keluar dengan kode {proc.exitcode}"}
+            continue
+        collected[result['session']] = result
+    return [collected[i] for i in range(len(procs))]
+
+
+def run_load_test(app_path, sessions, actions, seed=0, timeout=DEFAULT_TIMEOUT):
+    """Warm the disk cache once, then run each session in its own process concurrently."""
+    # spawn: proses bersih tanpa state Streamlit / thread warisan proses induk.
+    # Proses induk sendiri tidak menjalankan AppTest (mengganti sys.modules['__main__'])
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    warm = ctx.Process(target=_warm_main, args=(app_path, timeout, results))
+    warm.start()
+    try:
+        warm_error = results.get(timeout=timeout + 60)
+    except queue.Empty:
+        warm_error = f"tidak ada hasil (kode keluar {warm.exitcode})"
+    warm.join()
+    if warm_error is not None:
+        raise RuntimeError(f"app gagal dijalankan: {warm_error}")
+
+    gate = ctx.Barrier(sessions)
+    procs = [ctx.Process(target=_session_main, args=(app_path, i, actions, seed, timeout, gate, results), daemon=True)
+             for i in range(sessions)]
+    for proc in procs:
+        proc.start()
+    outcomes = _collect(procs, results)
+    for proc in procs:
+        proc.join()
+
+    started = [o['started'] for o in outcomes if o['started'] is not None]
+    finished = [o['finished'] for o in outcomes if o['finished'] is not None]
+    wall = max(finished) - min(started) if started and finished else 0.0
+
+    samples = [s for o in outcomes for s in o['samples']]
+    report, throughput = summarize(samples, wall)
+    session_rss = np.array([o['rss_mb'] for o in outcomes], dtype=float)
+    memory = {
+        # Proses sesi tidak berbagi cache: total = jumlah RSS semua sesi
+        'session_rss_max_mb': round(float(np.nanmax(session_rss)), 1) if np.isfinite(session_rss).any() else np.nan,
+        'session_rss_total_mb': round(float(np.nansum(session_rss)), 1),
+        'parent_max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        # Proses sesi + worker partitioned_executor / refresher (spawn)
+        'children_max_rss_mb': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+    errors = [s for s in samples if s['error'] is not None]
+    errors += [{'session': o['session'], 'action': 'session', 'seconds': np.nan, 'error': o['error']}
+               for o in outcomes if o['error'] is not None]
+    return {
+        'sessions': sessions,
+        'actions_per_session': actions,
+        'wall_seconds': round(wall, 2),
+        'reruns_per_s': round(throughput, 2),
+        'latency': report,
+        'stages': stage_report(merge_stages(o['stages'] for o in outcomes)),
+        'memory': memory,
+        'errors': errors[:20],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test app.py dengan sesi AppTest bersamaan (satu proses per sesi)")
+    parser.add_argument('--sessions', type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument('--actions', type=int, default=DEFAULT_ACTIONS, help="aksi (rerun) per sesi")
+    parser.add_argument('--data-dir', default='.', help="folder berisi CSV desa & workbook benchmark")
+    parser.add_argument('--desa', type=int, default=10_000, help="ukuran data sintetis jika data belum ada")
+    parser.add_argument('--app', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py'))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="batas detik per rerun")
+    parser.add_argument('--json', help="tulis hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    app_path = os.path.abspath(args.app)
+    json_path = os.path.abspath(args.json) if args.json else None
+    _ensure_data(args.data_dir, args.desa)
+    # app.py membaca data (dan .geo_cache) relatif terhadap working directory
+    os.chdir(args.data_dir)
+    result = run_load_test(app_path, args.sessions, args.actions, args.seed, args.timeout)
+
+    print(f"{result['sessions']} sesi x {result['actions_per_session']} aksi: "
+          f"{result['wall_seconds']:.1f} s, {result['reruns_per_s']:.2f} rerun/s")
+    print(result['latency'].to_string(index=False))
+    print("\nTahap terlama (rata-rata per rerun):")
+    print(result['stages'].head(10).to_string(index=False))
+    print("\nMemori: " + ', '.join(f"{k}={v:,.0f}" for k, v in result['memory'].items()))
+    for error in result['errors']:
+        print(f"[sesi {error['session']}] {error['action']}: {error['error']}", file=sys.stderr)
+
+    if json_path:
+        out = {**result, 'latency': result['latency'].to_dict('records'), 'stages': result['stages'].to_dict('records'),
+               'meta': {'python': sys.version.split()[0], 'pandas': pd.__version__, 'cpus': os.cpu_count()}}
+        with open(json_path, 'w') as f:
+            json.dump(out, f, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
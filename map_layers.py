@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pydeck as pdk
+
+import scoring
+
+# -----------------------------------------------------------------------------
+# MAP AGGREGATION (SERVER-SIDE GRID BINNING)
+# -----------------------------------------------------------------------------
+# st.map mengirim setiap titik desa (plus kolom warna) ke browser. Untuk
+# tampilan provinsi/nasional titik-titik dikelompokkan dulu ke grid sel
+# lat/lon yang ukurannya mengikuti level zoom (~CELL_PX piksel per sel), lalu
+# hanya ringkasan per sel (jumlah desa, rata-rata risiko & potensi) yang
+# dikirim sebagai layer pydeck.
+
+CELL_PX = 32
+MIN_ZOOM, MAX_ZOOM = 5, 14
+
+# Metrik peta -> (kolom rata-rata, fungsi warna)
+MAP_METRICS = {
+    'potensi': ('avg_potensi', scoring.potential_color_hex),
+    'risk': ('avg_risk', scoring.risk_color_hex),
+}
+
+
+def cell_size_deg(zoom):
+    """Grid cell edge in degrees so one cell spans ~CELL_PX screen pixels."""
+    return CELL_PX * 360.0 / (256 * 2 ** zoom)
+
+
+def _hex_to_rgb(color):
+    color = color.lstrip('#')
+    return [int(color[i:i + 2], 16) for i in (0, 2, 4)]
+
+
+def aggregate_grid(df, zoom):
+    """Bin desa into lat/lon cells and summarize risk and potential per cell."""
+    size = cell_size_deg(zoom)
+    lat = df['lat'].to_numpy(dtype=float)
+    lon = df['lon'].to_numpy(dtype=float)
+    cells = pd.DataFrame({
+        'gx': np.floor(lon / size).astype(np.int64),
+        'gy': np.floor(lat / size).astype(np.int64),
+        'lat': lat,
+        'lon': lon,
+        'risk': df['Final_Risk_Score'].to_numpy(dtype=float),
+        'potensi': df['Skor_Potensi'].to_numpy(dtype=float),
+        'unserved': df['Est_Unserved_KK'].to_numpy(),
+    })
+    agg = cells.groupby(['gx', 'gy'], sort=False).agg(
+        lat=('lat', 'mean'), lon=('lon', 'mean'), n_desa=('lat', 'size'),
+        avg_risk=('risk', 'mean'), avg_potensi=('potensi', 'mean'), unserved=('unserved', 'sum'),
+    ).reset_index(drop=True)
+    agg['avg_risk'] = agg['avg_risk'].round(1)
+    agg['avg_potensi'] = agg['avg_potensi'].round(1)
+    return agg
+
+
+def build_deck(cells, metric, zoom):
+    """Scatterplot of grid cells: colour by metric, radius by desa count."""
+    value_col, color_fn = MAP_METRICS[metric]
+    data = cells.copy()
+    data['color'] = [_hex_to_rgb(c) for c in color_fn(data[value_col]).astype(str)]
+    # Radius (meter) maksimal setengah sel, diskalakan dengan akar jumlah desa
+    cell_m = cell_size_deg(zoom) * 111_000
+    data['radius'] = cell_m * 0.5 * np.sqrt(data['n_desa'] / max(data['n_desa'].max(), 1))
+
+    layer = pdk.Layer(
+        'ScatterplotLayer', data=data,
+        get_position='[lon, lat]', get_fill_color='color', get_radius='radius',
+        radius_min_pixels=3, opacity=0.8, pickable=True,
+    )
+    view = pdk.ViewState(latitude=float(data['lat'].mean()) if len(data) else 0.0,
+                         longitude=float(data['lon'].mean()) if len(data) else 0.0, zoom=zoom)
+    tooltip = {'text': "{n_desa} desa\nRisk: {avg_risk}\nPotensi: {avg_potensi}\nUnserved KK: {unserved}"}
+    return pdk.Deck(layers=[layer], initial_view_state=view, tooltip=tooltip, map_style=None)
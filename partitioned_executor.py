@@ -0,0 +1,185 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import scoring
+from data_schema import FIXED_CATEGORIES
+
+# -----------------------------------------------------------------------------
+# PARTITIONED EXECUTOR (PROCESS POOL)
+# -----------------------------------------------------------------------------
+# Scoring dan validasi batch bersifat per baris, jadi bisa dipecah ke beberapa
+# proses lalu digabung kembali secara deterministik:
+#   - score_frame: statistik global dihitung sekali di proses utama, kolom
+#     input dibagikan lewat shared memory dan setiap worker menulis
+#     Final_Risk_Score + kode kategori ke blok output bersama pada offset
+#     barisnya. Hasil identik dengan scoring.score_frame serial.
+#   - validate_batch: pengajuan dipartisi per provinsi (dipecah lagi jika
+#     besar); worker hanya menerima baris benchmark provinsinya dan hasil
+#     disusun ulang ke urutan baris semula.
+# Di bawah *_MIN_ROWS atau dengan workers <= 1 jalur serial dipakai langsung
+# (overhead start proses lebih besar dari manfaatnya).
+
+SCORING_MIN_ROWS = 500_000
+VALIDATION_MIN_ROWS = 200_000
+
+# spawn: aman dipanggil dari thread Streamlit (fork pada proses multi-thread tidak)
+MP_CONTEXT = 'spawn'
+WORKERS_ENV = 'GEO_WORKERS'
+
+# Partisi per worker: sedikit lebih banyak dari jumlah worker agar seimbang
+PARTITIONS_PER_WORKER = 2
+
+
+def default_workers():
+    """GEO_WORKERS if set, otherwise the number of CPUs."""
+    env = os.environ.get(WORKERS_ENV)
+    return int(env) if env else (os.cpu_count() or 1)
+
+
+def _pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(MP_CONTEXT))
+
+
+def row_partitions(n_rows, n_parts):
+    """Contiguous [start, stop) ranges of near-equal size covering n_rows."""
+    n_parts = max(1, min(n_parts, n_rows))
+    edges = [round(i * n_rows / n_parts) for i in range(n_parts + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+# --- Shared memory ---
+
+def _views(blocks, spec):
+    return {name: np.ndarray(shape, dtype, buffer=shm.buf) for shm, (name, (_, shape, dtype)) in zip(blocks, spec.items())}
+
+
+def _share(arrays):
+    """Copy arrays into new shared-memory blocks; returns (blocks, spec)."""
+    blocks, spec = [], {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        spec[name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, spec
+
+
+def _attach(spec):
+    blocks = [shared_memory.SharedMemory(name=shm_name) for shm_name, _, _ in spec.values()]
+    return blocks, _views(blocks, spec)
+
+
+def _release(blocks, unlink=False):
+    for shm in blocks:
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+
+# --- Scoring ---
+
+def _score_columns(df):
+    return ['Skor_Potensi', 'Loan_per_HH'] + [c for c in scoring.ENV_PENALTIES if c in df.columns]
+
+
+def _score_partition(task):
+    in_spec, out_spec, start, stop, stats = task
+    in_blocks, inputs = _attach(in_spec)
+    out_blocks, outputs = _attach(out_spec)
+    try:
+        part = pd.DataFrame({name: arr[start:stop].copy() for name, arr in inputs.items()})
+        scoring.score_frame(part, stats)
+        outputs['Final_Risk_Score'][start:stop] = part['Final_Risk_Score'].to_numpy()
+        for col in FIXED_CATEGORIES:
+            outputs[col][start:stop] = part[col].cat.codes.to_numpy()
+    finally:
+        # View numpy harus dilepas sebelum blok shared memory ditutup
+        del inputs, outputs
+        _release(in_blocks)
+        _release(out_blocks)
+    return stop - start
+
+
+def score_frame(df, stats=None, workers=None, min_rows=SCORING_MIN_ROWS):
+    """scoring.score_frame over row partitions in a process pool (same output)."""
+    workers = workers or default_workers()
+    if workers <= 1 or len(df) < max(min_rows, 2):
+        return scoring.score_frame(df, stats)
+
+    stats = stats or scoring.global_stats(df)
+    n = len(df)
+    inputs = {col: df[col].to_numpy(dtype=float) for col in _score_columns(df)}
+    outputs = {'Final_Risk_Score': np.empty(n, dtype=np.float64)}
+    outputs.update({col: np.empty(n, dtype=np.int8) for col in FIXED_CATEGORIES})
+
+    in_blocks, in_spec = _share(inputs)
+    out_blocks, out_spec = _share(outputs)
+    try:
+        # Skor per baris hanya bergantung pada stats global: potongan bebas
+        parts = row_partitions(n, workers * PARTITIONS_PER_WORKER)
+        with _pool(workers) as pool:
+            list(pool.map(_score_partition, [(in_spec, out_spec, start, stop, stats) for start, stop in parts]))
+
+        results = _views(out_blocks, out_spec)
+        df['Final_Risk_Score'] = results['Final_Risk_Score'].copy()
+        for col, labels in FIXED_CATEGORIES.items():
+            df[col] = pd.Categorical.from_codes(results[col].copy(), categories=labels)
+        del results
+    finally:
+        _release(in_blocks, unlink=True)
+        _release(out_blocks, unlink=True)
+    return df
+
+
+# --- Batch validation ---
+
+def _validate_partition(task):
+    import batch_validation  # lazy: hindari import data_engine saat modul dimuat
+
+    apps, levels, remap_sectors = task
+    return batch_validation.validate_batch(apps, *levels, remap_sectors=remap_sectors)
+
+
+def _province_tasks(apps, levels, n_parts):
+    """(positions, apps subset, province levels) per province piece."""
+    province = apps['Provinsi Usaha'].to_numpy()
+    level_provinces = [lvl['Provinsi Usaha'].astype(str).str.strip() for lvl in levels]
+    target = max(1, math.ceil(len(apps) / n_parts))
+
+    tasks = []
+    for prov in pd.unique(province):
+        positions = np.flatnonzero(province == prov)
+        prov_levels = tuple(lvl[mask == prov] for lvl, mask in zip(levels, level_provinces))
+        for start in range(0, len(positions), target):
+            piece = positions[start:start + target]
+            tasks.append((piece, apps.iloc[piece], prov_levels))
+    return tasks
+
+
+def validate_batch(apps, level1, level2, level3, remap_sectors=True, workers=None, min_rows=VALIDATION_MIN_ROWS):
+    """batch_validation.validate_batch partitioned by province (same output)."""
+    import batch_validation
+
+    workers = workers or default_workers()
+    if workers <= 1 or len(apps) < max(min_rows, 2):
+        return batch_validation.validate_batch(apps, level1, level2, level3, remap_sectors)
+
+    # Validasi kolom & normalisasi di parent: kolom yang hilang menjadi
+    # ValueError yang sama dengan jalur satu proses, worker menerima frame
+    # yang sudah bersih (sektor sudah di-remap)
+    apps = batch_validation.normalize_applications(apps, remap_sectors)
+    tasks = _province_tasks(apps, (level1, level2, level3), workers * PARTITIONS_PER_WORKER)
+    with _pool(workers) as pool:
+        parts = list(pool.map(_validate_partition, [(sub, levels, False) for _, sub, levels in tasks]))
+
+    # Gabung deterministik: kembalikan ke urutan baris input
+    positions = np.concatenate([piece for piece, _, _ in tasks])
+    merged = pd.concat(parts, ignore_index=True)
+    return merged.iloc[np.argsort(positions, kind='stable')].reset_index(drop=True)
@@ -0,0 +1,115 @@
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# RANK INDEX (LEADERBOARD TOP-N)
+# -----------------------------------------------------------------------------
+# Top Hidden Gems sebelumnya = filter kuadran + nlargest atas df_filtered di
+# setiap gerakan slider. Saat load disiapkan, per metrik leaderboard, dua
+# permutasi posisi baris yang sudah terurut menurut metrik:
+#   - dikelompokkan per (Kabupaten, Strategy_Quadrant) -> leaderboard kabupaten,
+#   - dikelompokkan per Strategy_Quadrant              -> leaderboard provinsi,
+# beserta offset setiap grup. Top-N = slice permutasi; filter kecamatan
+# memindai slice itu berurutan dan berhenti setelah N baris cocok. Tanpa
+# filter kuadran, top-N tiap kuadran digabung lalu diurutkan ulang (<= 4N baris).
+# Urutan seri mengikuti posisi baris, sama seperti nlargest/nsmallest(keep='first').
+
+# Metrik -> (label, ascending). ascending=True: nilai terendah di peringkat 1
+LEADERBOARDS = {
+    'Est_Unserved_KK': ("KK Belum Terlayani Terbanyak", False),
+    'Skor_Potensi': ("Potensi Ekonomi Tertinggi", False),
+    'Final_Risk_Score': ("Risiko Terendah", True),
+}
+
+# Ukuran blok saat memindai slice dengan filter kecamatan
+SCAN_CHUNK = 1024
+
+
+def _group_offsets(group_ids, n_groups):
+    """[start, stop) of each group id in an array sorted by group id."""
+    return np.searchsorted(group_ids, np.arange(n_groups + 1))
+
+
+class RankIndex:
+    """Per-kabupaten / per-quadrant rank orders of the leaderboard metrics."""
+
+    def __init__(self, df, metrics=LEADERBOARDS):
+        self.df = df
+        self.metrics = metrics
+        self.kabupaten = {kab: i for i, kab in enumerate(df['Kabupaten'].cat.categories)}
+        self.quadrants = {q: i for i, q in enumerate(df['Strategy_Quadrant'].cat.categories)}
+        self.kec_categories = df['Kecamatan'].cat.categories
+        self.kec_codes = df['Kecamatan'].cat.codes.to_numpy()
+        kab = df['Kabupaten'].cat.codes.to_numpy().astype(np.int64)
+        quad = df['Strategy_Quadrant'].cat.codes.to_numpy().astype(np.int64)
+        n_quad = len(self.quadrants)
+        # int32 cukup untuk posisi baris dan menghemat memori permutasi
+        pos_dtype = np.int32 if len(df) < 2 ** 31 else np.int64
+
+        self.keys = {}
+        self.by_kab_quadrant = {}
+        self.by_quadrant = {}
+        for metric, (_, ascending) in metrics.items():
+            values = df[metric].to_numpy(dtype=float)
+            # np.lexsort stabil dan menaruh NaN di akhir; kunci terakhir = kunci utama
+            key = values if ascending else -values
+            self.keys[metric] = key
+
+            order = np.lexsort((key, quad, kab))
+            group = kab[order] * n_quad + quad[order]
+            self.by_kab_quadrant[metric] = (order.astype(pos_dtype), _group_offsets(group, len(self.kabupaten) * n_quad))
+
+            order = np.lexsort((key, quad))
+            self.by_quadrant[metric] = (order.astype(pos_dtype), _group_offsets(quad[order], n_quad))
+
+    def _slice(self, metric, quadrant, kabupaten):
+        q = self.quadrants[quadrant]
+        if kabupaten is None:
+            order, offsets = self.by_quadrant[metric]
+            return order[offsets[q]:offsets[q + 1]]
+        if kabupaten not in self.kabupaten:
+            return np.empty(0, dtype=np.int64)
+        order, offsets = self.by_kab_quadrant[metric]
+        g = self.kabupaten[kabupaten] * len(self.quadrants) + q
+        return order[offsets[g]:offsets[g + 1]]
+
+    def _take(self, ranked, n, wanted):
+        """First n positions of ranked, keeping only wanted kecamatan codes."""
+        if wanted is None:
+            return ranked[:n]
+        found, count, start = [], 0, 0
+        while start < len(ranked) and count < n:
+            chunk = ranked[start:start + max(SCAN_CHUNK, 2 * n)]
+            found.append(chunk[wanted[self.kec_codes[chunk]]])
+            count += len(found[-1])
+            start += len(chunk)
+        return np.concatenate(found)[:n] if found else ranked[:0]
+
+    def top_positions(self, metric, n, kabupaten=None, quadrant=None, kecamatan=None):
+        """Row positions of the top n desa, best first.
+
+        kabupaten=None ranks the whole province; quadrant=None ranks every
+        quadrant; kecamatan (names, within kabupaten) restricts the rows.
+        """
+        wanted = None
+        if kecamatan is not None:
+            wanted = np.zeros(len(self.kec_categories) + 1, dtype=bool)
+            wanted[self.kec_categories.get_indexer(list(kecamatan))] = True
+            wanted[-1] = False  # nama tak dikenal (-1) dan NaN tidak pernah cocok
+        quadrants = [quadrant] if quadrant is not None else list(self.quadrants)
+        parts = [self._take(self._slice(metric, q, kabupaten), n, wanted) for q in quadrants]
+        if len(parts) == 1:
+            return parts[0]
+        merged = np.concatenate(parts).astype(np.int64)
+        order = np.lexsort((merged, self.keys[metric][merged]))
+        return merged[order[:n]]
+
+    def top(self, metric, n, kabupaten=None, quadrant=None, kecamatan=None, columns=None):
+        """Leaderboard frame (Rank + columns) of the top n desa."""
+        positions = self.top_positions(metric, n, kabupaten, quadrant, kecamatan)
+        if columns is None:
+            frame = self.df.iloc[positions]
+        else:
+            frame = self.df.iloc[positions, self.df.columns.get_indexer(columns)]
+        frame = frame.reset_index(drop=True)
+        frame.insert(0, 'Rank', np.arange(1, len(frame) + 1))
+        return frame
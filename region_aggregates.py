@@ -0,0 +1,106 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# REGION AGGREGATES (MEMOIZED PER FILTER)
+# -----------------------------------------------------------------------------
+# Setiap rerun Streamlit (slider top_n, ganti tab, dll) sebelumnya memfilter
+# ulang df_main dan menghitung ulang semua KPI. RegionCache menyimpan hasil
+# filter + agregat per (Kabupaten, frozenset Kecamatan) dengan eviction LRU,
+# sehingga hanya perubahan filter wilayah yang memicu komputasi ulang.
+#
+# Frame & agregat yang dikembalikan dipakai bersama antar rerun/sesi:
+# perlakukan sebagai read-only.
+
+DEFAULT_MAXSIZE = 64
+
+
+def compute_region_view(region_index, kabupaten, kecamatan, cube=None):
+    """Slice one region and compute every KPI / aggregate the tabs need.
+
+    With a RollupCube the KPIs are summed from its cells instead of scanning
+    the desa rows; only the frame slice comes from region_index.
+    """
+    df = region_index.select(kabupaten, kecamatan)
+    if cube is not None:
+        return {'frame': df, **cube.summary(kabupaten, kecamatan), 'derived': {}}
+
+    n = len(df)
+    is_gem = df['Strategy_Quadrant'] == 'Hidden Gem (Grow)'
+    growth_spots = int(is_gem.sum())
+
+    sec_stats = (df.groupby('Sektor_Dominan', observed=True)
+                 .agg({'Sentiment_Score': 'mean', 'Review_Count': 'mean'})
+                 .reset_index().sort_values('Sentiment_Score', ascending=False))
+
+    risk_factors = pd.DataFrame({
+        'Faktor': ['Konflik', 'Bencana', 'Kumuh', 'Saturasi'],
+        'Jumlah': [df['Risk_Konflik'].astype(bool).sum(), df['Risk_Bencana'].astype(bool).sum(),
+                   df['Risk_Kumuh'].astype(bool).sum(), (df['Loan_per_HH'] > 50).sum()]
+    })
+
+    return {
+        'frame': df,
+        'n_desa': n,
+        # Akumulasi float64 agar KPI tidak terpengaruh presisi kolom float32
+        'total_exposure': df['Total_Pinjaman'].to_numpy(dtype=float).sum(),
+        'avg_risk': df['Final_Risk_Score'].to_numpy(dtype=float).mean() if n else float('nan'),
+        'growth_spots': growth_spots,
+        'high_risk_areas': int(df['Risk_Category'].isin(['High', 'Critical']).sum()),
+        'pct_growth': (growth_spots / n) * 100 if n else 0.0,
+        'dom_sector': df['Sektor_Dominan'].mode()[0] if not df['Sektor_Dominan'].empty else "Umum",
+        'sec_stats': sec_stats,
+        'quadrant_counts': df['Strategy_Quadrant'].value_counts(sort=False),
+        'risk_factors': risk_factors,
+        # Hasil turunan lain (agregat peta, data chart) via RegionCache.derive
+        'derived': {},
+    }
+
+
+class RegionCache:
+    """Bounded LRU of compute_region_view results for one RegionIndex."""
+
+    def __init__(self, region_index, maxsize=DEFAULT_MAXSIZE, cube=None):
+        self.region_index = region_index
+        self.cube = cube
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kabupaten, kecamatan):
+        key = (kabupaten, frozenset(kecamatan))
+        with self._lock:
+            view = self._entries.get(key)
+            if view is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return view
+            self.misses += 1
+
+        # Hitung di luar lock agar sesi lain tidak ikut menunggu
+        view = compute_region_view(self.region_index, kabupaten, key[1], self.cube)
+        with self._lock:
+            self._entries[key] = view
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return view
+
+    def derive(self, kabupaten, kecamatan, name, fn):
+        """Memoize fn(view) on the region entry; evicted together with it."""
+        view = self.get(kabupaten, kecamatan)
+        derived = view['derived']
+        if name not in derived:
+            derived[name] = fn(view)
+        return derived[name]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
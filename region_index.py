@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# REGION INDEX (KABUPATEN / KECAMATAN OFFSETS)
+# -----------------------------------------------------------------------------
+# df_main diurutkan sekali per (Kabupaten, Kecamatan) saat preprocessing
+# (lihat data_engine.preprocess_main). Index ini menyimpan offset [start, stop)
+# setiap grup sehingga filter wilayah menjadi slice .iloc yang bersebelahan,
+# bukan boolean scan atas seluruh frame. Daftar opsi dropdown juga disiapkan
+# di sini.
+
+SORT_KEYS = ['Kabupaten', 'Kecamatan']
+
+
+def sort_by_region(df):
+    return df.sort_values(SORT_KEYS, kind='stable').reset_index(drop=True)
+
+
+def _runs(values):
+    """Start offsets of each run of equal consecutive values (plus the end)."""
+    values = np.asarray(values, dtype=object)
+    if len(values) == 0:
+        return np.array([0])
+    # NaN (Kecamatan kosong, diurutkan di akhir) dianggap satu grup
+    missing = pd.isna(values)
+    same = (values[1:] == values[:-1]) | (missing[1:] & missing[:-1])
+    change = np.flatnonzero(~same) + 1
+    return np.concatenate(([0], change, [len(values)]))
+
+
+class RegionIndex:
+    """Contiguous row ranges per Kabupaten and (Kabupaten, Kecamatan)."""
+
+    def __init__(self, df):
+        kab = df['Kabupaten'].to_numpy(dtype=object)
+        kec = df['Kecamatan'].to_numpy(dtype=object)
+        if len(df) > 1 and not pd.MultiIndex.from_arrays([kab, kec]).is_monotonic_increasing:
+            df = sort_by_region(df)
+            kab = df['Kabupaten'].to_numpy(dtype=object)
+            kec = df['Kecamatan'].to_numpy(dtype=object)
+        self.df = df
+
+        self.kab_slices = {}
+        bounds = _runs(kab)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            self.kab_slices[kab[start]] = (int(start), int(stop))
+
+        self.kec_slices = {}
+        self.kecamatan_options = {}
+        for k, (k_start, k_stop) in self.kab_slices.items():
+            sub = _runs(kec[k_start:k_stop]) + k_start
+            for start, stop in zip(sub[:-1], sub[1:]):
+                self.kec_slices[(k, kec[start])] = (int(start), int(stop))
+            self.kecamatan_options[k] = [kec[s] for s in sub[:-1]]
+
+        self.kabupaten_options = list(self.kab_slices)
+
+    def kabupaten(self, kabupaten):
+        start, stop = self.kab_slices.get(kabupaten, (0, 0))
+        return self.df.iloc[start:stop]
+
+    def select(self, kabupaten, kecamatan):
+        """Rows of the given kecamatan; a single zero-copy slice when all are selected."""
+        wanted = set(kecamatan)
+        options = self.kecamatan_options.get(kabupaten, [])
+        if wanted.issuperset(options):
+            return self.kabupaten(kabupaten)
+
+        # Gabungkan kecamatan yang bersebelahan menjadi satu range
+        slices = []
+        for k in options:
+            if k not in wanted:
+                continue
+            start, stop = self.kec_slices[(kabupaten, k)]
+            if slices and slices[-1][1] == start:
+                slices[-1] = (slices[-1][0], stop)
+            else:
+                slices.append((start, stop))
+        if not slices:
+            return self.df.iloc[0:0]
+        if len(slices) == 1:
+            start, stop = slices[0]
+            return self.df.iloc[start:stop]
+        rows = np.concatenate([np.arange(start, stop) for start, stop in slices])
+        return self.df.iloc[rows]
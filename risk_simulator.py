@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+import scoring
+
+# -----------------------------------------------------------------------------
+# WHAT-IF RISK SIMULATOR (CACHED SCORE COMPONENTS)
+# -----------------------------------------------------------------------------
+# Final_Risk_Score = w_sat * sat_risk + w_eco * eco_risk + w_env * env_risk.
+# Komponen yang tidak bergantung pada kebijakan disiapkan sekali saat load:
+#   - Loan_per_HH (sat_risk = clip(loan / cap) * 100 untuk cap apa pun),
+#   - eco_risk (hanya bergantung pada Skor_Potensi & max_pot global),
+#   - kode flag lingkungan 3 bit (Kumuh / Bencana / Konflik), sehingga
+#     env_risk untuk penalti apa pun cukup lookup tabel 8 nilai,
+#   - kode Strategy_Quadrant (tidak bergantung pada bobot / cap).
+# Satu skenario = satu pass vektor in-place atas seluruh desa; dengan parameter default hasilnya sama dengan scoring.risk_scores.
+
+DEFAULT_POLICY = {
+    'weights': dict(scoring.RISK_WEIGHTS),
+    'sat_cap': scoring.SAT_CAP_MIO,
+    'penalties': dict(scoring.ENV_PENALTIES),
+}
+
+# Batas bawah Risk_Category (scoring.risk_category): >=60 Critical, >=40 High, >=20 Medium
+CATEGORY_BOUNDS = (20, 40, 60)
+
+
+class RiskScenarioModel:
+    """Per-desa risk components cached once; scores any policy in one pass."""
+
+    def __init__(self, df, max_pot=None):
+        self.n = len(df)
+        self.loan = df['Loan_per_HH'].to_numpy(dtype=float)
+        pot = df['Skor_Potensi'].to_numpy(dtype=float)
+        if max_pot is None:
+            max_pot = scoring.global_stats(df)['max_pot']
+        self.eco_risk = 100 - ((pot / max_pot) * 100)
+
+        self.env_flags = list(scoring.ENV_PENALTIES)
+        self.env_code = np.zeros(self.n, dtype=np.int8)
+        for bit, col in enumerate(self.env_flags):
+            if col in df.columns:
+                self.env_code |= ((df[col].to_numpy(dtype=float) > 0).astype(np.int8) << bit)
+
+        self.quadrant_code = df['Strategy_Quadrant'].cat.codes.to_numpy().astype(np.int8)
+        self.baseline = self.simulate(DEFAULT_POLICY)
+
+    def env_table(self, penalties):
+        """env_risk per 3-bit flag code."""
+        values = np.array([penalties.get(col, 0) for col in self.env_flags], dtype=np.float64)
+        codes = np.arange(2 ** len(self.env_flags))
+        return ((codes[:, None] >> np.arange(len(self.env_flags))) & 1) @ values
+
+    def scores(self, policy):
+        """Final_Risk_Score for every desa under policy."""
+        weights = policy['weights']
+        # Buffer per panggilan: model dipakai bersama oleh semua sesi (thread)
+        score, tmp = np.empty(self.n), np.empty(self.n)
+        # sat_risk (Loan_per_HH >= 0, jadi clip bawah tidak diperlukan)
+        np.divide(self.loan, policy['sat_cap'], out=score)
+        np.minimum(score, 1, out=score)
+        # Urutan operasi sama dengan scoring.risk_scores (hasil identik bit-per-bit)
+        np.multiply(score, 100, out=score)
+        np.multiply(score, weights['sat'], out=score)
+        np.multiply(self.eco_risk, weights['eco'], out=tmp)
+        np.add(score, tmp, out=score)
+        np.take(self.env_table(policy['penalties']) * weights['env'], self.env_code, out=tmp)
+        np.add(score, tmp, out=score)
+        return score
+
+    def simulate(self, policy):
+        """Scores, Risk_Category codes and counts per category / quadrant."""
+        score = self.scores(policy)
+        # Kode mengikuti urutan scoring.RISK_CATEGORIES (0 = Critical); NaN -> Low
+        code = np.full(self.n, len(CATEGORY_BOUNDS), dtype=np.int8)
+        for bound in CATEGORY_BOUNDS:
+            code -= score >= bound
+        n_cat = len(scoring.RISK_CATEGORIES)
+        cross = np.bincount(self.quadrant_code.astype(np.intp) * n_cat + code,
+                            minlength=len(scoring.QUADRANTS) * n_cat)
+        return {
+            'category_code': code,
+            'category_counts': np.bincount(code, minlength=n_cat),
+            'quadrant_category': cross.reshape(len(scoring.QUADRANTS), n_cat),
+            'avg_score': float(score.mean()) if self.n else float('nan'),
+        }
+
+    def compare(self, result, positions=None):
+        """Baseline vs scenario desa count per Risk_Category (optionally a subset of rows)."""
+        n_cat = len(scoring.RISK_CATEGORIES)
+        if positions is None:
+            before, after = self.baseline['category_counts'], result['category_counts']
+        else:
+            before = np.bincount(self.baseline['category_code'][positions], minlength=n_cat)
+            after = np.bincount(result['category_code'][positions], minlength=n_cat)
+        return pd.DataFrame({
+            'Risk_Category': scoring.RISK_CATEGORIES,
+            'Baseline': before,
+            'Skenario': after,
+            'Selisih': after - before,
+        })
+
+    def quadrant_table(self, result):
+        return pd.DataFrame(result['quadrant_category'], index=pd.Index(scoring.QUADRANTS, name='Strategy_Quadrant'),
+                            columns=scoring.RISK_CATEGORIES)
+
+    def changed(self, result):
+        """Row positions whose Risk_Category differs from the baseline."""
+        return np.flatnonzero(result['category_code'] != self.baseline['category_code'])
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+import scoring
+
+# -----------------------------------------------------------------------------
+# ROLLUP CUBE (KABUPATEN x KECAMATAN x SEKTOR)
+# -----------------------------------------------------------------------------
+# KPI Executive Summary sebelumnya dihitung dari baris desa pada setiap
+# filter. Cube ini menyimpan agregat yang bisa dijumlahkan (count, sum,
+# sum-of-squares, jumlah per kuadran / faktor risiko) sekali saat load per
+# sel (Kabupaten, Kecamatan, Sektor_Dominan). Kombinasi kecamatan apa pun -
+# atau perbandingan seluruh kabupaten sekaligus - cukup menjumlahkan sel:
+# rata-rata = sum / n, simpangan baku dari sum-of-squares, modus sektor dari
+# jumlah desa per sektor. Desa dengan Kecamatan / Sektor_Dominan kosong (NaN)
+# tetap masuk cube (groupby dropna=False); sel sektor NaN diabaikan untuk
+# statistik & modus sektor, seperti groupby / Series.mode() mengabaikan NaN.
+
+CUBE_KEYS = ['Kabupaten', 'Kecamatan', 'Sektor_Dominan']
+HIGH_RISK_CATEGORIES = ['High', 'Critical']
+# Faktor Risk Guardian -> (kolom cube, label); Saturasi = Loan_per_HH > SATURATION_MIO
+RISK_FACTORS = [('konflik', 'Konflik'), ('bencana', 'Bencana'), ('kumuh', 'Kumuh'), ('saturasi', 'Saturasi')]
+SATURATION_MIO = 50
+QUADRANT_MEASURES = [f'quadrant_{i}' for i in range(len(scoring.QUADRANTS))]
+
+
+def _finite_sum(values):
+    """(sum, count) columns of a float array, ignoring NaN like pandas."""
+    finite = np.isfinite(values)
+    return np.where(finite, values, 0.0), finite.astype(np.int64)
+
+
+def cell_measures(df):
+    """Per-desa measure columns whose sums make up the cube cells."""
+    risk, risk_n = _finite_sum(df['Final_Risk_Score'].to_numpy(dtype=float))
+    sentiment, sentiment_n = _finite_sum(df['Sentiment_Score'].to_numpy(dtype=float))
+    review, review_n = _finite_sum(df['Review_Count'].to_numpy(dtype=float))
+    quadrant = df['Strategy_Quadrant'].cat.codes.to_numpy()
+    measures = {
+        'n_desa': np.ones(len(df), dtype=np.int64),
+        'total_exposure': df['Total_Pinjaman'].to_numpy(dtype=float),
+        'risk_sum': risk,
+        'risk_sumsq': risk ** 2,
+        'risk_n': risk_n,
+        'high_risk_areas': df['Risk_Category'].isin(HIGH_RISK_CATEGORIES).to_numpy().astype(np.int64),
+        'sentiment_sum': sentiment,
+        'sentiment_n': sentiment_n,
+        'review_sum': review,
+        'review_n': review_n,
+        # astype(bool) seperti compute_region_view: nilai != 0 dihitung
+        'konflik': (df['Risk_Konflik'].to_numpy() != 0).astype(np.int64),
+        'bencana': (df['Risk_Bencana'].to_numpy() != 0).astype(np.int64),
+        'kumuh': (df['Risk_Kumuh'].to_numpy() != 0).astype(np.int64),
+        'saturasi': (df['Loan_per_HH'].to_numpy() > SATURATION_MIO).astype(np.int64),
+    }
+    for i, name in enumerate(QUADRANT_MEASURES):
+        measures[name] = (quadrant == i).astype(np.int64)
+    return pd.DataFrame(measures, index=df.index)
+
+
+def _cell_key(kabupaten, kecamatan):
+    return (kabupaten, None if pd.isna(kecamatan) else kecamatan)
+
+
+def _mean(total, count):
+    return total / count if count else float('nan')
+
+
+def _std(total, total_sq, count):
+    """Sample standard deviation (ddof=1) from sum and sum of squares."""
+    if count < 2:
+        return float('nan')
+    return float(np.sqrt(max(total_sq - total * total / count, 0.0) / (count - 1)))
+
+
+class RollupCube:
+    """Mergeable KPI aggregates per (Kabupaten, Kecamatan, Sektor_Dominan)."""
+
+    def __init__(self, df):
+        keys = df[CUBE_KEYS]
+        cells = pd.concat([keys, cell_measures(df)], axis=1) \
+            .groupby(CUBE_KEYS, observed=True, sort=True, dropna=False).sum().reset_index()
+        self.cells = cells
+        self.measures = [c for c in cells.columns if c not in CUBE_KEYS]
+        # Matriks sel x measure (float64: count tetap eksak) untuk penjumlahan numpy
+        self.values = cells[self.measures].to_numpy(dtype=float)
+        self.column = {name: i for i, name in enumerate(self.measures)}
+        self.sector_codes = cells['Sektor_Dominan'].cat.codes.to_numpy()
+        self.sectors = cells['Sektor_Dominan'].cat.categories
+        # Posisi sel per (Kabupaten, Kecamatan); sel sudah terurut per key.
+        # Kecamatan NaN disimpan dengan key None (nan != nan sebagai key dict)
+        groups = cells.groupby(['Kabupaten', 'Kecamatan'], observed=True, sort=False, dropna=False).indices
+        self.kec_cells = {_cell_key(kab, kec): rows for (kab, kec), rows in groups.items()}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def cell_rows(self, kabupaten, kecamatan):
+        """Cube cell positions of the given kecamatan of one kabupaten."""
+        # dict.fromkeys: setiap kecamatan (juga NaN yang berulang) dihitung sekali
+        keys = dict.fromkeys(_cell_key(kabupaten, k) for k in kecamatan)
+        rows = [self.kec_cells[key] for key in keys if key in self.kec_cells]
+        return np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+
+    def _by_sector(self, rows, names):
+        """(sector codes present, sums of the named measures per present sector).
+
+        Cells without a sector (code -1) are left out, like NaN in groupby.
+        """
+        rows = rows[self.sector_codes[rows] >= 0]
+        codes = self.sector_codes[rows]
+        present = np.unique(codes)
+        sums = {name: np.bincount(codes, weights=self.values[rows, self.column[name]],
+                                  minlength=len(self.sectors))[present] for name in names}
+        return present, sums
+
+    def summary(self, kabupaten, kecamatan):
+        """The compute_region_view KPIs of a kecamatan selection, from cube cells only."""
+        rows = self.cell_rows(kabupaten, kecamatan)
+        total = dict(zip(self.measures, self.values[rows].sum(axis=0)))
+        n = int(total['n_desa'])
+        growth_spots = int(total[QUADRANT_MEASURES[0]])
+
+        present, sector = self._by_sector(rows, ['n_desa', 'sentiment_sum', 'sentiment_n', 'review_sum', 'review_n'])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sec_stats = pd.DataFrame({
+                'Sektor_Dominan': pd.Categorical.from_codes(present, categories=self.sectors),
+                'Sentiment_Score': np.where(sector['sentiment_n'] > 0, sector['sentiment_sum'] / sector['sentiment_n'], np.nan),
+                'Review_Count': np.where(sector['review_n'] > 0, sector['review_sum'] / sector['review_n'], np.nan),
+            }).sort_values('Sentiment_Score', ascending=False)
+
+        risk_factors = pd.DataFrame({
+            'Faktor': [label for _, label in RISK_FACTORS],
+            'Jumlah': [int(total[col]) for col, _ in RISK_FACTORS],
+        })
+
+        return {
+            'n_desa': n,
+            'total_exposure': float(total['total_exposure']),
+            'avg_risk': _mean(total['risk_sum'], total['risk_n']),
+            'std_risk': _std(total['risk_sum'], total['risk_sumsq'], total['risk_n']),
+            'growth_spots': growth_spots,
+            'high_risk_areas': int(total['high_risk_areas']),
+            'pct_growth': (growth_spots / n) * 100 if n else 0.0,
+            # Modus: sektor dengan desa terbanyak, seri -> urutan kategori (seperti Series.mode)
+            'dom_sector': self.sectors[present[np.argmax(sector['n_desa'])]] if len(present) else "Umum",
+            'sec_stats': sec_stats,
+            'quadrant_counts': pd.Series([int(total[q]) for q in QUADRANT_MEASURES], name='count',
+                                         index=pd.CategoricalIndex(scoring.QUADRANTS, categories=scoring.QUADRANTS,
+                                                                   name='Strategy_Quadrant')),
+            'risk_factors': risk_factors,
+        }
+
+    def by_kabupaten(self):
+        """Province-wide KPI comparison, one row per kabupaten."""
+        totals = self.cells.groupby('Kabupaten', observed=True)[self.measures].sum()
+        sector_counts = self.cells.groupby(['Kabupaten', 'Sektor_Dominan'], observed=True)['n_desa'].sum()
+        dom_sector = sector_counts.groupby(level='Kabupaten', observed=True).idxmax().map(lambda key: key[1])
+        # Kabupaten tanpa sektor sama sekali: "Umum", seperti summary
+        dom_sector = dom_sector.reindex(totals.index).astype(object).fillna("Umum")
+
+        n = totals['n_desa']
+        risk_n = totals['risk_n'].where(totals['risk_n'] > 0)
+        risk_var = (totals['risk_sumsq'] - totals['risk_sum'] ** 2 / risk_n) / (risk_n - 1).where(risk_n > 1)
+        return pd.DataFrame({
+            'Desa': n,
+            'Total Exposure (M)': totals['total_exposure'] / 1e9,
+            'Avg Risk': totals['risk_sum'] / risk_n,
+            'Std Risk': np.sqrt(risk_var.clip(lower=0)),
+            'Growth Spots': totals[QUADRANT_MEASURES[0]],
+            '% Growth': totals[QUADRANT_MEASURES[0]] / n * 100,
+            'High Risk Areas': totals['high_risk_areas'],
+            'Sektor Dominan': dom_sector,
+        }).reset_index()
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# SCORING ENGINE (VECTORIZED)
+# -----------------------------------------------------------------------------
+# Pengganti get_risk_cat / get_quad / get_hex_risk / get_hex_potential /
+# categorize_debt / interpret_risk yang sebelumnya dijalankan per baris via
+# .apply(). Semua binning memakai np.select atas kode integer lalu dibungkus
+# menjadi Categorical, sehingga urutan kondisi (dan perilaku NaN -> default)
+# identik dengan rantai if/elif aslinya.
+
+# Bobot & batas skor risiko
+SAT_CAP_MIO = 50.0
+RISK_WEIGHTS = {'sat': 0.3, 'eco': 0.3, 'env': 0.4}
+ENV_PENALTIES = {'Risk_Kumuh': 30, 'Risk_Bencana': 20, 'Risk_Konflik': 50}
+
+RISK_CATEGORIES = ['Critical', 'High', 'Medium', 'Low']
+QUADRANTS = ["Hidden Gem (Grow)", "Red Ocean (Compete)", "High Risk (Stop)", "Dormant (Monitor)"]
+DEBT_CATEGORIES = ["🟢 Ringan", "🟡 Menengah", "🟠 Berat", "🔴 Sangat Berat"]
+RISK_INTERPRETATIONS = ["⛔ KRITIS", "⚠️ TINGGI", "✋ SEDANG", "✅ RENDAH"]
+RISK_COLORS = ['#00cc96', '#ffa15a', '#ef553b', '#b30000']  # Green, Orange, Red Orange, Dark Red
+POTENTIAL_COLORS = ['#00cc96', '#636efa', '#ab63fa', '#d3d3d3']  # Bright Green, Blue, Purple, Grey
+
+
+def _select(conditions, labels, index=None):
+    """First matching condition wins; rows matching none get the last label."""
+    codes = np.select(conditions, np.arange(len(conditions)), default=len(labels) - 1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=labels), index=index)
+
+
+def _values(x):
+    return np.asarray(x, dtype=float)
+
+
+def risk_category(score, index=None):
+    s = _values(score)
+    return _select([s >= 60, s >= 40, s >= 20], RISK_CATEGORIES, index)
+
+
+def strategy_quadrant(potensi, loan_per_hh, avg_pot, avg_sat, index=None):
+    p, l = _values(potensi), _values(loan_per_hh)
+    return _select([
+        (p >= avg_pot) & (l < avg_sat),
+        (p >= avg_pot) & (l >= avg_sat),
+        (p < avg_pot) & (l >= avg_sat),
+    ], QUADRANTS, index)
+
+
+def debt_category(loan_per_hh, index=None):
+    l = _values(loan_per_hh)
+    return _select([l < 10, l < 30, l < 50], DEBT_CATEGORIES, index)
+
+
+def risk_interpretation(score, index=None):
+    s = _values(score)
+    return _select([s > 80, s > 60, s > 40], RISK_INTERPRETATIONS, index)
+
+
+def risk_color_hex(score, index=None):
+    s = _values(score)
+    return _select([s < 20, s < 40, s < 60], RISK_COLORS, index)
+
+
+def potential_color_hex(score, index=None):
+    s = _values(score)
+    return _select([s > 80, s > 60, s > 40], POTENTIAL_COLORS, index)
+
+
+def global_stats(df):
+    """Frame-wide statistics every row's score depends on."""
+    max_pot = df['Skor_Potensi'].max()
+    return {
+        'max_pot': max_pot if max_pot > 0 else 1,
+        'avg_pot': df['Skor_Potensi'].mean(),
+        'avg_sat': df['Loan_per_HH'].mean(),
+    }
+
+
+def frame_totals(df):
+    """Additive totals behind global_stats (row count, sums, raw max)."""
+    pot = _values(df['Skor_Potensi'])
+    return {
+        'n': int(len(pot)),
+        'max_pot': float(pot.max()) if len(pot) else 0.0,
+        'sum_pot': float(pot.sum()),
+        'sum_sat': float(_values(df['Loan_per_HH']).sum()),
+    }
+
+
+def stats_from_totals(totals):
+    """global_stats equivalent computed from frame_totals (see incremental)."""
+    n = totals['n']
+    return {
+        'max_pot': totals['max_pot'] if totals['max_pot'] > 0 else 1,
+        'avg_pot': totals['sum_pot'] / n if n else np.nan,
+        'avg_sat': totals['sum_sat'] / n if n else np.nan,
+    }
+
+
+def risk_components(df, max_pot=None):
+    """Saturation, economic and environmental risk (0-100) as float arrays."""
+    loan = _values(df['Loan_per_HH'])
+    pot = _values(df['Skor_Potensi'])
+
+    sat_risk = np.clip(loan / SAT_CAP_MIO, 0, 1) * 100
+    if max_pot is None:
+        max_pot = pot.max() if len(pot) and pot.max() > 0 else 1
+    eco_risk = 100 - ((pot / max_pot) * 100)
+
+    env_risk = np.zeros(len(df), dtype=np.int64)
+    for col, penalty in ENV_PENALTIES.items():
+        if col in df.columns:
+            env_risk += (_values(df[col]) > 0).astype(np.int64) * penalty
+    return sat_risk, eco_risk, env_risk
+
+
+def risk_scores(df, max_pot):
+    """Final_Risk_Score and the columns binned from it, keyed by column name.
+
+    These are the only outputs that depend on max_pot, so an incremental
+    update that moves the maximum only needs to rerun this part.
+    """
+    sat_risk, eco_risk, env_risk = risk_components(df, max_pot)
+    final = (RISK_WEIGHTS['sat'] * sat_risk) + (RISK_WEIGHTS['eco'] * eco_risk) + (RISK_WEIGHTS['env'] * env_risk)
+    return {
+        'Final_Risk_Score': final,
+        'Risk_Category': risk_category(final, df.index),
+        'Interpretasi_Risiko': risk_interpretation(final, df.index),
+        'color_hex_risk': risk_color_hex(final, df.index),
+    }
+
+
+def score_frame(df, stats=None):
+    """Add every derived score / category / colour column to df in one pass.
+
+    stats (see global_stats) can be supplied when df is only one chunk of the
+    full dataset, e.g. in chunked_ingest.
+    """
+    stats = stats or global_stats(df)
+    risk = risk_scores(df, stats['max_pot'])
+    loan = _values(df['Loan_per_HH'])
+    pot = _values(df['Skor_Potensi'])
+
+    df['Final_Risk_Score'] = risk['Final_Risk_Score']
+    df['Risk_Category'] = risk['Risk_Category']
+    df['Strategy_Quadrant'] = strategy_quadrant(pot, loan, stats['avg_pot'], stats['avg_sat'], df.index)
+    df['Kategori_Beban'] = debt_category(loan, df.index)
+    df['Interpretasi_Risiko'] = risk['Interpretasi_Risiko']
+    df['color_hex_risk'] = risk['color_hex_risk']
+    df['color_pot_hex'] = potential_color_hex(pot, df.index)
+    return df
+
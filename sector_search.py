@@ -0,0 +1,156 @@
+import difflib
+import heapq
+from collections import defaultdict
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# SUB-SECTOR SEARCH INDEX ("Cari dengan AI")
+# -----------------------------------------------------------------------------
+# difflib.get_close_matches membandingkan query dengan setiap label memakai
+# SequenceMatcher (kuadratik per pasangan). Index ini memakai inverted index
+# trigram karakter hanya untuk MENGURUTKAN kandidat (skor Dice atas trigram yang
+# sama) sehingga label yang paling mirip dinilai lebih dulu. Setiap label juga
+# punya batas atas quick_ratio (irisan multiset karakter, dihitung vectorized
+# dari matriks jumlah karakter). SequenceMatcher.ratio() dijalankan menurut
+# urutan Dice sampai tidak ada sisa kandidat yang batas atasnya bisa mengalahkan
+# hasil ke-n saat ini, sehingga hasil, skor & cutoff identik dengan
+# get_close_matches (termasuk label tanpa trigram yang sama dengan query).
+# Jumlah ratio() per query dibatasi MAX_RATIO_CALLS agar latensi per ketikan
+# tetap < 10 ms untuk 10k label; jika batas tercapai, hasilnya adalah top-n
+# terbaik di antara kandidat dengan skor Dice tertinggi yang sudah dinilai.
+
+MAX_RATIO_CALLS = 32
+
+
+def _trigrams(text):
+    text = f"  {str(text).lower().strip()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SubSectorSearch:
+    """Trigram inverted index over the unique 'Sub Sektor Ekonomi' labels."""
+
+    def __init__(self, labels, scopes=None, parents=None):
+        self.labels = list(labels)
+        self.scopes = scopes or {}
+        self.parents = parents or {}
+
+        postings = defaultdict(list)
+        sizes = np.zeros(len(self.labels), dtype=np.int32)
+        for i, label in enumerate(self.labels):
+            grams = _trigrams(label)
+            sizes[i] = len(grams)
+            for g in grams:
+                postings[g].append(i)
+        self.postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+        self.sizes = sizes
+
+        # Jumlah tiap karakter per label (case-sensitive, seperti SequenceMatcher)
+        self.alphabet = {}
+        for label in self.labels:
+            for ch in label:
+                self.alphabet.setdefault(ch, len(self.alphabet))
+        self.char_counts = np.zeros((len(self.labels), len(self.alphabet)), dtype=np.int32)
+        for i, label in enumerate(self.labels):
+            for ch in label:
+                self.char_counts[i, self.alphabet[ch]] += 1
+        self.lengths = np.array([len(label) for label in self.labels], dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, ref, label_col='Sub Sektor Ekonomi', scope_col='Provinsi Usaha', parent_col='Sektor Ekonomi'):
+        """Build from a benchmark sheet; scopes restrict search per province."""
+        ref = ref.dropna(subset=[label_col])
+        labels = ref[label_col].unique().tolist()
+        pos = {label: i for i, label in enumerate(labels)}
+
+        scopes = {}
+        if scope_col in ref.columns:
+            for scope, group in ref.groupby(scope_col, sort=False)[label_col]:
+                mask = np.zeros(len(labels), dtype=bool)
+                mask[[pos[l] for l in group.unique()]] = True
+                scopes[scope] = mask
+
+        parents = {}
+        if parent_col in ref.columns:
+            # Sektor induk = baris pertama dengan sub sektor tsb
+            first = ref.drop_duplicates(subset=[label_col], keep='first')
+            parents = dict(zip(first[label_col], first[parent_col]))
+        return cls(labels, scopes, parents)
+
+    def _quick_ratio(self, query):
+        """SequenceMatcher.quick_ratio() of every label against query.
+
+        Same integer matches and the same 2.0 * matches / length expression as
+        difflib, so it is an exact upper bound of ratio().
+        """
+        q_counts = defaultdict(int)
+        for ch in query:
+            if ch in self.alphabet:
+                q_counts[self.alphabet[ch]] += 1
+        if q_counts:
+            cols = np.fromiter(q_counts.keys(), dtype=np.int64, count=len(q_counts))
+            wanted = np.fromiter(q_counts.values(), dtype=np.int32, count=len(q_counts))
+            matches = np.minimum(self.char_counts[:, cols], wanted).sum(axis=1)
+        else:
+            matches = np.zeros(len(self.labels), dtype=np.int64)
+        return 2.0 * matches / (self.lengths + len(query))
+
+    def search(self, query, n=3, cutoff=0.3, scope=None, max_ratio_calls=MAX_RATIO_CALLS):
+        """Top-n labels like difflib.get_close_matches, optionally within a scope.
+
+        Exact unless more than max_ratio_calls candidates survive the
+        quick_ratio bound (None lifts the cap).
+        """
+        if not n > 0:
+            raise ValueError("n must be > 0: %r" % (n,))
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+        if not query or not self.labels:
+            return []
+        shared = np.zeros(len(self.labels), dtype=np.int32)
+        q_grams = _trigrams(query)
+        for g in q_grams:
+            ids = self.postings.get(g)
+            if ids is not None:
+                shared[ids] += 1
+        dice = 2.0 * shared / (len(q_grams) + self.sizes)
+
+        candidates = np.arange(len(self.labels))
+        if scope is not None:
+            mask = self.scopes.get(scope)
+            if mask is None:
+                return []
+            candidates = candidates[mask]
+
+        bound = self._quick_ratio(query)[candidates]
+        order = np.argsort(-dice[candidates], kind='stable')
+        candidates, bound = candidates[order], bound[order]
+        # Batas atas terbaik di antara kandidat yang belum dinilai
+        remaining = np.maximum.accumulate(bound[::-1])[::-1]
+
+        s = difflib.SequenceMatcher()
+        s.set_seq2(query)
+        best = []  # min-heap (ratio, label) berukuran <= n, seperti heapq.nlargest
+        calls = 0
+        for i, pos in enumerate(candidates):
+            if max_ratio_calls is not None and calls >= max_ratio_calls:
+                break
+            floor = cutoff if len(best) < n else max(cutoff, best[0][0])
+            if remaining[i] < floor:
+                break
+            if bound[i] < floor:
+                continue
+            s.set_seq1(self.labels[pos])
+            score = s.ratio()
+            calls += 1
+            if score < cutoff:
+                continue
+            if len(best) < n:
+                heapq.heappush(best, (score, self.labels[pos]))
+            else:
+                heapq.heappushpop(best, (score, self.labels[pos]))
+        return [label for _, label in sorted(best, reverse=True)]
+
+    def parent(self, label):
+        return self.parents.get(label)
@@ -0,0 +1,119 @@
+import math
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# SPATIAL INDEX (GRID LAT/LON, JARAK HAVERSINE)
+# -----------------------------------------------------------------------------
+# Desa dikelompokkan sekali saat load ke sel grid CELL_DEG derajat; posisi
+# baris disimpan terurut per sel (offset bergaya CSR, seperti RegionIndex).
+# Query radius hanya membaca sel yang beririsan dengan bounding box lingkaran
+# - satu slice bersebelahan per baris grid - lalu jarak haversine dihitung
+# untuk kandidat tersebut saja, bukan untuk seluruh frame. Query N terdekat
+# memperbesar radius (x2) sampai minimal N desa ditemukan; karena query radius
+# eksak, hasilnya sama dengan scan penuh.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+CELL_DEG = 0.05  # ~5.5 km
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance (km) from one point to arrays of points."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """Grid-bucketed desa coordinates for radius and nearest-N queries."""
+
+    def __init__(self, df, cell_deg=CELL_DEG):
+        self.df = df
+        self.cell_deg = cell_deg
+        lat = df['lat'].to_numpy(dtype=float)
+        lon = df['lon'].to_numpy(dtype=float)
+        # Desa tanpa koordinat tidak ikut di-index
+        rows = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        lat, lon = lat[rows], lon[rows]
+
+        self.lat0 = float(lat.min()) if len(rows) else 0.0
+        self.lon0 = float(lon.min()) if len(rows) else 0.0
+        iy = ((lat - self.lat0) // cell_deg).astype(np.int64)
+        ix = ((lon - self.lon0) // cell_deg).astype(np.int64)
+        self.ny = int(iy.max()) + 1 if len(rows) else 0
+        self.nx = int(ix.max()) + 1 if len(rows) else 0
+
+        cell = iy * self.nx + ix
+        order = np.argsort(cell, kind='stable')
+        self.rows = rows[order]
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self.offsets = np.searchsorted(cell[order], np.arange(self.ny * self.nx + 1))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _candidates(self, lat, lon, radius_km):
+        """Sorted-array positions of every point in cells touching the circle's bbox."""
+        if not len(self.rows):
+            return np.empty(0, dtype=np.int64)
+        dlat = radius_km / KM_PER_DEG_LAT
+        # Derajat bujur paling sempit di lintang terjauh dari ekuator dalam bbox
+        cos_lat = math.cos(math.radians(min(max(abs(lat) + dlat, 0.0), 89.9)))
+        dlon = min(radius_km / (KM_PER_DEG_LAT * cos_lat), 180.0)
+
+        y0 = max(int((lat - dlat - self.lat0) // self.cell_deg), 0)
+        y1 = min(int((lat + dlat - self.lat0) // self.cell_deg), self.ny - 1)
+        x0 = max(int((lon - dlon - self.lon0) // self.cell_deg), 0)
+        x1 = min(int((lon + dlon - self.lon0) // self.cell_deg), self.nx - 1)
+        if y0 > y1 or x0 > x1:
+            return np.empty(0, dtype=np.int64)
+
+        # Sel x0..x1 pada satu baris grid bersebelahan di array terurut
+        row_cells = np.arange(y0, y1 + 1) * self.nx
+        starts = self.offsets[row_cells + x0]
+        stops = self.offsets[row_cells + x1 + 1]
+        return np.concatenate([np.arange(a, b) for a, b in zip(starts, stops)])
+
+    def query_radius(self, lat, lon, radius_km, mask=None):
+        """(row positions, distances km) within radius_km, nearest first.
+
+        mask: optional boolean array over df rows (e.g. one Strategy_Quadrant).
+        """
+        cand = self._candidates(lat, lon, radius_km)
+        rows = self.rows[cand]
+        if mask is not None:
+            keep = np.asarray(mask)[rows]
+            cand, rows = cand[keep], rows[keep]
+        dist = haversine_km(lat, lon, self.lat[cand], self.lon[cand])
+        inside = dist <= radius_km
+        rows, dist = rows[inside], dist[inside]
+        order = np.argsort(dist, kind='stable')
+        return rows[order], dist[order]
+
+    def query_nearest(self, lat, lon, n, mask=None):
+        """(row positions, distances km) of the n nearest desa."""
+        total = len(self.rows) if mask is None else int(np.asarray(mask)[self.rows].sum())
+        n = min(n, total)
+        if n <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Radius awal: kira-kira luas yang memuat n desa pada kepadatan rata-rata
+        span_km = max(self.ny, 1) * max(self.nx, 1) * (self.cell_deg * KM_PER_DEG_LAT) ** 2
+        radius = max(math.sqrt(span_km * n / (math.pi * total)), self.cell_deg * KM_PER_DEG_LAT)
+        while True:
+            rows, dist = self.query_radius(lat, lon, radius, mask)
+            if len(rows) >= n:
+                return rows[:n], dist[:n]
+            radius *= 2
+
+    def within(self, lat, lon, radius_km, mask=None):
+        """Desa rows within radius_km with a Jarak_km column, nearest first."""
+        rows, dist = self.query_radius(lat, lon, radius_km, mask)
+        return self.df.iloc[rows].assign(Jarak_km=dist)
+
+    def nearest(self, lat, lon, n, mask=None):
+        """The n nearest desa rows with a Jarak_km column."""
+        rows, dist = self.query_nearest(lat, lon, n, mask)
+        return self.df.iloc[rows].assign(Jarak_km=dist)
@@ -0,0 +1,155 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_engine import BENCHMARK_XLSX, COLUMN_PREFIX, LEVEL_SHEETS, MAIN_CSV, SECTOR_MAP, SUB_SECTOR_MAP
+
+# -----------------------------------------------------------------------------
+# SYNTHETIC DATA GENERATOR (BENCHMARK)
+# -----------------------------------------------------------------------------
+# Menghasilkan CSV desa (kolom podes ber-prefix, termasuk kolom lain yang
+# tidak dipakai) dan workbook benchmark Level 1/2/3 dengan kolom *_MAX_WAJAR,
+# sesuai schema yang dibaca data_engine. Seed tetap -> file identik untuk
+# skala yang sama, sehingga hasil benchmark bisa dibandingkan antar commit.
+#
+#   python synthetic_data.py --desa 100000 --out bench_data/100k
+
+DEFAULT_SEED = 42
+PROVINCES = ['JAWA TENGAH', 'JAWA BARAT', 'JAWA TIMUR']
+DESA_PER_KABUPATEN = 2_000
+KECAMATAN_PER_KABUPATEN = 20
+SUB_SECTORS_PER_SECTOR = 4
+
+# Kolom CSV asli yang tidak dipakai app (ikut dibaca pd.read_csv)
+EXTRA_COLUMNS = ['kode_desa', 'luas_wilayah_km2', 'jumlah_penduduk', 'pdrb_per_kapita']
+
+
+def _sub_sectors():
+    """Raw sub-sector labels per raw sector label (known ones first)."""
+    sectors = list(SECTOR_MAP)
+    known = list(SUB_SECTOR_MAP)
+    subs = {sector: [] for sector in sectors}
+    for i, label in enumerate(known):
+        subs[sectors[i % len(sectors)]].append(label)
+    for sector in sectors:
+        code = sector.split('-', 1)[0]
+        while len(subs[sector]) < SUB_SECTORS_PER_SECTOR:
+            subs[sector].append(f"Usaha Sektor {code} Jenis {len(subs[sector]) + 1}")
+    return subs
+
+
+def region_names(n_desa):
+    """(provinsi, kabupaten) pairs sized so each kabupaten has ~DESA_PER_KABUPATEN desa."""
+    n_kab = max(3, -(-n_desa // DESA_PER_KABUPATEN))
+    return [(PROVINCES[i % len(PROVINCES)], f"KAB SINTETIS {i + 1:03d}") for i in range(n_kab)]
+
+
+def generate_desa(n_desa, seed=DEFAULT_SEED):
+    """Raw desa frame with the prefixed podes columns of MAIN_CSV."""
+    rng = np.random.default_rng(seed)
+    regions = region_names(n_desa)
+    kab_idx = np.sort(rng.integers(0, len(regions), n_desa))
+    kec_idx = rng.integers(0, KECAMATAN_PER_KABUPATEN, n_desa)
+    kab_names = np.array([kab for _, kab in regions], dtype=object)
+
+    # Pusat tiap kabupaten tersebar di sekitar Jawa; desa di sekitar pusatnya
+    centre_lat = rng.uniform(-8.5, -6.0, len(regions))
+    centre_lon = rng.uniform(105.5, 114.5, len(regions))
+    households = rng.lognormal(6.5, 0.8, n_desa).astype(np.int64)
+    households[rng.random(n_desa) < 0.01] = 0
+
+    columns = {
+        'nama_kabupaten': kab_names[kab_idx],
+        'nama_kecamatan': [f"{k} KEC {j + 1:02d}" for k, j in zip(kab_names[kab_idx], kec_idx)],
+        'nama_desa': [f"DESA {i + 1:07d}" for i in range(n_desa)],
+        'latitude_desa': centre_lat[kab_idx] + rng.normal(0, 0.12, n_desa),
+        'longitude_desa': centre_lon[kab_idx] + rng.normal(0, 0.12, n_desa),
+        'total_pinjaman_kel': households * rng.lognormal(16.5, 1.0, n_desa),
+        'total_simpanan_kel': households * rng.lognormal(16.0, 1.2, n_desa),
+        'jumlah_keluarga_pengguna_listrik': households,
+        'attractiveness_index': np.round(rng.beta(2, 2, n_desa) * 100, 2),
+        'max_tipe_usaha': rng.choice(list(SECTOR_MAP), n_desa),
+        'jumlah_lokasi_permukiman_kumuh': rng.poisson(0.3, n_desa),
+        'bencana_alam': (rng.random(n_desa) < 0.2).astype(int),
+        'jumlah_perkelahian_masyarakat': (rng.random(n_desa) < 0.1).astype(int),
+        'kode_desa': np.arange(3300000000, 3300000000 + n_desa),
+        'luas_wilayah_km2': np.round(rng.uniform(0.5, 30, n_desa), 2),
+        'jumlah_penduduk': households * rng.integers(3, 5, n_desa),
+        'pdrb_per_kapita': np.round(rng.lognormal(17, 0.5, n_desa)),
+    }
+    df = pd.DataFrame({COLUMN_PREFIX + name: values for name, values in columns.items()})
+    # Nilai kosong seperti di ekstrak asli (di-fillna(0) saat preprocessing)
+    for name in ['attractiveness_index', 'total_simpanan_kel', 'jumlah_lokasi_permukiman_kumuh']:
+        df.loc[rng.random(n_desa) < 0.02, COLUMN_PREFIX + name] = np.nan
+    return df
+
+
+def generate_levels(n_desa, seed=DEFAULT_SEED):
+    """Raw Level 1/2/3 benchmark sheets (unmapped sector labels)."""
+    rng = np.random.default_rng(seed + 1)
+    subs = _sub_sectors()
+
+    def thresholds(n):
+        omzet = np.round(rng.lognormal(18.5, 0.6, n), -3)
+        return {
+            'OMZET_MAX_WAJAR': omzet,
+            'HPP_MAX_WAJAR': np.round(omzet * rng.uniform(0.5, 0.8, n), -3),
+            'LABA_MAX_WAJAR': np.round(omzet * rng.uniform(0.1, 0.3, n), -3),
+            'PLAFOND_MAX_WAJAR': np.round(omzet * rng.uniform(0.3, 1.0, n), -3),
+        }
+
+    l1 = pd.DataFrame([(p, s) for p in PROVINCES for s in subs], columns=['Provinsi Usaha', 'Sektor Ekonomi'])
+    l2 = pd.DataFrame([(p, s, sub) for p, s in l1.itertuples(index=False) for sub in subs[s]],
+                      columns=['Provinsi Usaha', 'Sektor Ekonomi', 'Sub Sektor Ekonomi'])
+    l3 = pd.DataFrame([(p, kab, s, sub) for p, kab in region_names(n_desa)
+                       for s in subs for sub in subs[s]],
+                      columns=['Provinsi Usaha', 'Kabupaten/kota', 'Sektor Ekonomi', 'Sub Sektor Ekonomi'])
+    levels = {}
+    for lvl, df in (('level1', l1), ('level2', l2), ('level3', l3)):
+        levels[lvl] = df.assign(**thresholds(len(df)))
+    return levels
+
+
+def generate_applications(levels, n_apps, seed=DEFAULT_SEED):
+    """Batch-validation upload (batch_validation.KEY_COLUMNS + values); ~30% over the limit."""
+    rng = np.random.default_rng(seed + 2)
+    ref = levels['level3'].iloc[rng.integers(0, len(levels['level3']), n_apps)].reset_index(drop=True)
+    scale = np.where(rng.random(n_apps) < 0.3, rng.uniform(1.05, 2.0, n_apps), rng.uniform(0.2, 0.95, n_apps))
+    return pd.DataFrame({
+        'Provinsi Usaha': ref['Provinsi Usaha'],
+        'Kabupaten/kota': ref['Kabupaten/kota'],
+        'Sektor Ekonomi': ref['Sektor Ekonomi'],
+        'Sub Sektor Ekonomi': ref['Sub Sektor Ekonomi'],
+        'Omzet': np.round(ref['OMZET_MAX_WAJAR'] * scale),
+        'HPP': np.round(ref['HPP_MAX_WAJAR'] * scale),
+        'Laba': np.round(ref['LABA_MAX_WAJAR'] * scale),
+        'Plafond': np.round(ref['PLAFOND_MAX_WAJAR'] * scale),
+    })
+
+
+def write_dataset(out_dir, n_desa, seed=DEFAULT_SEED):
+    """Write MAIN_CSV and BENCHMARK_XLSX into out_dir; returns their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    csv_path = os.path.join(out_dir, MAIN_CSV)
+    excel_path = os.path.join(out_dir, BENCHMARK_XLSX)
+    generate_desa(n_desa, seed).to_csv(csv_path, index=False)
+    with pd.ExcelWriter(excel_path) as writer:
+        for lvl, df in generate_levels(n_desa, seed).items():
+            df.to_excel(writer, sheet_name=LEVEL_SHEETS[lvl], index=False)
+    return csv_path, excel_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat CSV desa + workbook benchmark sintetis")
+    parser.add_argument('--desa', type=int, default=10_000)
+    parser.add_argument('--out', default='.')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+    csv_path, excel_path = write_dataset(args.out, args.desa, args.seed)
+    print(f"{args.desa:,} desa -> {csv_path}\nbenchmark -> {excel_path}")
+
+
+if __name__ == '__main__':
+    main()
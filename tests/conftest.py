@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# Modul app ada di root repo (layout datar), bukan package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_engine  # noqa: E402
+import synthetic_data  # noqa: E402
+
+# Skala kecil: 1 kabupaten per 2.000 desa (lihat synthetic_data)
+SYNTHETIC_DESA = 4_000
+
+
+@pytest.fixture(scope='session')
+def levels():
+    """Normalized synthetic Level 1/2/3 benchmark sheets (no workbook round-trip)."""
+    return data_engine.preprocess_levels(synthetic_data.generate_levels(SYNTHETIC_DESA))
+
+
+@pytest.fixture(scope='session')
+def dataset_paths(tmp_path_factory):
+    """(csv_path, excel_path) of a synthetic desa CSV + benchmark workbook."""
+    return synthetic_data.write_dataset(str(tmp_path_factory.mktemp('synthetic')), SYNTHETIC_DESA)
+
+
+@pytest.fixture(scope='session')
+def main_frame(dataset_paths):
+    """The preprocessed desa frame (full-load path); copy before mutating."""
+    return data_engine.build_main(dataset_paths[0])
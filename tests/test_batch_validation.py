@@ -0,0 +1,91 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_validation
+import synthetic_data
+from batch_validation import STATUS_FAIL, STATUS_MISSING, STATUS_PASS
+from kewajaran_engine import KewajaranEngine
+
+
+def _levels():
+    # Level 1 tanpa kolom plafond; Level 3 hanya punya kabupaten 3301
+    level1 = pd.DataFrame({'Provinsi Usaha': ['P'], 'Sektor Ekonomi': ['S'],
+                           'OMZET_MAX_WAJAR': [100.0], 'HPP_MAX_WAJAR': [60.0], 'LABA_MAX_WAJAR': [40.0]})
+    level2 = pd.DataFrame({'Provinsi Usaha': ['P', 'P '], 'Sektor Ekonomi': ['S', 'S'],
+                           'Sub Sektor Ekonomi': ['A', 'A'],
+                           'OMZET_MAX_WAJAR': [200.0, 1.0], 'HPP_MAX_WAJAR': [120.0, 1.0],
+                           'LABA_MAX_WAJAR': [80.0, 1.0], 'PLAFOND_MAX_WAJAR': [150.0, 1.0]})
+    level3 = pd.DataFrame({'Provinsi Usaha': ['P'], 'Kabupaten/kota': [3301], 'Sektor Ekonomi': ['S'],
+                           'Sub Sektor Ekonomi': ['A'],
+                           'OMZET_MAX_WAJAR': [50.0], 'HPP_MAX_WAJAR': [30.0],
+                           'LABA_MAX_WAJAR': [20.0], 'PLAFOND_MAX_WAJAR': [np.nan]})
+    return level1, level2, level3
+
+
+def _apps():
+    return pd.DataFrame({
+        'Provinsi Usaha': ['P', ' P', 'P', 'Q'],
+        'Kabupaten/kota': [3301, 3301, 3302, 3301],  # kunci numerik dari Excel
+        'Sektor Ekonomi': ['S', 'S', 'S', 'S'],
+        'Sub Sektor Ekonomi': ['A', 'A', 'B', 'A'],
+        'Omzet': [50, 150, 90, 1],
+        'HPP': [30, 60, 60, 1],
+        'Laba': [20, 10, 50, 1],
+        'Plafond': [10, 100, 10, 1],
+    })
+
+
+def test_flags_per_metric_and_level():
+    result = batch_validation.validate_batch(_apps(), *_levels(), remap_sectors=False)
+    assert len(result) == 4
+
+    assert result['L1_Omzet_STATUS'].tolist() == [STATUS_PASS, STATUS_FAIL, STATUS_PASS, STATUS_MISSING]
+    assert result['L1_Laba_STATUS'].tolist() == [STATUS_PASS, STATUS_PASS, STATUS_FAIL, STATUS_MISSING]
+    assert 'L1_Plafond_STATUS' not in result.columns
+    assert result['L1_STATUS'].tolist() == [STATUS_PASS, STATUS_FAIL, STATUS_FAIL, STATUS_MISSING]
+
+    # 'P ' di Level 2 menjadi kunci duplikat setelah strip -> baris pertama dipakai
+    assert result['L2_STATUS'].tolist() == [STATUS_PASS, STATUS_PASS, STATUS_MISSING, STATUS_MISSING]
+
+    # Kabupaten int di upload & benchmark tetap cocok; batas NaN tidak pernah WAJAR
+    assert result['L3_Omzet_STATUS'].tolist() == [STATUS_PASS, STATUS_FAIL, STATUS_MISSING, STATUS_MISSING]
+    assert result['L3_Plafond_STATUS'].tolist() == [STATUS_FAIL, STATUS_FAIL, STATUS_MISSING, STATUS_MISSING]
+    assert result['L3_STATUS'].tolist() == [STATUS_FAIL, STATUS_FAIL, STATUS_MISSING, STATUS_MISSING]
+
+    summary = batch_validation.summarize(result).set_index('Level')
+    assert summary.loc['L1'].tolist() == [1, 2, 1]
+    assert summary.loc['L3'].tolist() == [0, 2, 2]
+
+
+def test_non_string_values_and_missing_columns():
+    apps = _apps().assign(Omzet=['50', 'abc', None, 1])
+    result = batch_validation.validate_batch(apps, *_levels(), remap_sectors=False)
+    assert result['L1_Omzet_STATUS'].tolist() == [STATUS_PASS, STATUS_FAIL, STATUS_FAIL, STATUS_MISSING]
+
+    with pytest.raises(ValueError, match='Plafond'):
+        batch_validation.validate_batch(_apps().drop(columns='Plafond'), *_levels())
+
+
+def test_matches_kewajaran_engine(levels):
+    apps = synthetic_data.generate_applications(synthetic_data.generate_levels(4_000), 500)
+    # Sebagian baris tidak punya benchmark Level 3
+    apps.loc[::7, 'Kabupaten/kota'] = 'KAB TIDAK ADA'
+    result = batch_validation.validate_batch(apps, levels['level1'], levels['level2'], levels['level3'])
+    engine = KewajaranEngine.from_levels(levels['level1'], levels['level2'], levels['level3'])
+    status = {None: STATUS_MISSING, True: STATUS_PASS, False: STATUS_FAIL}
+    for row in result.itertuples(index=False):
+        expected = engine.validate(row[0], row[1], row[2], row[3], omzet=row.Omzet, hpp=row.HPP,
+                                   laba=row.Laba, plafond=row.Plafond)
+        got = [getattr(row, f"L{i}_STATUS") for i in (1, 2, 3)]
+        assert got == [status[None if r is None else r['is_valid']] for r in expected.values()]
+
+
+def test_csv_export_round_trip():
+    result = batch_validation.validate_batch(_apps(), *_levels(), remap_sectors=False)
+    data = batch_validation.to_csv_bytes(result)
+    back = pd.read_csv(io.BytesIO(data))
+    assert back.columns.tolist() == result.columns.tolist()
+    assert back['L3_STATUS'].tolist() == result['L3_STATUS'].tolist()
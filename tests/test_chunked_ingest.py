@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_engine
+
+
+@pytest.mark.parametrize('chunksize', [997, 4_000])
+def test_chunked_build_matches_full_load(dataset_paths, main_frame, chunksize):
+    chunked = data_engine.build_main(dataset_paths[0], chunksize=chunksize)
+    pd.testing.assert_frame_equal(chunked, main_frame)
+    totals, expected = chunked.attrs[data_engine.TOTALS_ATTR], main_frame.attrs[data_engine.TOTALS_ATTR]
+    assert totals.keys() == expected.keys()
+    for key in expected:
+        np.testing.assert_allclose(totals[key], expected[key], rtol=1e-9, err_msg=key)
+
+
+def test_only_analysis_columns_are_kept(dataset_paths, main_frame):
+    raw = pd.read_csv(dataset_paths[0], nrows=0).columns
+    assert any(c.replace(data_engine.COLUMN_PREFIX, '') not in data_engine.RENAME_MAP for c in raw)
+    assert set(data_engine.RENAME_MAP.values()) <= set(main_frame.columns)
+    assert not set(raw) & set(main_frame.columns)
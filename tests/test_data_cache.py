@@ -0,0 +1,64 @@
+import json
+import os
+
+import pandas as pd
+
+import data_engine
+
+
+def test_write_read_round_trip(main_frame, levels, tmp_path):
+    data = {'main': main_frame, 'level1': levels['level1']}
+    data_engine.write_cache(data, str(tmp_path), 'entry')
+    back = data_engine.read_cache(str(tmp_path), 'entry')
+    assert sorted(back) == ['level1', 'main']
+    pd.testing.assert_frame_equal(back['main'], main_frame)
+    pd.testing.assert_frame_equal(back['level1'], levels['level1'])
+    assert back['main'].attrs == main_frame.attrs
+    # Tidak ada direktori sementara yang tertinggal
+    assert os.listdir(tmp_path) == ['entry']
+
+
+def test_read_cache_misses(tmp_path):
+    assert data_engine.read_cache(str(tmp_path), 'missing') is None
+    data_engine.write_cache({'df': pd.DataFrame({'a': [1]})}, str(tmp_path), 'old')
+    manifest = tmp_path / 'old' / 'manifest.json'
+    meta = json.loads(manifest.read_text())
+    meta['version'] = data_engine.CACHE_VERSION - 1
+    manifest.write_text(json.dumps(meta))
+    assert data_engine.read_cache(str(tmp_path), 'old') is None
+
+
+def test_fingerprint_changes_with_source(tmp_path):
+    path = tmp_path / 'source.csv'
+    path.write_text('a\n1\n')
+    key = data_engine.source_fingerprint(str(path))
+    assert data_engine.source_fingerprint(str(path)) == key
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert data_engine.source_fingerprint(str(path)) != key
+
+
+def test_load_dataset_rebuilds_only_changed_sources(dataset_paths, tmp_path):
+    csv_src, excel_path = dataset_paths
+    csv_path = tmp_path / os.path.basename(csv_src)
+    csv_path.write_bytes(open(csv_src, 'rb').read())
+    cache_dir, delta_dir = str(tmp_path / 'cache'), str(tmp_path / 'deltas')
+
+    first = data_engine.load_dataset(str(csv_path), excel_path, cache_dir, delta_dir)
+    key = data_engine.dataset_key(str(csv_path), excel_path, delta_dir)
+    assert sorted(os.listdir(cache_dir)) == sorted(key.split('+'))
+
+    # Sumber tidak berubah -> cache dibaca, isi sama
+    again = data_engine.load_dataset(str(csv_path), excel_path, cache_dir, delta_dir)
+    pd.testing.assert_frame_equal(again['main'], first['main'])
+
+    # CSV diubah -> entry main baru, entry lama dipangkas, levels tetap
+    raw = pd.read_csv(csv_path)
+    raw = raw.iloc[:-10]
+    raw.to_csv(csv_path, index=False)
+    changed = data_engine.load_dataset(str(csv_path), excel_path, cache_dir, delta_dir)
+    new_key = data_engine.dataset_key(str(csv_path), excel_path, delta_dir)
+    assert new_key != key and new_key.split('+')[1] == key.split('+')[1]
+    assert sorted(os.listdir(cache_dir)) == sorted(new_key.split('+'))
+    assert len(changed['main']) == len(first['main']) - 10
+    pd.testing.assert_frame_equal(changed['main'], data_engine.build_main(str(csv_path)))
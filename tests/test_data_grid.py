@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_grid
+
+
+@pytest.fixture(scope='module')
+def frame(main_frame):
+    df = main_frame.iloc[::3].copy()
+    df.loc[df.index[::17], 'Desa'] = np.nan
+    df.loc[df.index[::13], 'Skor_Potensi'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('column', ['Skor_Potensi', 'Desa', 'Strategy_Quadrant', 'Review_Count'])
+@pytest.mark.parametrize('ascending', [True, False])
+def test_sort_order_matches_sort_values(frame, column, ascending):
+    order = data_grid.sort_order(frame, column, ascending)
+    expected = frame.sort_values(column, ascending=ascending, kind='stable', na_position='last')
+    pd.testing.assert_frame_equal(frame.iloc[order], expected)
+
+
+@pytest.mark.parametrize('query', ['desa 00001', 'DESA', '9', 'tidak ada', 'kec 0'])
+def test_filter_mask_matches_str_contains(frame, query):
+    for column in ['Desa', 'Kecamatan']:
+        expected = frame[column].astype(object).str.contains(query, case=False, regex=False).fillna(False)
+        np.testing.assert_array_equal(data_grid.filter_mask(frame, column, query), expected.to_numpy(dtype=bool))
+    # Kolom non-kategori memakai jalur astype(str)
+    plain = frame.assign(Desa=frame['Desa'].astype(object).fillna(''))
+    np.testing.assert_array_equal(data_grid.filter_mask(plain, 'Desa', query),
+                                  plain['Desa'].str.contains(query, case=False, regex=False).to_numpy())
+
+
+def test_pages_cover_filtered_sorted_rows(frame):
+    order = data_grid.sort_order(frame, 'Skor_Potensi', ascending=False)
+    mask = data_grid.filter_mask(frame, 'Desa', '1')
+    rows = data_grid.visible_rows(order, mask)
+    expected = frame[mask].sort_values('Skor_Potensi', ascending=False, kind='stable', na_position='last')
+    columns = ['Desa', 'Skor_Potensi']
+
+    page_size = 25
+    n_pages = data_grid.page_count(len(rows), page_size)
+    pages = [data_grid.page_frame(frame, rows, p, page_size, columns) for p in range(1, n_pages + 1)]
+    assert all(len(p) == page_size for p in pages[:-1]) and 0 < len(pages[-1]) <= page_size
+    pd.testing.assert_frame_equal(pd.concat(pages), expected[columns])
+    assert data_grid.visible_rows(order) is order
+    assert data_grid.page_count(0, page_size) == 1
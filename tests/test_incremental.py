@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_engine
+import incremental
+
+P = data_engine.COLUMN_PREFIX
+KAB, DESA, POT, LOAN = P + 'nama_kabupaten', P + 'nama_desa', P + 'attractiveness_index', P + 'total_pinjaman_kel'
+
+
+def _edit_kabupaten(raw, kab, rng, new_max):
+    """All desa of kab with new loans / potensi, a few dropped and one new desa."""
+    delta = raw[raw[KAB] == kab].copy()
+    delta[LOAN] = delta[LOAN] * rng.uniform(0.2, 3.0, len(delta))
+    delta = delta.drop(delta.index[::25])
+    added = delta.iloc[:1].assign(**{DESA: 'DESA BARU'})
+    delta = pd.concat([delta, added], ignore_index=True)
+    if new_max:
+        delta.loc[delta.index[-1], POT] = raw[POT].max() + 10
+    else:
+        # Desa dengan potensi tertinggi ikut turun -> max_pot harus dicari ulang
+        delta[POT] = delta[POT] * 0.5
+    return delta
+
+
+@pytest.mark.parametrize('new_max', [True, False])
+def test_apply_delta_matches_full_rebuild(dataset_paths, main_frame, tmp_path, new_max):
+    raw = pd.read_csv(dataset_paths[0])
+    # Kabupaten yang memegang max Skor_Potensi, supaya max_pot berubah di kedua kasus
+    kab = raw.loc[raw[POT].idxmax(), KAB]
+    delta = _edit_kabupaten(raw, kab, np.random.default_rng(0), new_max)
+    delta_path = tmp_path / 'delta.csv'
+    delta.to_csv(delta_path, index=False)
+    rebuilt_path = tmp_path / 'rebuilt.csv'
+    pd.concat([raw[raw[KAB] != kab], delta], ignore_index=True).to_csv(rebuilt_path, index=False)
+
+    main, report = incremental.apply_delta(main_frame.copy(), incremental.read_delta(str(delta_path)))
+    expected = data_engine.build_main(str(rebuilt_path))
+
+    assert report['kabupaten'] == [kab]
+    assert report['rows_added'] == len(delta)
+    assert report['risk_rescored'] == len(main_frame) - report['rows_removed']
+    # Baris lama disimpan float32 -> statistik bisa beda ~1e-7 relatif
+    pd.testing.assert_frame_equal(main, expected, check_exact=False, rtol=1e-5)
+    totals, full = main.attrs[data_engine.TOTALS_ATTR], expected.attrs[data_engine.TOTALS_ATTR]
+    for key in full:
+        np.testing.assert_allclose(totals[key], full[key], rtol=1e-6, err_msg=key)
+
+
+def test_apply_delta_rejects_incomplete_delta(main_frame):
+    delta = pd.DataFrame({'Kabupaten': [main_frame['Kabupaten'].iloc[0]], 'Desa': ['X']})
+    with pytest.raises(ValueError, match='Kolom delta tidak lengkap'):
+        incremental.apply_delta(main_frame.copy(), delta)
+
+
+def test_empty_delta_is_a_no_op(main_frame):
+    main, report = incremental.apply_delta(main_frame, pd.DataFrame())
+    assert main is main_frame
+    assert report['rows_added'] == 0
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+import instrumentation
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    instrumentation.REGISTRY.reset()
+    instrumentation._open_runs.clear()
+    yield
+    instrumentation.REGISTRY.reset()
+    instrumentation._open_runs.clear()
+
+
+def _count(name):
+    return sum(v for (n, _), v in instrumentation.REGISTRY.counters.items() if n == name)
+
+
+def test_finished_run_is_counted_once():
+    instrumentation.start_run('test')
+    with instrumentation.span('stage'):
+        pass
+    assert instrumentation.finish_run() is not None
+    assert instrumentation.current_run() is None
+    instrumentation.start_run('test')
+    instrumentation.finish_run()
+    assert _count('geo_reruns_total') == 2
+    assert _count('geo_reruns_incomplete_total') == 0
+
+
+def test_stopped_run_on_same_thread_is_finished_by_next_start():
+    stopped = instrumentation.start_run('test')
+    with instrumentation.span('data_load'):
+        pass
+    # st.stop(): finish_run di akhir script tidak pernah dipanggil
+    instrumentation.start_run('test')
+    assert _count('geo_reruns_total') == 1
+    assert _count('geo_reruns_incomplete_total') == 1
+    assert stopped.last_activity > stopped.started
+    instrumentation.finish_run()
+    assert _count('geo_reruns_total') == 2
+
+
+def test_run_of_exited_thread_is_finished_by_any_start():
+    worker = threading.Thread(target=instrumentation.start_run, args=('test',))
+    worker.start()
+    worker.join()
+    assert len(instrumentation._open_runs) == 1
+    instrumentation.start_run('test')
+    assert _count('geo_reruns_incomplete_total') == 1
+    instrumentation.finish_run()
+    assert instrumentation._open_runs == {}
@@ -0,0 +1,81 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import kewajaran_service
+from kewajaran_engine import KewajaranEngine
+
+
+@pytest.fixture(scope='module')
+def engine(levels):
+    return KewajaranEngine.from_levels(levels['level1'], levels['level2'], levels['level3'])
+
+
+@pytest.fixture(scope='module')
+def record(levels):
+    row = levels['level3'].iloc[0]
+    return {'provinsi': row['Provinsi Usaha'], 'kabupaten': row['Kabupaten/kota'],
+            'sektor': row['Sektor Ekonomi'], 'sub_sektor': row['Sub Sektor Ekonomi'],
+            'omzet': float(row['OMZET_MAX_WAJAR']) * 2, 'hpp': 1.0, 'laba': 1.0}
+
+
+@pytest.fixture(scope='module')
+def server(engine):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), kewajaran_service.make_handler(engine))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body):
+    req = urllib.request.Request(url + '/validate', data=body.encode('utf-8'), method='POST')
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_post_record_and_list(server, record):
+    status, result = post(server, json.dumps(record))
+    assert status == 200
+    assert result['level3']['checks'] == {'omzet': False, 'hpp': True, 'laba': True}
+    assert result['level3']['is_valid'] is False
+
+    status, results = post(server, json.dumps([record, record]))
+    assert status == 200
+    assert results == [result, result]
+
+
+@pytest.mark.parametrize('body', ['[1]', '["x"]', '[null]', '[[]]'])
+def test_post_list_with_non_object_element_is_400(server, body):
+    status, payload = post(server, body)
+    assert status == 400
+    assert 'ke-0' in payload['error']
+
+
+def test_post_list_reports_index_of_bad_element(server, record):
+    status, payload = post(server, json.dumps([record, record, 'x']))
+    assert status == 400
+    assert 'ke-2' in payload['error']
+
+
+@pytest.mark.parametrize('body', ['', '1', '"x"', 'not json'])
+def test_post_non_object_body_is_400(server, body):
+    status, payload = post(server, body)
+    assert status == 400
+    assert payload['error']
+
+
+def test_validate_lines_keeps_going_after_bad_lines(engine, record):
+    lines = [json.dumps(record), '[1]', '', 'not json', json.dumps(dict(record, omzet='abc'))]
+    out = [json.loads(line) for line in kewajaran_service.validate_lines(engine, lines)]
+    assert len(out) == 4
+    assert out[0]['result']['level3']['is_valid'] is False
+    assert [('error' in o) for o in out] == [False, True, True, True]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+import batch_validation
+import partitioned_executor
+import scoring
+import synthetic_data
+
+# workers=2 & min_rows=0 memaksa jalur process pool (spawn) walau datanya kecil
+
+SCORE_INPUTS = ['Skor_Potensi', 'Loan_per_HH', 'Risk_Kumuh', 'Risk_Bencana', 'Risk_Konflik']
+
+
+def test_row_partitions_cover_rows():
+    for n_rows, n_parts in [(10, 3), (3, 8), (1, 1), (1_000, 7)]:
+        parts = partitioned_executor.row_partitions(n_rows, n_parts)
+        assert parts[0][0] == 0 and parts[-1][1] == n_rows
+        assert all(a[1] == b[0] for a, b in zip(parts, parts[1:]))
+        assert len(parts) == min(n_parts, n_rows)
+
+
+def test_score_frame_parallel_matches_serial(main_frame):
+    frame = main_frame[SCORE_INPUTS].astype(float).reset_index(drop=True)
+    frame.loc[::11, 'Skor_Potensi'] = np.nan
+    serial = scoring.score_frame(frame.copy())
+    parallel = partitioned_executor.score_frame(frame.copy(), workers=2, min_rows=0)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_validate_batch_parallel_matches_serial(levels):
+    apps = synthetic_data.generate_applications(synthetic_data.generate_levels(4_000), 3_000)
+    # Provinsi dengan spasi (dinormalisasi di parent) & kabupaten tanpa benchmark
+    apps.loc[::7, 'Provinsi Usaha'] = ' ' + apps.loc[::7, 'Provinsi Usaha'] + ' '
+    apps.loc[::13, 'Kabupaten/kota'] = 'KAB TIDAK ADA'
+    serial = batch_validation.validate_batch(apps, levels['level1'], levels['level2'], levels['level3'])
+    parallel = partitioned_executor.validate_batch(apps, levels['level1'], levels['level2'], levels['level3'],
+                                                   workers=2, min_rows=0)
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert set(serial['L3_STATUS']) == {batch_validation.STATUS_PASS, batch_validation.STATUS_FAIL,
+                                        batch_validation.STATUS_MISSING}
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import scoring
+from rank_index import LEADERBOARDS, RankIndex
+from region_index import RegionIndex
+
+
+@pytest.fixture(scope='module')
+def ranked(main_frame):
+    df = RegionIndex(main_frame).df.copy()
+    # Seri pada metrik: urutan harus mengikuti posisi baris (keep='first')
+    df['Skor_Potensi'] = df['Skor_Potensi'].round(0)
+    return df, RankIndex(df)
+
+
+def expected_positions(df, metric, n, kabupaten=None, quadrant=None, kecamatan=None):
+    mask = np.ones(len(df), dtype=bool)
+    if kabupaten is not None:
+        mask &= (df['Kabupaten'] == kabupaten).to_numpy()
+    if quadrant is not None:
+        mask &= (df['Strategy_Quadrant'] == quadrant).to_numpy()
+    if kecamatan is not None:
+        mask &= df['Kecamatan'].isin(kecamatan).to_numpy()
+    values = df[metric].reset_index(drop=True)[mask]
+    top = values.nsmallest(n, keep='first') if LEADERBOARDS[metric][1] else values.nlargest(n, keep='first')
+    return top.index.to_numpy()
+
+
+@pytest.mark.parametrize('metric', list(LEADERBOARDS))
+@pytest.mark.parametrize('n', [1, 10, 500])
+def test_top_positions_match_nlargest(ranked, metric, n):
+    df, index = ranked
+    kabupaten = [None] + df['Kabupaten'].cat.categories.tolist()
+    for kab in kabupaten:
+        for quadrant in [None] + scoring.QUADRANTS:
+            got = index.top_positions(metric, n, kab, quadrant)
+            np.testing.assert_array_equal(got, expected_positions(df, metric, n, kab, quadrant), err_msg=f"{kab} {quadrant}")
+
+
+@pytest.mark.parametrize('metric', list(LEADERBOARDS))
+def test_top_positions_with_kecamatan_filter(ranked, metric):
+    df, index = ranked
+    kab = df['Kabupaten'].cat.categories[1]
+    options = df.loc[df['Kabupaten'] == kab, 'Kecamatan'].unique().tolist()
+    for kecamatan in [options[:1], options[::3], options + ['KEC TIDAK ADA'], ['KEC TIDAK ADA']]:
+        for quadrant in [None, 'Hidden Gem (Grow)']:
+            for n in [5, 2_000]:
+                got = index.top_positions(metric, n, kab, quadrant, kecamatan)
+                np.testing.assert_array_equal(got, expected_positions(df, metric, n, kab, quadrant, kecamatan))
+
+
+def test_top_frame(ranked):
+    df, index = ranked
+    frame = index.top('Est_Unserved_KK', 5, columns=['Desa', 'Est_Unserved_KK'])
+    assert frame.columns.tolist() == ['Rank', 'Desa', 'Est_Unserved_KK']
+    assert frame['Rank'].tolist() == [1, 2, 3, 4, 5]
+    assert frame['Est_Unserved_KK'].tolist() == df['Est_Unserved_KK'].nlargest(5).tolist()
+    assert len(index.top_positions('Skor_Potensi', 5, 'KAB TIDAK ADA', 'Hidden Gem (Grow)')) == 0
@@ -0,0 +1,62 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+import data_engine
+import scoring
+from region_index import RegionIndex
+from risk_simulator import DEFAULT_POLICY, RiskScenarioModel
+
+
+def _model(main_frame):
+    # Sama seperti app.py: baris region_index.df, max_pot dari total build
+    max_pot = scoring.stats_from_totals(main_frame.attrs[data_engine.TOTALS_ATTR])['max_pot']
+    return RiskScenarioModel(RegionIndex(main_frame).df, max_pot), RegionIndex(main_frame).df
+
+
+def test_default_policy_reproduces_stored_risk_category(main_frame):
+    model, df = _model(main_frame)
+    codes = model.baseline['category_code']
+    stored = df['Risk_Category'].astype(str).to_numpy()
+    np.testing.assert_array_equal(np.array(scoring.RISK_CATEGORIES)[codes], stored)
+    counts = pd.Series(stored).value_counts()
+    assert model.baseline['category_counts'].tolist() == [int(counts.get(c, 0)) for c in scoring.RISK_CATEGORIES]
+    assert model.changed(model.simulate(DEFAULT_POLICY)).size == 0
+
+
+def test_default_policy_scores_equal_score_frame():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({
+        'Skor_Potensi': rng.uniform(0, 100, n), 'Loan_per_HH': rng.lognormal(2.5, 1.0, n),
+        'Risk_Kumuh': rng.choice([0, 1, 2], n), 'Risk_Bencana': rng.choice([0, 1], n),
+        'Risk_Konflik': rng.choice([0, 1], n),
+    })
+    scoring.score_frame(df)
+    model = RiskScenarioModel(df)
+    # Bit-per-bit sama dengan scoring.risk_scores
+    np.testing.assert_array_equal(model.scores(DEFAULT_POLICY), df['Final_Risk_Score'].to_numpy())
+    np.testing.assert_array_equal(np.array(scoring.RISK_CATEGORIES)[model.baseline['category_code']],
+                                  df['Risk_Category'].astype(str).to_numpy())
+    quadrant = model.quadrant_table(model.baseline)
+    assert quadrant.to_numpy().sum() == n
+    assert quadrant.sum(axis=1).tolist() == [int((df['Strategy_Quadrant'] == q).sum()) for q in scoring.QUADRANTS]
+
+
+def test_scenario_moves_categories_consistently(main_frame):
+    model, df = _model(main_frame)
+    policy = copy.deepcopy(DEFAULT_POLICY)
+    policy['penalties']['Risk_Konflik'] = 100
+    policy['sat_cap'] = 25.0
+    result = model.simulate(policy)
+    # Penalti & bobot naik -> skor tidak pernah turun, kategori hanya bisa naik (kode turun)
+    assert (result['category_code'] <= model.baseline['category_code']).all()
+    changed = model.changed(result)
+    assert changed.size > 0
+    table = model.compare(result)
+    assert table['Selisih'].sum() == 0
+    assert table['Skenario'].tolist() == np.bincount(result['category_code'], minlength=4).tolist()
+    subset = model.compare(result, changed)
+    assert subset['Baseline'].sum() == subset['Skenario'].sum() == changed.size
+    assert (result['category_code'][changed] != model.baseline['category_code'][changed]).all()
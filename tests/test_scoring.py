@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import scoring
+
+
+# --- Fungsi baseline (salinan dari app.py sebelum vektorisasi) ---
+
+def get_risk_cat(x):
+    if x >= 60: return 'Critical'
+    elif x >= 40: return 'High'
+    elif x >= 20: return 'Medium'
+    else: return 'Low'
+
+
+def make_get_quad(avg_pot, avg_sat):
+    def get_quad(row):
+        if row['Skor_Potensi'] >= avg_pot and row['Loan_per_HH'] < avg_sat: return "Hidden Gem (Grow)"
+        elif row['Skor_Potensi'] >= avg_pot and row['Loan_per_HH'] >= avg_sat: return "Red Ocean (Compete)"
+        elif row['Skor_Potensi'] < avg_pot and row['Loan_per_HH'] >= avg_sat: return "High Risk (Stop)"
+        else: return "Dormant (Monitor)"
+    return get_quad
+
+
+def get_hex_risk(score):
+    if score < 20: return '#00cc96'
+    elif score < 40: return '#ffa15a'
+    elif score < 60: return '#ef553b'
+    else: return '#b30000'
+
+
+def get_hex_potential(score):
+    if score > 80: return '#00cc96'
+    elif score > 60: return '#636efa'
+    elif score > 40: return '#ab63fa'
+    else: return '#d3d3d3'
+
+
+def categorize_debt(val):
+    if val < 10: return "🟢 Ringan"
+    elif val < 30: return "🟡 Menengah"
+    elif val < 50: return "🟠 Berat"
+    else: return "🔴 Sangat Berat"
+
+
+def interpret_risk(score):
+    if score > 80: return "⛔ KRITIS"
+    elif score > 60: return "⚠️ TINGGI"
+    elif score > 40: return "✋ SEDANG"
+    else: return "✅ RENDAH"
+
+
+def baseline_score(df):
+    """The pre-vectorization scoring of app.py, row by row."""
+    out = df.copy()
+    sat_risk = (out['Loan_per_HH'] / 50.0).clip(0, 1) * 100
+    max_pot = out['Skor_Potensi'].max() if out['Skor_Potensi'].max() > 0 else 1
+    eco_risk = 100 - ((out['Skor_Potensi'] / max_pot) * 100)
+    r_kumuh = (out['Risk_Kumuh'] > 0).astype(int)
+    r_bencana = (out['Risk_Bencana'] > 0).astype(int)
+    r_konflik = (out['Risk_Konflik'] > 0).astype(int)
+    env_risk = (r_kumuh * 30) + (r_bencana * 20) + (r_konflik * 50)
+    out['Final_Risk_Score'] = (0.3 * sat_risk) + (0.3 * eco_risk) + (0.4 * env_risk)
+    out['Risk_Category'] = out['Final_Risk_Score'].apply(get_risk_cat)
+    get_quad = make_get_quad(out['Skor_Potensi'].mean(), out['Loan_per_HH'].mean())
+    out['Strategy_Quadrant'] = out.apply(get_quad, axis=1)
+    out['Kategori_Beban'] = out['Loan_per_HH'].apply(categorize_debt)
+    out['Interpretasi_Risiko'] = out['Final_Risk_Score'].apply(interpret_risk)
+    out['color_hex_risk'] = out['Final_Risk_Score'].apply(get_hex_risk)
+    out['color_pot_hex'] = out['Skor_Potensi'].apply(get_hex_potential)
+    return out
+
+
+DERIVED = ['Risk_Category', 'Strategy_Quadrant', 'Kategori_Beban', 'Interpretasi_Risiko',
+           'color_hex_risk', 'color_pot_hex']
+
+# Tepat di batas setiap rantai if/elif, tepat di sisi-sisinya, dan NaN
+BOUNDARIES = [0, 10, 20, 30, 40, 50, 60, 80, 100]
+EDGE_VALUES = sorted({v + d for v in BOUNDARIES for d in (-1e-9, 0.0, 1e-9)}) + [-5.0, 150.0, np.nan]
+
+
+def _frame(potensi, loan, rng):
+    n = len(potensi)
+    return pd.DataFrame({
+        'Skor_Potensi': np.asarray(potensi, dtype=float),
+        'Loan_per_HH': np.asarray(loan, dtype=float),
+        'Risk_Kumuh': rng.choice([0, 1, 2, np.nan], n),
+        'Risk_Bencana': rng.choice([0, 1, np.nan], n),
+        'Risk_Konflik': rng.choice([0, 1], n),
+    })
+
+
+def assert_same_as_baseline(df):
+    expected = baseline_score(df)
+    got = scoring.score_frame(df.copy())
+    np.testing.assert_array_equal(got['Final_Risk_Score'].to_numpy(), expected['Final_Risk_Score'].to_numpy())
+    for col in DERIVED:
+        assert got[col].astype(str).tolist() == expected[col].tolist(), col
+
+
+@pytest.mark.parametrize('fn, baseline', [
+    (scoring.risk_category, get_risk_cat),
+    (scoring.risk_color_hex, get_hex_risk),
+    (scoring.risk_interpretation, interpret_risk),
+    (scoring.potential_color_hex, get_hex_potential),
+    (scoring.debt_category, categorize_debt),
+])
+def test_binning_boundaries(fn, baseline):
+    values = pd.Series(EDGE_VALUES)
+    assert fn(values).astype(str).tolist() == values.apply(baseline).tolist()
+
+
+def test_quadrant_values_equal_to_means():
+    # Rata-rata eksak (10, 20, 30 -> 20) sehingga ada baris tepat di rata-rata
+    pot = pd.Series([10.0, 20.0, 30.0, 20.0, np.nan, 10.0])
+    loan = pd.Series([20.0, 20.0, 10.0, 30.0, 20.0, np.nan])
+    avg_pot, avg_sat = pot.mean(), loan.mean()
+    get_quad = make_get_quad(avg_pot, avg_sat)
+    expected = pd.DataFrame({'Skor_Potensi': pot, 'Loan_per_HH': loan}).apply(get_quad, axis=1)
+    got = scoring.strategy_quadrant(pot, loan, avg_pot, avg_sat)
+    assert got.astype(str).tolist() == expected.tolist()
+
+
+def test_score_frame_matches_baseline_random():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    potensi = rng.uniform(0, 100, n)
+    loan = rng.lognormal(2.5, 1.0, n)
+    potensi[rng.random(n) < 0.02] = np.nan
+    loan[rng.random(n) < 0.02] = np.nan
+    assert_same_as_baseline(_frame(potensi, loan, rng))
+
+
+def test_score_frame_matches_baseline_edges():
+    rng = np.random.default_rng(1)
+    edges = np.array(EDGE_VALUES)
+    pot, loan = np.meshgrid(edges, edges)
+    df = _frame(pot.ravel(), loan.ravel(), rng)
+    assert_same_as_baseline(df)
+
+
+def test_score_frame_exact_means_and_risk_boundaries():
+    # Loan = 0 & potensi = max -> skor hanya dari env: 0.4 * 50 = 20 tepat di batas Medium
+    df = pd.DataFrame({
+        'Skor_Potensi': [100.0, 100.0, 50.0, 0.0, 50.0, np.nan],
+        'Loan_per_HH': [0.0, 0.0, 50.0, 10.0, 30.0, 10.0],
+        'Risk_Kumuh': [0, 0, 1, 0, np.nan, 0],
+        'Risk_Bencana': [0, 0, 0, 1, 0, 0],
+        'Risk_Konflik': [1, 0, 1, 1, 0, 0],
+    })
+    assert_same_as_baseline(df)
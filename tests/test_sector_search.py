@@ -0,0 +1,86 @@
+import difflib
+import random
+import time
+
+import pandas as pd
+import pytest
+
+import sector_search
+from sector_search import SubSectorSearch
+
+WORDS = ['Jasa', 'Kebersihan', 'Ternak', 'Sapi', 'Perdagangan', 'Eceran', 'Makanan', 'Minuman', 'Pertanian',
+         'Padi', 'Perikanan', 'Budidaya', 'Lele', 'Toko', 'Baju', 'Bakso', 'Warung', 'Industri', 'Kerajinan',
+         'Kayu', 'Angkutan', 'Darat', 'Reparasi', 'Motor', 'Kambing', 'Unggas', 'Ayam', 'Hortikultura', 'dan']
+
+QUERIES = ['sapi', 'ternak sapi', 'Ternak Sapi', 'jualan bakso', 'ternak lele', 'toko baju', 'jasa',
+           'xyz', 'q', 'perdagngan eceran makanan', 'KAYU', 'ayam potong', 'a']
+
+
+def _labels(rng, count):
+    labels = {' '.join(rng.sample(WORDS, rng.randint(1, 4))) for _ in range(count)}
+    # Label tanpa trigram yang sama dengan query tetap harus bisa cocok
+    labels.update(['Jasa Kebersihan', 'Ternak Sapi Perah', 'Peternakan', 'Sa pi', 'ipas'])
+    return sorted(labels)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('n, cutoff', [(3, 0.3), (1, 0.3), (5, 0.0), (3, 0.6)])
+def test_search_matches_get_close_matches(seed, n, cutoff):
+    rng = random.Random(seed)
+    labels = _labels(rng, 400)
+    rng.shuffle(labels)
+    index = SubSectorSearch(labels)
+    queries = QUERIES + [rng.choice(labels).lower() for _ in range(10)]
+    for query in queries:
+        assert index.search(query, n=n, cutoff=cutoff, max_ratio_calls=None) == difflib.get_close_matches(query, labels, n=n, cutoff=cutoff), query
+
+
+def test_scoped_search_matches_get_close_matches():
+    rng = random.Random(7)
+    labels = _labels(rng, 300)
+    ref = pd.DataFrame({
+        'Sub Sektor Ekonomi': labels * 2,
+        'Provinsi Usaha': ['A'] * len(labels) + [rng.choice(['B', 'C']) for _ in labels],
+        'Sektor Ekonomi': ['X'] * (2 * len(labels)),
+    })
+    index = SubSectorSearch.from_frame(ref)
+    for scope in ['A', 'B', 'C']:
+        subs = ref.loc[ref['Provinsi Usaha'] == scope, 'Sub Sektor Ekonomi'].unique().tolist()
+        for query in QUERIES:
+            assert index.search(query, scope=scope, max_ratio_calls=None) == difflib.get_close_matches(query, subs, n=3, cutoff=0.3), (scope, query)
+    assert index.search('sapi', scope='Z') == []
+
+
+def _long_labels(count):
+    # Label panjang (4-9 kata) supaya batas quick_ratio longgar & ratio() mahal
+    rng = random.Random(0)
+    words = WORDS + ['Besar', 'Kecil', 'Rumah', 'Tangga', 'Pengolahan', 'Ikan', 'Kain', 'Sepatu', 'Obat', 'Kopi', 'Teh']
+    labels = set()
+    while len(labels) < count:
+        labels.add(' '.join(rng.sample(words, rng.randint(4, 9))))
+    return sorted(labels)
+
+
+def test_search_caps_ratio_calls_and_latency_on_10k_labels(monkeypatch):
+    index = SubSectorSearch(_long_labels(10_000))
+    calls = [0]
+    ratio = difflib.SequenceMatcher.ratio
+
+    def counting_ratio(self):
+        calls[0] += 1
+        return ratio(self)
+
+    monkeypatch.setattr(difflib.SequenceMatcher, 'ratio', counting_ratio)
+    for query in ['Jualan Bakso', 'Ternak Lele', 'Toko Baju', 'ternak sapi', 'jual baju anak']:
+        calls[0] = 0
+        assert len(index.search(query)) == 3, query
+        assert calls[0] <= sector_search.MAX_RATIO_CALLS, query
+    monkeypatch.undo()
+
+    for query in ['Jualan Bakso', 'Ternak Lele', 'Toko Baju']:
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter()
+            index.search(query)
+            best = min(best, time.perf_counter() - start)
+        assert best < 0.010, (query, best)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatial_index import SpatialIndex, haversine_km
+
+
+@pytest.fixture(scope='module')
+def desa():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({'lat': rng.uniform(-8.0, -6.0, n), 'lon': rng.uniform(106.0, 111.0, n),
+                       'quadrant': rng.choice(['A', 'B', 'C'], n)})
+    df.loc[::97, 'lat'] = np.nan  # desa tanpa koordinat
+    return df
+
+
+def brute_force(df, lat, lon, mask=None):
+    """(row positions, distances) of every located desa, nearest first."""
+    ok = df['lat'].notna().to_numpy() & df['lon'].notna().to_numpy()
+    if mask is not None:
+        ok &= mask
+    rows = np.flatnonzero(ok)
+    dist = haversine_km(lat, lon, df['lat'].to_numpy()[rows], df['lon'].to_numpy()[rows])
+    order = np.argsort(dist, kind='stable')
+    return rows[order], dist[order]
+
+
+QUERIES = [(-7.0, 108.0), (-6.0, 106.0), (-7.9, 110.99), (-5.5, 105.5), (-12.0, 120.0)]
+
+
+@pytest.mark.parametrize('lat, lon', QUERIES)
+@pytest.mark.parametrize('radius_km', [0.5, 5.0, 27.3, 150.0, 2_000.0])
+def test_query_radius_matches_brute_force(desa, lat, lon, radius_km):
+    index = SpatialIndex(desa)
+    for mask in [None, (desa['quadrant'] == 'B').to_numpy()]:
+        rows, dist = index.query_radius(lat, lon, radius_km, mask)
+        exp_rows, exp_dist = brute_force(desa, lat, lon, mask)
+        inside = exp_dist <= radius_km
+        np.testing.assert_array_equal(rows, exp_rows[inside])
+        np.testing.assert_allclose(dist, exp_dist[inside])
+
+
+@pytest.mark.parametrize('lat, lon', QUERIES)
+@pytest.mark.parametrize('n', [1, 5, 50, 10_000])
+def test_query_nearest_matches_brute_force(desa, lat, lon, n):
+    index = SpatialIndex(desa, cell_deg=0.1)
+    for mask in [None, (desa['quadrant'] == 'C').to_numpy()]:
+        rows, dist = index.query_nearest(lat, lon, n, mask)
+        exp_rows, exp_dist = brute_force(desa, lat, lon, mask)
+        np.testing.assert_array_equal(rows, exp_rows[:n])
+        np.testing.assert_allclose(dist, exp_dist[:n])
+
+
+def test_frames_and_empty_index(desa):
+    index = SpatialIndex(desa)
+    assert len(index) == desa['lat'].notna().sum()
+    near = index.nearest(-7.0, 108.0, 3)
+    assert near['Jarak_km'].is_monotonic_increasing and len(near) == 3
+    assert (index.within(-7.0, 108.0, 10.0)['Jarak_km'] <= 10.0).all()
+
+    empty = SpatialIndex(desa.iloc[:0])
+    assert len(empty.query_radius(-7.0, 108.0, 100.0)[0]) == 0
+    assert len(empty.query_nearest(-7.0, 108.0, 5)[0]) == 0